@@ -13,6 +13,7 @@ class K6LogAnalyzer:
     def __init__(self, results_dir="results"):
         self.results_dir = Path(results_dir)
         self.results = {}
+        self.paths = {}
         
     def load_k6_results(self, pattern="*.json"):
         """Carrega todos os arquivos JSON de resultados do k6"""
@@ -48,6 +49,7 @@ class K6LogAnalyzer:
                         # Remove duplicates by keeping only unique file names
                         if file_path.name not in self.results:
                             self.results[file_path.name] = data
+                            self.paths[file_path.name] = file_path
                             print(f"✅ Carregado: {file_path.name} ({len(data)} métricas)")
                         
             except Exception as e:
@@ -152,6 +154,64 @@ class K6LogAnalyzer:
         
         return (failed_requests / total_requests * 100) if total_requests > 0 else 0
     
+    def resource_file(self, filename):
+        """Série de recursos gravada pelo coletar_recursos.py ao lado do resultado k6, se houver"""
+        path = self.paths.get(filename)
+        if path is None:
+            return None
+        candidate = path.with_name(f"{path.stem}-recursos.csv")
+        return candidate if candidate.exists() else None
+    
+    def calculate_resource_efficiency(self, data, resource_file):
+        """CPU por requisição, memória por conexão e rede por requisição da execução"""
+        series = pd.read_csv(resource_file)
+        if series.empty:
+            return {}
+        
+        requests = sum(entry['data'].get('value', 0) for entry in data
+                       if entry.get('metric') == 'http_reqs' and entry.get('type') == 'Point'
+                       and 'data' in entry)
+        
+        # Contadores acumulados: soma dos incrementos entre amostras consecutivas de cada
+        # alvo; se o contêiner reiniciar, o contador volta a zero e o incremento é o novo valor
+        counter_columns = ['cpu_usec', 'throttled_usec', 'rx_bytes', 'tx_bytes']
+        series = series.sort_values(['target', 't'])
+        steps = series.groupby('target')[counter_columns].diff()
+        steps = steps.where(steps.isna() | (steps >= 0), series[counter_columns])
+        counters = steps.groupby(series['target']).sum()
+        # Valores instantâneos: soma dos alvos em cada instante, só nos instantes em que
+        # todos os alvos foram amostrados (um alvo ausente pareceria queda de memória)
+        targets_per_tick = series.groupby('t')['target'].nunique()
+        complete_ticks = targets_per_tick.index[targets_per_tick == series['target'].nunique()]
+        per_tick = series[series['t'].isin(complete_ticks)].groupby('t')[['mem_bytes', 'connections', 'pids']].sum()
+        if per_tick.empty:
+            return {}
+        duration = series['t'].max() - series['t'].min()
+        
+        cpu_seconds = counters['cpu_usec'].sum() / 1e6
+        baseline_memory = per_tick['mem_bytes'].iloc[0]
+        peak_memory = per_tick['mem_bytes'].max()
+        peak_connections = per_tick['connections'].max()
+        
+        return {
+            'targets': int(series['target'].nunique()),
+            'samples': int(len(per_tick)),
+            'duration_s': float(duration),
+            'requests': int(requests),
+            'cpu_seconds': float(cpu_seconds),
+            'cpu_cores_mean': float(cpu_seconds / duration) if duration > 0 else 0.0,
+            'cpu_ms_per_request': float(cpu_seconds * 1000 / requests) if requests else None,
+            'throttled_seconds': float(counters['throttled_usec'].sum() / 1e6),
+            'memory_baseline_mb': float(baseline_memory / 2**20),
+            'memory_peak_mb': float(peak_memory / 2**20),
+            'connections_peak': int(peak_connections),
+            'memory_kb_per_connection': (float((peak_memory - baseline_memory) / peak_connections / 1024)
+                                         if peak_connections else None),
+            'rx_bytes_per_request': float(counters['rx_bytes'].sum() / requests) if requests else None,
+            'tx_bytes_per_request': float(counters['tx_bytes'].sum() / requests) if requests else None,
+            'pids_peak': int(per_tick['pids'].max()),
+        }
+    
     def generate_comprehensive_report(self):
         """Gera relatório completo de análise"""
         if not self.results:
@@ -184,6 +244,10 @@ class K6LogAnalyzer:
                 'error_rate_percent': error_rate
             }
             
+            resource_file = self.resource_file(filename)
+            if resource_file is not None:
+                test_report['resources'] = self.calculate_resource_efficiency(data, resource_file)
+            
             report['tests'][filename] = test_report
             
             # Exibir resultados
@@ -197,6 +261,18 @@ class K6LogAnalyzer:
             
             print(f"🚀 Throughput: {throughput:.2f} req/s")
             print(f"❌ Taxa de Erro: {error_rate:.2f}%")
+            
+            resources = test_report.get('resources')
+            if resources:
+                print(f"💾 Recursos ({resources['targets']} alvo(s), {resources['samples']} amostras):")
+                print(f"   - CPU: {resources['cpu_cores_mean']:.2f} núcleos em média")
+                if resources['cpu_ms_per_request'] is not None:
+                    print(f"   - CPU por requisição: {resources['cpu_ms_per_request']:.2f} ms")
+                print(f"   - Memória pico: {resources['memory_peak_mb']:.1f} MB "
+                      f"(início {resources['memory_baseline_mb']:.1f} MB)")
+                if resources['memory_kb_per_connection'] is not None:
+                    print(f"   - Memória por conexão: {resources['memory_kb_per_connection']:.1f} KB "
+                          f"({resources['connections_peak']} conexões no pico)")
         
         return report
     
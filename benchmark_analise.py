@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do pipeline de análise (K6LogAnalyzer + create_comparative_tables)
+
+Para cada tamanho gera (uma vez) resultados k6 sintéticos com o
+gerar_k6_sintetico.py, um arquivo REST e um gRPC dividindo os pontos, e mede
+num subprocesso próprio cada etapa da análise:
+
+- load: K6LogAnalyzer.load_k6_results
+- aggregate: calculate_percentiles / calculate_throughput / calculate_error_rate
+- report: generate_comprehensive_report
+- plot: create_comparison_visualization (backend Agg)
+- tables: create_comparative_tables sobre o relatório
+
+O pico de RSS é lido do próprio subprocesso (ru_maxrss) ao fim de cada etapa.
+Com --memory-limit-mb o subprocesso falha com MemoryError em vez de derrubar a
+máquina. Com --baseline, compara com uma execução anterior (--json) e sai com
+código 1 se alguma etapa ficar mais lenta que a tolerância.
+
+Exemplos:
+    python benchmark_analise.py --sizes 1M 10M 50M --json bench_analise.json
+    python benchmark_analise.py --sizes 1M --baseline bench_analise.json --tolerance 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from gerar_k6_sintetico import generate, parse_count
+
+ROOT = Path(__file__).resolve().parent
+STAGES = ("load", "aggregate", "report", "plot", "tables")
+PROTOCOLS = ("rest", "grpc")
+
+
+def _peak_rss_mb():
+    # ru_maxrss é em KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_stages():
+    """Executado no subprocesso (cwd = diretório dos dados): tempos e RSS por etapa"""
+    sys.path.insert(0, str(ROOT))
+    results = {"baseline_rss_mb": _peak_rss_mb()}
+    # Imports pesados contam à parte, como no uso real dos scripts
+    with contextlib.redirect_stdout(io.StringIO()):
+        from analyze_k6_logs_fixed import K6LogAnalyzer
+        from analise_forma_comparativa import create_comparative_tables
+    results["import_rss_mb"] = _peak_rss_mb()
+
+    # Padrões do script: com cwd = data_dir os arquivos são achados por "."
+    analyzer = K6LogAnalyzer()
+    report = None
+
+    def aggregate():
+        for data in analyzer.results.values():
+            analyzer.calculate_percentiles(data)
+            analyzer.calculate_throughput(data)
+            analyzer.calculate_error_rate(data)
+
+    steps = {
+        "load": lambda: analyzer.load_k6_results("*.json"),
+        "aggregate": aggregate,
+        "report": lambda: analyzer.generate_comprehensive_report(),
+        "plot": lambda: analyzer.create_comparison_visualization(output_file="bench_plot.png"),
+        "tables": lambda: create_comparative_tables(report),
+    }
+    for stage in STAGES:
+        output = io.StringIO()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            value = steps[stage]()
+        if stage == "load" and len(analyzer.results) < len(PROTOCOLS):
+            # O analisador engole as exceções de carga (inclusive MemoryError) e só imprime
+            raise RuntimeError("arquivos não carregados: " + " | ".join(
+                line for line in output.getvalue().splitlines() if line.startswith("❌")))
+        if stage == "report":
+            report = value
+        results[stage] = {"seconds": time.perf_counter() - started, "peak_rss_mb": _peak_rss_mb()}
+    results["points"] = sum(len(data) for data in analyzer.results.values())
+    return results
+
+
+def ensure_data(data_dir, points, regenerate=False):
+    data_dir.mkdir(parents=True, exist_ok=True)
+    for index, protocol in enumerate(PROTOCOLS):
+        path = data_dir / f"{protocol}_monitoring_synth.json"
+        if path.exists() and not regenerate:
+            continue
+        started = time.perf_counter()
+        stats = generate(path, points // len(PROTOCOLS), protocol=protocol, seed=42 + index)
+        print(f"   🧪 {path.name}: {stats['points']:,} pontos, {stats['bytes'] / 1e6:.0f} MB "
+              f"em {time.perf_counter() - started:.1f}s")
+
+
+def run_size(size, args):
+    points = parse_count(size)
+    data_dir = Path(args.data_dir).resolve() / size
+    print(f"\n📦 {size} pontos ({data_dir})")
+    ensure_data(data_dir, points, args.regenerate)
+
+    command = [sys.executable, str(Path(__file__).resolve()), "--worker", str(data_dir)]
+    if args.memory_limit_mb:
+        command += ["--memory-limit-mb", str(args.memory_limit_mb)]
+    env = dict(os.environ, MPLBACKEND="Agg")
+    try:
+        completed = subprocess.run(command, cwd=data_dir, env=env, capture_output=True, text=True,
+                                   timeout=args.timeout)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timeout após {args.timeout:.0f}s"}
+    if completed.returncode != 0:
+        last_line = (completed.stderr.strip().splitlines() or ["?"])[-1]
+        return {"error": f"código {completed.returncode}: {last_line}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def print_results(results):
+    print(f"\n{'tamanho':<10}" + "".join(f"{stage + ' s':>12}" for stage in STAGES) + f"{'pico RSS MB':>14}")
+    for size, result in results.items():
+        if "error" in result:
+            print(f"{size:<10}❌ {result['error']}")
+            continue
+        peak = max(result[stage]["peak_rss_mb"] for stage in STAGES)
+        print(f"{size:<10}" + "".join(f"{result[stage]['seconds']:>12.2f}" for stage in STAGES)
+              + f"{peak:>14.0f}")
+
+
+def compare(results, baseline, tolerance):
+    """Lista as etapas mais lentas que baseline * (1 + tolerance)"""
+    regressions = []
+    for size, result in results.items():
+        before = baseline.get(size)
+        if before is None or "error" in before:
+            continue
+        if "error" in result:
+            regressions.append(f"{size}: {result['error']}")
+            continue
+        for stage in STAGES:
+            old, new = before[stage]["seconds"], result[stage]["seconds"]
+            if new > old * (1 + tolerance) and new - old > 0.05:
+                regressions.append(f"{size} {stage}: {old:.2f}s -> {new:.2f}s (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de análise dos resultados k6")
+    parser.add_argument("--sizes", nargs="+", default=["1M", "10M", "50M"],
+                        help="pontos por execução (aceita k/M), divididos entre REST e gRPC")
+    parser.add_argument("--data-dir", default="bench-data")
+    parser.add_argument("--regenerate", action="store_true", help="gera os dados de novo")
+    parser.add_argument("--timeout", type=float, default=3600.0, help="limite por tamanho (s)")
+    parser.add_argument("--memory-limit-mb", type=int, default=0, help="limite de memória do subprocesso")
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    parser.add_argument("--baseline", help="resultados anteriores (--json) para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="piora aceitável por etapa (0.2 = 20%%)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        if args.memory_limit_mb:
+            limit = args.memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        print(json.dumps(run_stages()))
+        return
+
+    print("🚀 BENCHMARK DO PIPELINE DE ANÁLISE")
+    print("=" * 50)
+    results = {size: run_size(size, args) for size in args.sizes}
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Resultados salvos em: {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\n❌ Regressões em relação ao baseline:")
+            for line in regressions:
+                print(f"   - {line}")
+            sys.exit(1)
+        print("\n✅ Sem regressões em relação ao baseline")
+
+
+if __name__ == "__main__":
+    main()
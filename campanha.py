@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Orquestrador de campanhas de teste (Linux/macOS), no lugar dos scripts .ps1
+
+Lê uma matriz (protocolo × VUs × réplicas) de um JSON em k6-tests/campanhas/ e,
+para cada célula:
+
+1. sobe/escala a stack com `docker compose up -d --scale service-b=N`;
+2. espera a prontidão real: todas as réplicas do service-b "healthy" (o
+   healthcheck do compose consulta /ready) e o gateway respondendo 200, em vez
+   de Start-Sleep fixos;
+3. roda o k6 (`--out json=<célula>.json`), com falhas agendadas opcionais
+   (parar/matar/subir o service-b no meio do teste, como no teste de resiliência);
+4. durante o k6, amostra CPU, memória, rede e conexões dos containers do
+   service-b (coletar_recursos.py) em `<célula>-recursos.csv`;
+5. analisa o resultado na hora com o K6LogAnalyzer (incluindo CPU por
+   requisição e memória por conexão) e regrava k6_detailed_analysis.json no
+   diretório da campanha, no formato lido pelo analise_forma_comparativa.py.
+
+O estado de cada célula fica em estado.json, gravado após cada passo. Rodar o
+mesmo comando de novo pula as células concluídas e refaz só as pendentes ou
+com falha: uma célula que falha não reinicia a campanha.
+
+Exemplos:
+    python campanha.py k6-tests/campanhas/escalabilidade.json
+    python campanha.py k6-tests/campanhas/resiliencia.json --dry-run
+    python campanha.py k6-tests/campanhas/monitoramento.json --only rest-300vu-1r --force
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+DEFAULTS = {
+    "name": "campanha",
+    "script": "k6-tests/monitoring-collection-test.js",
+    "protocols": ["rest"],
+    "vus": [100],
+    "replicas": [1],
+    "duration": "3m",
+    "repeat": 1,
+    "env": {},
+    "service": "service-b",
+    "gateway_url": "http://localhost:3000/health",
+    "build": True,
+    "fresh": False,
+    "cooldown_s": 0,
+    "faults": [],
+    "resources": True,
+    "resources_interval_s": 1.0,
+    "prometheus_url": "http://localhost:9090",
+    "prometheus_queries": {
+        "requests_rps": "sum(rate(request_count[1m]))",
+        "cpu_seconds": "sum(container_cpu_usage_seconds_total)",
+    },
+}
+PROTOCOL_LABELS = {"rest": "REST", "grpc": "gRPC"}
+# 99 = thresholds do script violados: o teste rodou e os dados valem
+K6_OK_CODES = (0, 99)
+
+
+def load_matrix(path):
+    with open(path, "r", encoding="utf-8") as f:
+        matrix = dict(DEFAULTS, **json.load(f))
+    for key in ("protocols", "vus", "replicas"):
+        if not isinstance(matrix[key], list):
+            matrix[key] = [matrix[key]]
+    return matrix
+
+
+def expand_cells(matrix):
+    """Células na ordem de execução: réplicas por fora (menos re-escalas), depois VUs e protocolo"""
+    cells = []
+    for replicas in matrix["replicas"]:
+        for vus in matrix["vus"]:
+            for protocol in matrix["protocols"]:
+                for run in range(1, matrix["repeat"] + 1):
+                    cell_id = f"{protocol}-{vus or 'script'}vu-{replicas}r"
+                    if matrix["repeat"] > 1:
+                        cell_id += f"-{run}"
+                    cells.append({"id": cell_id, "protocol": protocol, "vus": vus, "replicas": replicas})
+    return cells
+
+
+def parse_duration(value):
+    """'90s', '3m', '1h' -> segundos"""
+    units = {"s": 1, "m": 60, "h": 3600}
+    if value[-1:] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+class CampaignState:
+    """estado.json: status, tentativas e resumo de cada célula (gravação atômica)"""
+
+    def __init__(self, path, name):
+        self.path = path
+        self.data = {"name": name, "cells": {}}
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+
+    def cell(self, cell_id):
+        return self.data["cells"].setdefault(cell_id, {"status": "pending", "attempts": 0})
+
+    def update(self, cell_id, **fields):
+        self.cell(cell_id).update(fields)
+        self.save()
+
+    def save(self):
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
+class Runner:
+    """Comandos externos (docker compose, k6); em --dry-run só imprime"""
+
+    def __init__(self, compose_cmd, k6_cmd, dry_run=False):
+        self.compose_cmd = shlex.split(compose_cmd)
+        self.k6_cmd = shlex.split(k6_cmd)
+        self.dry_run = dry_run
+
+    def run(self, command, **kwargs):
+        if self.dry_run:
+            print(f"   $ {shlex.join(command)}")
+            return subprocess.CompletedProcess(command, 0, "", "")
+        return subprocess.run(command, cwd=ROOT, text=True, **kwargs)
+
+    def compose(self, *args, **kwargs):
+        return self.run(self.compose_cmd + list(args), **kwargs)
+
+    def scale(self, matrix, replicas, build=False):
+        command = ["up", "-d", "--scale", f"{matrix['service']}={replicas}"]
+        if build:
+            command.append("--build")
+        completed = self.compose(*command, capture_output=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"docker compose up falhou: {completed.stderr.strip()[-500:]}")
+
+    def service_states(self, service):
+        """[(State, Health), ...] dos containers do serviço"""
+        completed = self.compose("ps", "--all", "--format", "json", service, capture_output=True)
+        if completed.returncode != 0:
+            return []
+        output = completed.stdout.strip()
+        # Compose v2 recente: um JSON por linha; versões antigas: uma lista
+        if output.startswith("["):
+            containers = json.loads(output)
+        else:
+            containers = [json.loads(line) for line in output.splitlines() if line.strip()]
+        return [(c.get("State", ""), c.get("Health", "")) for c in containers]
+
+
+def http_ok(url, timeout=2.0):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def wait_ready(runner, matrix, replicas, timeout):
+    """Espera N réplicas running/healthy e o gateway respondendo; devolve o tempo gasto"""
+    if runner.dry_run:
+        print(f"   ⏳ aguardaria {replicas} réplica(s) healthy e {matrix['gateway_url']}")
+        return 0.0
+    started = time.monotonic()
+    status = "sem containers"
+    while time.monotonic() - started < timeout:
+        states = runner.service_states(matrix["service"])
+        # Sem healthcheck o Health vem vazio: basta estar running
+        ready = [s for s in states if s[0] == "running" and s[1] in ("", "healthy")]
+        status = ", ".join(f"{state}/{health or '-'}" for state, health in states) or "sem containers"
+        if len(ready) == replicas and len(states) == replicas and http_ok(matrix["gateway_url"]):
+            return time.monotonic() - started
+        time.sleep(1.0)
+    raise RuntimeError(f"stack não ficou pronta em {timeout:.0f}s ({matrix['service']}: {status})")
+
+
+def schedule_faults(runner, matrix, replicas):
+    """Timers das falhas da matriz, contados a partir do início do k6"""
+    service = matrix["service"]
+    actions = {
+        "stop": ("stop", service),
+        "kill": ("kill", service),
+        "start": ("up", "-d", "--no-deps", "--scale", f"{service}={replicas}", service),
+        "restart": ("restart", service),
+    }
+    log = []
+    timers = []
+    for fault in matrix["faults"]:
+        if fault["action"] not in actions:
+            raise ValueError(f"ação de falha desconhecida: {fault['action']} (use {', '.join(actions)})")
+
+        def fire(fault=fault):
+            print(f"   💥 t={fault['at']}s: {fault['action']} {service}")
+            runner.compose(*actions[fault["action"]], capture_output=True)
+            log.append({"at": fault["at"], "action": fault["action"], "time": datetime.now().isoformat()})
+
+        timers.append(threading.Timer(fault["at"], fire))
+    return timers, log
+
+
+def run_k6(runner, matrix, cell, out_file, log_file):
+    script = matrix["script"].format(protocol=cell["protocol"])
+    command = runner.k6_cmd + ["run", "--out", f"json={out_file}",
+                               "--env", f"PROTOCOL={cell['protocol']}",
+                               "--tag", f"campaign_cell={cell['id']}"]
+    if cell["vus"]:
+        command += ["--vus", str(cell["vus"])]
+    if matrix["duration"]:
+        command += ["--duration", matrix["duration"]]
+    for key, value in matrix["env"].items():
+        command += ["--env", f"{key}={value}"]
+    command.append(script)
+
+    # Margem para setup/teardown e gracefulStop do k6
+    timeout = parse_duration(matrix["duration"]) + 600 if matrix["duration"] else None
+    if runner.dry_run:
+        runner.run(command)
+        return 0
+    with open(log_file, "w", encoding="utf-8") as log:
+        try:
+            completed = runner.run(command, stdout=log, stderr=subprocess.STDOUT, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"k6 não terminou em {timeout:.0f}s")
+    if completed.returncode not in K6_OK_CODES:
+        raise RuntimeError(f"k6 saiu com código {completed.returncode} (ver {log_file.name})")
+    return completed.returncode
+
+
+def query_prometheus(matrix):
+    results = {}
+    for name, query in matrix["prometheus_queries"].items():
+        url = f"{matrix['prometheus_url']}/api/v1/query?query={urllib.parse.quote(query)}"
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                result = json.load(response)["data"]["result"]
+            results[name] = float(result[0]["value"][1]) if result else None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"   ⚠️  Prometheus ({name}): {e}")
+    return results
+
+
+def start_resource_collector(runner, matrix, cell, out_dir):
+    """Coletor de recursos dos containers do serviço; None se desligado ou indisponível"""
+    if not matrix["resources"] or runner.dry_run:
+        return None
+    from coletar_recursos import ContainerTarget, ResourceCollector
+
+    completed = runner.compose("ps", "-q", matrix["service"], capture_output=True)
+    try:
+        targets = [ContainerTarget(container) for container in completed.stdout.split()]
+        if not targets:
+            raise OSError(f"nenhum container de {matrix['service']}")
+        return ResourceCollector(targets, out_dir / f"{cell['id']}-recursos.csv",
+                                 matrix["resources_interval_s"]).start()
+    except OSError as e:
+        # Sem cgroup v2 ou sem acesso ao docker: o teste roda sem a série de recursos
+        print(f"   ⚠️  Recursos não coletados: {e}")
+        return None
+
+
+def summarize(out_dir, cell, matrix):
+    """Resumo da célula pelo K6LogAnalyzer, no formato de k6_detailed_analysis.json"""
+    from analyze_k6_logs_fixed import K6LogAnalyzer
+
+    analyzer = K6LogAnalyzer(results_dir=out_dir)
+    file_name = f"{cell['id']}.json"
+    # O analisador também procura em ".", mas o nome da célula é único
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.load_k6_results(file_name)
+    data = analyzer.results.get(file_name)
+    if not data:
+        raise RuntimeError(f"nenhum ponto em {file_name}")
+    resource_file = analyzer.resource_file(file_name)
+    summary = {
+        "filename": file_name,
+        "protocol": PROTOCOL_LABELS.get(cell["protocol"], cell["protocol"]),
+        "test_type": matrix["name"],
+        "vus": cell["vus"],
+        "replicas": cell["replicas"],
+        "total_metrics": len(data),
+        "latency": analyzer.calculate_percentiles(data),
+        "throughput_rps": analyzer.calculate_throughput(data),
+        "error_rate_percent": analyzer.calculate_error_rate(data),
+    }
+    if resource_file is not None:
+        summary["resources"] = analyzer.calculate_resource_efficiency(data, resource_file)
+    return summary
+
+
+def write_report(out_dir, state):
+    tests = {cell_id: cell["summary"] for cell_id, cell in state.data["cells"].items()
+             if cell["status"] == "done"}
+    report = {"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "total_files": len(tests),
+              "tests": tests}
+    tmp = out_dir / "k6_detailed_analysis.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, default=float)
+    os.replace(tmp, out_dir / "k6_detailed_analysis.json")
+
+
+def run_cell(runner, matrix, cell, out_dir, state, args, build):
+    if matrix["fresh"]:
+        runner.compose("down", "--remove-orphans", capture_output=True)
+    runner.scale(matrix, cell["replicas"], build=build)
+    ready_s = wait_ready(runner, matrix, cell["replicas"], args.ready_timeout)
+    print(f"   ✅ pronto em {ready_s:.1f}s")
+
+    timers, fault_log = schedule_faults(runner, matrix, cell["replicas"])
+    started = datetime.now()
+    collector = start_resource_collector(runner, matrix, cell, out_dir)
+    for timer in timers:
+        timer.start()
+    try:
+        code = run_k6(runner, matrix, cell, out_dir / f"{cell['id']}.json", out_dir / f"{cell['id']}.txt")
+    finally:
+        for timer in timers:
+            timer.cancel()
+        if collector is not None:
+            collector.stop()
+    if runner.dry_run:
+        return
+
+    summary = summarize(out_dir, cell, matrix)
+    summary["prometheus"] = query_prometheus(matrix) if matrix["prometheus_queries"] else {}
+    state.update(cell["id"], status="done", summary=summary, ready_seconds=ready_s,
+                 started=started.isoformat(), finished=datetime.now().isoformat(),
+                 thresholds_ok=code == 0, faults=fault_log, error=None)
+    write_report(out_dir, state)
+    latency = summary["latency"]
+    print(f"   📊 p50 {latency.get('p50', 0):.1f} ms | p95 {latency.get('p95', 0):.1f} ms | "
+          f"{summary['throughput_rps']:.1f} req/s | erros {summary['error_rate_percent']:.2f}%")
+    resources = summary.get("resources")
+    if resources and resources.get("cpu_ms_per_request") is not None:
+        per_connection = resources.get("memory_kb_per_connection")
+        print(f"   💾 CPU {resources['cpu_ms_per_request']:.2f} ms/req | memória pico "
+              f"{resources['memory_peak_mb']:.1f} MB"
+              + (f" | {per_connection:.1f} KB/conexão" if per_connection is not None else ""))
+
+
+def run_campaign(args):
+    matrix = load_matrix(args.matrix)
+    out_dir = Path(args.out or ROOT / "campanha-results" / matrix["name"]).resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    state = CampaignState(out_dir / "estado.json", matrix["name"])
+    runner = Runner(args.compose, args.k6, args.dry_run)
+    sys.path.insert(0, str(ROOT))
+
+    cells = expand_cells(matrix)
+    if args.only:
+        cells = [cell for cell in cells if cell["id"] in args.only]
+    todo = [cell for cell in cells if args.force or state.cell(cell["id"])["status"] != "done"]
+
+    print(f"🚀 CAMPANHA: {matrix['name']}")
+    print("=" * 50)
+    print(f"📁 {out_dir}")
+    print(f"🧮 {len(cells)} células, {len(cells) - len(todo)} já concluídas, {len(todo)} a executar")
+
+    build = matrix["build"] and not args.no_build
+    for index, cell in enumerate(todo, 1):
+        print(f"\n🧪 [{index}/{len(todo)}] {cell['id']}")
+        attempts = state.cell(cell["id"])["attempts"] + 1
+        if not args.dry_run:
+            state.update(cell["id"], status="running", attempts=attempts)
+        try:
+            run_cell(runner, matrix, cell, out_dir, state, args, build)
+            build = False
+        except KeyboardInterrupt:
+            state.update(cell["id"], status="pending")
+            print("\n⏹️  Interrompido: rode o mesmo comando para continuar")
+            raise SystemExit(130)
+        except (RuntimeError, ValueError, OSError) as e:
+            print(f"   ❌ {e}")
+            if not args.dry_run:
+                state.update(cell["id"], status="failed", error=str(e))
+        if matrix["cooldown_s"] and index < len(todo) and not args.dry_run:
+            time.sleep(matrix["cooldown_s"])
+
+    if args.down and not args.dry_run:
+        runner.compose("down", capture_output=True)
+
+    statuses = [state.cell(cell["id"])["status"] for cell in cells]
+    failed = [cell["id"] for cell, status in zip(cells, statuses) if status != "done"]
+    print(f"\n📋 {statuses.count('done')}/{len(cells)} células concluídas")
+    if failed and not args.dry_run:
+        print(f"⚠️  Pendentes/com falha: {', '.join(failed)} (rode de novo para retomar)")
+        sys.exit(1)
+    print(f"📊 Relatório: {out_dir / 'k6_detailed_analysis.json'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Campanha de testes k6 (protocolo × VUs × réplicas)")
+    parser.add_argument("matrix", help="matriz JSON (ver k6-tests/campanhas/)")
+    parser.add_argument("--out", help="diretório da campanha (padrão: campanha-results/<nome>)")
+    parser.add_argument("--only", nargs="+", help="executa só estas células")
+    parser.add_argument("--force", action="store_true", help="refaz células já concluídas")
+    parser.add_argument("--ready-timeout", type=float, default=180.0, help="espera máxima pela prontidão (s)")
+    parser.add_argument("--no-build", action="store_true", help="não reconstrói as imagens na primeira célula")
+    parser.add_argument("--down", action="store_true", help="derruba a stack ao final")
+    parser.add_argument("--compose", default="docker compose", help="comando do compose")
+    parser.add_argument("--k6", default="k6", help="comando do k6")
+    parser.add_argument("--dry-run", action="store_true", help="só mostra os comandos")
+    run_campaign(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
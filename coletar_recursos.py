@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Coletor de recursos do Serviço B durante um teste (Linux, cgroup v2)
+
+Amostra, a cada intervalo, CPU, memória, rede, processos e conexões TCP dos
+containers do service-b (pelo cgroup de cada container) ou de processos
+locais (--pid, via /proc), e grava uma série temporal compacta em CSV ao lado
+do resultado do k6: `<teste>.json` -> `<teste>-recursos.csv`. Os contadores
+são gravados acumulados (cpu_usec, throttled_usec, rx_bytes, tx_bytes); a
+análise usa as diferenças. O analyze_k6_logs_fixed.py encontra o CSV pelo nome
+e calcula CPU por requisição e memória por conexão de cada execução.
+
+Colunas: t (epoch s), target, cpu_usec, throttled_usec, mem_bytes, rx_bytes,
+tx_bytes, pids, connections.
+
+- Containers: cgroup v2 (cpu.stat, memory.current, pids.current); rede e
+  conexões pelo namespace de rede do container (/proc/<pid>/net).
+- --pid: o processo e seus descendentes (/proc/<pid>/stat e status); a rede é
+  a do host (não só do processo) e as conexões são os sockets TCP
+  estabelecidos do próprio processo.
+
+Exemplos:
+    python coletar_recursos.py --compose-service service-b --for k6-results/rest.json --duration 180
+    python coletar_recursos.py --pid 12345 --out local-recursos.csv --interval 0.5
+"""
+
+import argparse
+import csv
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+COLUMNS = ("t", "target", "cpu_usec", "throttled_usec", "mem_bytes", "rx_bytes", "tx_bytes",
+           "pids", "connections")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+TCP_ESTABLISHED = "01"
+
+
+def resource_path(k6_file):
+    """rest.json -> rest-recursos.csv (mesmo diretório)"""
+    k6_file = Path(k6_file)
+    return k6_file.with_name(f"{k6_file.stem}-recursos.csv")
+
+
+def _read(path):
+    with open(path, "r", encoding="ascii") as f:
+        return f.read()
+
+
+def _keyed(path):
+    return dict(line.split()[:2] for line in _read(path).splitlines() if line.strip())
+
+
+def cgroup_dir(pid):
+    """Diretório do cgroup v2 do processo (linha '0::<caminho>' de /proc/<pid>/cgroup)"""
+    for line in _read(f"/proc/{pid}/cgroup").splitlines():
+        if line.startswith("0::"):
+            return CGROUP_ROOT / line[3:].lstrip("/")
+    raise OSError(f"processo {pid} fora de um cgroup v2")
+
+
+def net_bytes(pid):
+    """(rx, tx) somados das interfaces do namespace de rede do processo, sem a loopback"""
+    rx = tx = 0
+    for line in _read(f"/proc/{pid}/net/dev").splitlines()[2:]:
+        name, values = line.split(":", 1)
+        if name.strip() == "lo":
+            continue
+        fields = values.split()
+        rx += int(fields[0])
+        tx += int(fields[8])
+    return rx, tx
+
+
+def established_inodes(pid):
+    """Inodes dos sockets TCP estabelecidos visíveis no namespace de rede do processo"""
+    inodes = set()
+    for name in ("tcp", "tcp6"):
+        try:
+            lines = _read(f"/proc/{pid}/net/{name}").splitlines()[1:]
+        except OSError:
+            continue
+        for line in lines:
+            fields = line.split()
+            if fields[3] == TCP_ESTABLISHED:
+                inodes.add(fields[9])
+    return inodes
+
+
+def socket_inodes(pid):
+    inodes = set()
+    try:
+        for fd in os.listdir(f"/proc/{pid}/fd"):
+            try:
+                link = os.readlink(f"/proc/{pid}/fd/{fd}")
+            except OSError:
+                continue
+            if link.startswith("socket:["):
+                inodes.add(link[8:-1])
+    except OSError:
+        pass
+    return inodes
+
+
+def descendants(pid):
+    """pid e todos os descendentes (ex.: o processo gRPC do `python -m app`)"""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            stat = _read(f"/proc/{entry}/stat")
+        except OSError:
+            continue
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    found, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        found.append(current)
+        pending.extend(children.get(current, []))
+    return found
+
+
+class ContainerTarget:
+    """Container docker: cgroup v2 do container e namespace de rede do processo principal"""
+
+    def __init__(self, container_id, docker="docker"):
+        self.container_id = container_id
+        self.docker = docker
+        self.name = self._inspect("{{.Name}}").lstrip("/")
+        self.refresh()
+
+    def _inspect(self, template):
+        completed = subprocess.run([self.docker, "inspect", "-f", template, self.container_id],
+                                   capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise OSError(f"docker inspect {self.container_id}: {completed.stderr.strip()}")
+        return completed.stdout.strip()
+
+    def refresh(self):
+        """Relê o pid (muda se o container for reiniciado durante o teste)"""
+        self.pid = int(self._inspect("{{.State.Pid}}"))
+        if self.pid == 0:
+            raise OSError(f"container {self.name} parado")
+        self.cgroup = cgroup_dir(self.pid)
+
+    def sample(self):
+        cpu = _keyed(self.cgroup / "cpu.stat")
+        rx, tx = net_bytes(self.pid)
+        return {
+            "cpu_usec": int(cpu["usage_usec"]),
+            "throttled_usec": int(cpu.get("throttled_usec", 0)),
+            "mem_bytes": int(_read(self.cgroup / "memory.current")),
+            "rx_bytes": rx,
+            "tx_bytes": tx,
+            "pids": int(_read(self.cgroup / "pids.current")),
+            "connections": len(established_inodes(self.pid)),
+        }
+
+
+class ProcessTarget:
+    """Processo local e descendentes, por /proc (sem cgroup próprio)"""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.name = f"pid-{pid}"
+
+    def refresh(self):
+        os.kill(self.pid, 0)
+
+    def sample(self):
+        cpu_ticks = mem_pages = 0
+        sockets = set()
+        pids = descendants(self.pid)
+        for pid in pids:
+            try:
+                fields = _read(f"/proc/{pid}/stat").rsplit(")", 1)[1].split()
+                rss_pages = int(_read(f"/proc/{pid}/statm").split()[1])
+            except OSError:
+                continue
+            # utime e stime (campos 14 e 15 do stat)
+            cpu_ticks += int(fields[11]) + int(fields[12])
+            mem_pages += rss_pages
+            sockets |= socket_inodes(pid)
+        rx, tx = net_bytes(self.pid)
+        return {
+            "cpu_usec": cpu_ticks * 1_000_000 // CLOCK_TICKS,
+            "throttled_usec": 0,
+            "mem_bytes": mem_pages * PAGE_SIZE,
+            "rx_bytes": rx,
+            "tx_bytes": tx,
+            "pids": len(pids),
+            "connections": len(sockets & established_inodes(self.pid)),
+        }
+
+
+def compose_containers(service, compose_cmd=("docker", "compose"), cwd=None):
+    completed = subprocess.run(list(compose_cmd) + ["ps", "-q", service], capture_output=True,
+                               text=True, cwd=cwd)
+    if completed.returncode != 0:
+        raise OSError(f"docker compose ps {service}: {completed.stderr.strip()}")
+    return completed.stdout.split()
+
+
+class ResourceCollector:
+    """Amostra os alvos numa thread e grava o CSV a cada intervalo"""
+
+    def __init__(self, targets, out_path, interval=1.0):
+        self.targets = targets
+        self.out_path = Path(out_path)
+        self.interval = interval
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="resource-collector", daemon=True)
+
+    def start(self):
+        self._file = open(self.out_path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(COLUMNS)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._file.close()
+
+    def sample_once(self):
+        now = round(time.time(), 3)
+        for target in self.targets:
+            try:
+                values = target.sample()
+            except (OSError, KeyError, ValueError):
+                # Container reiniciado (teste de resiliência) ou processo encerrado
+                try:
+                    target.refresh()
+                except OSError:
+                    pass
+                continue
+            self._writer.writerow([now, target.name] + [values[column] for column in COLUMNS[2:]])
+        self._file.flush()
+        self.samples += 1
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            self.sample_once()
+            next_tick += self.interval
+            self._stop.wait(max(0.0, next_tick - time.monotonic()))
+        # Última amostra no fim do teste, para fechar as diferenças
+        self.sample_once()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Série temporal de recursos do Serviço B (cgroup v2 / /proc)")
+    parser.add_argument("--compose-service", help="containers deste serviço do docker compose")
+    parser.add_argument("--container", action="append", default=[], help="id ou nome de container")
+    parser.add_argument("--pid", type=int, action="append", default=[], help="processo local (e descendentes)")
+    parser.add_argument("--for", dest="k6_file", help="resultado k6: grava <nome>-recursos.csv ao lado")
+    parser.add_argument("--out", help="arquivo CSV de saída")
+    parser.add_argument("--interval", type=float, default=1.0, help="intervalo entre amostras (s)")
+    parser.add_argument("--duration", type=float, help="para após N segundos (padrão: até Ctrl+C)")
+    args = parser.parse_args()
+
+    containers = list(args.container)
+    if args.compose_service:
+        containers += compose_containers(args.compose_service)
+    targets = [ContainerTarget(c) for c in containers] + [ProcessTarget(pid) for pid in args.pid]
+    if not targets:
+        parser.error("informe --compose-service, --container ou --pid")
+    out = args.out or (resource_path(args.k6_file) if args.k6_file else "recursos.csv")
+
+    print(f"📈 Coletando {', '.join(t.name for t in targets)} a cada {args.interval}s -> {out}")
+    collector = ResourceCollector(targets, out, args.interval).start()
+    try:
+        if args.duration:
+            time.sleep(args.duration)
+        else:
+            while True:
+                time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.stop()
+    print(f"✅ {collector.samples} amostras gravadas em {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gerador de resultados k6 sintéticos (NDJSON do `k6 --out json`)
+
+Produz arquivos no mesmo formato lido pelo analyze_k6_logs_fixed.py, com o
+tamanho que for preciso (milhões de pontos) para medir e proteger o desempenho
+da análise. O perfil segue um teste real: estágios de rampa de VUs, latência
+que cresce com a carga, taxa de erro maior no pico e mistura de status de erro.
+
+Exemplos:
+    python gerar_k6_sintetico.py --points 1000000 --out rest_monitoring_synth.json
+    python gerar_k6_sintetico.py --points 5M --protocol grpc --stages 30s:50,120s:500,30s:0 \\
+        --error-rate 0.02 --error-mix 503:0.7,500:0.3 --tag testid=synth --out grpc.json
+"""
+
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+# Métricas emitidas por iteração, na ordem em que o k6 as grava
+ITERATION_METRICS = (
+    "http_reqs", "http_req_duration", "http_req_waiting", "http_req_failed",
+    "data_sent", "data_received", "checks", "iterations", "iteration_duration",
+)
+METRIC_TYPES = {
+    "http_reqs": ("counter", "default"),
+    "http_req_duration": ("trend", "time"),
+    "http_req_waiting": ("trend", "time"),
+    "http_req_failed": ("rate", "default"),
+    "data_sent": ("counter", "data"),
+    "data_received": ("counter", "data"),
+    "checks": ("rate", "default"),
+    "iterations": ("counter", "default"),
+    "iteration_duration": ("trend", "time"),
+    "vus": ("gauge", "default"),
+}
+# Métricas com as tags da requisição; as demais só levam o cenário
+REQUEST_METRICS = {"http_reqs", "http_req_duration", "http_req_waiting", "http_req_failed",
+                   "data_sent", "data_received", "checks"}
+
+URLS = {
+    "rest": ("POST", "http://localhost:3000/api/process", "HTTP/1.1"),
+    "grpc": ("POST", "http://localhost:3000/grpc/process", "HTTP/1.1"),
+}
+
+
+def parse_count(value):
+    """'1M', '500k', '10000' -> int"""
+    value = str(value).strip().lower()
+    factor = {"k": 1_000, "m": 1_000_000, "g": 1_000_000_000}.get(value[-1:], 1)
+    return int(float(value[:-1] if factor > 1 else value) * factor)
+
+
+def parse_stages(spec):
+    """'30s:100,60s:300,30s:0' -> [(30, 100), (60, 300), (30, 0)] (duração s, VUs alvo)"""
+    stages = []
+    for item in spec.split(","):
+        duration, target = item.split(":")
+        seconds = float(duration[:-1]) * 60 if duration.endswith("m") else float(duration.rstrip("s"))
+        if not seconds >= 0 or int(target) < 0:
+            raise ValueError(f"estágio inválido: {item}")
+        stages.append((int(seconds), int(target)))
+    if not sum(duration for duration, _ in stages):
+        raise ValueError(f"estágios sem duração (mínimo 1s no total): {spec}")
+    return stages
+
+
+def parse_error_mix(spec):
+    """'500:0.5,503:0.3,0:0.2' -> (['500', '503', '0'], [0.5, 0.3, 0.2]) normalizado"""
+    statuses, weights = [], []
+    for item in spec.split(","):
+        status, weight = item.split(":")
+        statuses.append(status)
+        weights.append(float(weight))
+    total = sum(weights)
+    return statuses, [w / total for w in weights]
+
+
+def vus_timeline(stages):
+    """VUs ativos em cada segundo, interpolando linearmente como o ramping-vus do k6"""
+    vus = []
+    current = 0
+    for duration, target in stages:
+        if duration == 0:
+            # Estágio de 0s (ou abaixo de 1s): salto direto para o alvo, sem segundos próprios
+            current = target
+            continue
+        for second in range(duration):
+            vus.append(current + (target - current) * (second + 1) / duration)
+        current = target
+    return np.maximum(np.array(vus), 1.0)
+
+
+def _tags_json(protocol, status, extra_tags):
+    method, url, proto = URLS[protocol]
+    tags = {
+        "expected_response": "true" if status == "200" else "false",
+        "group": "",
+        "method": method,
+        "name": url,
+        "proto": proto,
+        "protocol": protocol,
+        "scenario": "default",
+        "status": status,
+        "url": url,
+    }
+    tags.update(extra_tags)
+    return json.dumps(tags, separators=(",", ":"))
+
+
+def generate(out_path, points, protocol="rest", stages="30s:100,60s:300,30s:0", base_latency_ms=105.0,
+             error_rate=0.01, error_mix="500:0.5,503:0.3,0:0.2", metrics=ITERATION_METRICS,
+             extra_tags=None, seed=42, start=None):
+    """Grava ~`points` pontos e retorna {'points': ..., 'iterations': ..., 'bytes': ...}"""
+    rng = np.random.default_rng(seed)
+    timeline = vus_timeline(parse_stages(stages))
+    statuses, status_weights = parse_error_mix(error_mix)
+    metrics = [m for m in ITERATION_METRICS if m in metrics]
+    extra_tags = extra_tags or {}
+    start = start or datetime(2025, 9, 7, tzinfo=timezone.utc)
+
+    iterations = max(1, points // (len(metrics) or 1))
+    per_second = np.floor(iterations * timeline / timeline.sum()).astype(np.int64)
+    per_second[np.argmax(timeline)] += iterations - per_second.sum()
+    peak_vus = timeline.max()
+
+    scenario_tags = '{"scenario":"default"' + "".join(
+        f',{json.dumps(k)}:{json.dumps(v)}' for k, v in extra_tags.items()) + "}"
+    tags_by_status = {status: _tags_json(protocol, status, extra_tags) for status in ["200"] + statuses}
+    payload_bytes = 311 if protocol == "rest" else 96
+
+    written = 0
+    with open(out_path, "w", encoding="utf-8", buffering=1 << 22) as out:
+        for name in metrics + ["vus"]:
+            kind, contains = METRIC_TYPES[name]
+            out.write(json.dumps({"type": "Metric", "data": {"name": name, "type": kind, "contains": contains,
+                                                             "thresholds": [], "submetrics": None},
+                                  "metric": name}) + "\n")
+
+        for second, count in enumerate(per_second):
+            load = timeline[second] / peak_vus
+            prefix = (start + timedelta(seconds=second)).strftime("%Y-%m-%dT%H:%M:%S")
+            out.write(f'{{"type":"Point","data":{{"time":"{prefix}.000000Z","value":{int(timeline[second])},'
+                      f'"tags":{scenario_tags}}},"metric":"vus"}}\n')
+            written += 1
+            if count == 0:
+                continue
+
+            # Latência log-normal que cresce com a carga; erros mais frequentes no pico
+            latency = base_latency_ms * (1 + 1.5 * load ** 2) * rng.lognormal(0.0, 0.25, count)
+            failed = rng.random(count) < error_rate * (0.5 + load)
+            error_status = rng.choice(statuses, size=count, p=status_weights)
+            micros = np.sort(rng.integers(0, 1_000_000, count))
+            received = rng.integers(180, 260, count)
+
+            lines = []
+            append = lines.append
+            for i in range(count):
+                t = f"{prefix}.{micros[i]:06d}Z"
+                is_failed = failed[i]
+                status = error_status[i] if is_failed else "200"
+                duration = latency[i]
+                values = {
+                    "http_reqs": "1",
+                    "http_req_duration": f"{duration:.4f}",
+                    "http_req_waiting": f"{duration * 0.97:.4f}",
+                    "http_req_failed": "1" if is_failed else "0",
+                    "data_sent": str(payload_bytes),
+                    "data_received": str(received[i]),
+                    "checks": "0" if is_failed else "1",
+                    "iterations": "1",
+                    "iteration_duration": f"{duration + 0.4:.4f}",
+                }
+                request_tags = tags_by_status[status]
+                for name in metrics:
+                    tags = request_tags if name in REQUEST_METRICS else scenario_tags
+                    append(f'{{"type":"Point","data":{{"time":"{t}","value":{values[name]},'
+                           f'"tags":{tags}}},"metric":"{name}"}}\n')
+            out.writelines(lines)
+            written += len(lines)
+        size = out.tell()
+
+    return {"points": written, "iterations": int(per_second.sum()), "bytes": size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera resultados k6 NDJSON sintéticos")
+    parser.add_argument("--points", default="1M", help="número aproximado de pontos (aceita k/M)")
+    parser.add_argument("--out", default="k6_synthetic.json")
+    parser.add_argument("--protocol", choices=sorted(URLS), default="rest")
+    parser.add_argument("--stages", default="30s:100,60s:300,30s:0",
+                        help="rampa de VUs como no k6: duração:alvo,...")
+    parser.add_argument("--base-latency-ms", type=float, default=105.0)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--error-mix", default="500:0.5,503:0.3,0:0.2",
+                        help="status:peso dos erros (0 = falha de conexão)")
+    parser.add_argument("--metrics", nargs="+", choices=ITERATION_METRICS, default=list(ITERATION_METRICS))
+    parser.add_argument("--tag", action="append", default=[], help="tag extra chave=valor")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    try:
+        parse_stages(args.stages)
+    except ValueError as e:
+        parser.error(f"--stages: {e}")
+
+    stats = generate(args.out, parse_count(args.points), args.protocol, args.stages, args.base_latency_ms,
+                     args.error_rate, args.error_mix, args.metrics,
+                     dict(tag.split("=", 1) for tag in args.tag), args.seed)
+    print(f"✅ {args.out}: {stats['points']:,} pontos, {stats['iterations']:,} iterações, "
+          f"{stats['bytes'] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
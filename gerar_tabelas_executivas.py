@@ -6,6 +6,70 @@ Gerador de Tabelas Executivas para 5. Forma de Análise
 
 import pandas as pd
 import json
+from pathlib import Path
+
+def _protocol_of(filename, test):
+    """REST/gRPC pelo campo do campanha.py ou pelo nome do arquivo do k6"""
+    if test.get('protocol'):
+        return test['protocol']
+    return 'gRPC' if 'grpc' in filename.lower() else 'REST'
+
+def measured_resources_table(report_path='k6_detailed_analysis.json'):
+    """Tabela de recursos medida (coletar_recursos.py); None sem séries de recursos no relatório"""
+    path = Path(report_path)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        tests = json.load(f).get('tests', {})
+    
+    rows = []
+    for filename, test in tests.items():
+        resources = test.get('resources')
+        if not resources or resources.get('cpu_ms_per_request') is None:
+            continue
+        rows.append({
+            'protocol': _protocol_of(filename, test),
+            'cpu_ms_per_request': resources['cpu_ms_per_request'],
+            'cpu_cores_mean': resources['cpu_cores_mean'],
+            'memory_peak_mb': resources['memory_peak_mb'],
+            'memory_kb_per_connection': resources.get('memory_kb_per_connection'),
+            'network_bytes_per_request': resources['rx_bytes_per_request'] + resources['tx_bytes_per_request'],
+        })
+    if not rows:
+        return None
+    
+    # Média das execuções de cada protocolo; memória de pico é o maior pico
+    runs = pd.DataFrame(rows).groupby('protocol')
+    measured = runs.mean(numeric_only=True)
+    measured['memory_peak_mb'] = runs['memory_peak_mb'].max()
+    
+    def value(protocol, column, digits):
+        if column not in measured or protocol not in measured.index or pd.isna(measured.at[protocol, column]):
+            return None
+        return round(float(measured.at[protocol, column]), digits)
+    
+    metrics = [
+        ('CPU por Requisição (ms)', 'cpu_ms_per_request', 3),
+        ('CPU Média (núcleos)', 'cpu_cores_mean', 2),
+        ('Memória Peak (MB)', 'memory_peak_mb', 1),
+        ('Memória por Conexão (KB)', 'memory_kb_per_connection', 1),
+        ('Rede por Requisição (bytes)', 'network_bytes_per_request', 0),
+    ]
+    table = {'Recurso': [], 'REST': [], 'gRPC': [], 'Diferença': [], 'Vantagem': []}
+    for label, column, digits in metrics:
+        rest, grpc = value('REST', column, digits), value('gRPC', column, digits)
+        table['Recurso'].append(label)
+        table['REST'].append(rest)
+        table['gRPC'].append(grpc)
+        if rest is None or grpc is None:
+            table['Diferença'].append('-')
+            table['Vantagem'].append('-')
+            continue
+        # Diferença do gRPC em relação ao REST; menos recurso é melhor
+        table['Diferença'].append(f"{(grpc - rest) / rest * 100:+.1f}%" if rest else '-')
+        table['Vantagem'].append('Empate' if rest == grpc else ('REST' if rest < grpc else 'gRPC'))
+    
+    return pd.DataFrame(table)
 
 def generate_executive_tables():
     """Gera tabelas executivas formatadas para o relatório"""
@@ -58,7 +122,7 @@ def generate_executive_tables():
     
     qualitative_df = pd.DataFrame(qualitative_data)
     
-    # Tabela 5: Análise de Recursos
+    # Tabela 5: Análise de Recursos (medida por execução quando houver séries de recursos)
     resources_data = {
         'Recurso': ['CPU Utilização (%)', 'Memória Peak (MB)', 'Network I/O', 
                    'Latência Mínima (ms)', 'Latência Máxima (ms)'],
@@ -68,7 +132,9 @@ def generate_executive_tables():
         'Impacto': ['Negligível', 'Negligível', 'Menor bandwidth', 'Insignificante', 'REST melhor']
     }
     
-    resources_df = pd.DataFrame(resources_data)
+    resources_df = measured_resources_table()
+    if resources_df is None:
+        resources_df = pd.DataFrame(resources_data)
     
     return {
         'performance': performance_df,
@@ -56,9 +56,13 @@ const packageDefinition = protoLoader.loadSync(PROTO_PATH, {
 });
 
 const processingProto = grpc.loadPackageDefinition(packageDefinition).processing;
+// dns:/// resolve todas as réplicas do service-b (DNS do compose) e o round_robin
+// mantém uma conexão HTTP/2 por réplica; a lista é re-resolvida quando uma conexão
+// cai (o Serviço B encerra conexões após GRPC_MAX_CONNECTION_AGE_MS)
 const serviceB = new processingProto.ProcessingService(
-  'service-b:50052',
-  grpc.credentials.createInsecure()
+  'dns:///service-b:50052',
+  grpc.credentials.createInsecure(),
+  { 'grpc.service_config': JSON.stringify({ loadBalancingConfig: [{ round_robin: {} }] }) }
 );
 
 // Middleware para métricas HTTP
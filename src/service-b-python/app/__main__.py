@@ -1,16 +1,27 @@
 #!/bin/bash
 # Arquivo de entrada para iniciar tanto o servidor REST quanto o gRPC
 import multiprocessing
-import uvicorn
+import threading
+from app import config, lifecycle, rest_server
 from app.grpc_server import serve as serve_grpc
 
+def stop_process(process):
+    """Repassa o SIGTERM ao processo gRPC (que faz o próprio drain) sem bloquear."""
+    process.terminate()
+    stopped = threading.Event()
+    threading.Thread(target=lambda: (process.join(), stopped.set()), daemon=True).start()
+    return stopped
+
 def start_rest():
-    uvicorn.run("app.main:app", host="0.0.0.0", port=3001, reload=False)
+    # O gRPC já roda no processo dedicado abaixo; não embutir no processo REST
+    config.GRPC_EMBEDDED = False
+    rest_server.run()
 
 if __name__ == "__main__":
     # Iniciar servidor gRPC em um processo separado
     grpc_process = multiprocessing.Process(target=serve_grpc)
     grpc_process.start()
+    lifecycle.on_drain(lambda grace: stop_process(grpc_process))
     
     # Iniciar servidor REST no processo principal
     start_rest()
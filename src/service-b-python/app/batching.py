@@ -0,0 +1,93 @@
+"""
+Micro-batching em segundo plano para escritas fora do caminho da requisição.
+
+Os handlers só enfileiram itens numa fila limitada; threads de envio montam
+lotes de até `batch_size` itens ou `linger_ms` de espera e chamam `send(batch)`.
+Com a fila cheia, `full_policy` decide: `drop` descarta na hora (nunca bloqueia
+o handler) e `block` espera até `enqueue_timeout_ms` antes de descartar.
+"""
+
+import queue
+import threading
+import time
+
+import structlog
+
+logger = structlog.get_logger()
+
+_STOP = object()
+
+
+class MicroBatcher:
+    def __init__(self, send, name, queue_size=10000, batch_size=500, linger_ms=20,
+                 full_policy="drop", enqueue_timeout_ms=5, on_drop=None, workers=1):
+        self.send = send
+        self.batch_size = batch_size
+        self.linger = linger_ms / 1000
+        self.block = full_policy == "block"
+        self.enqueue_timeout = enqueue_timeout_ms / 1000
+        self.on_drop = on_drop
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+
+    def qsize(self):
+        return self._queue.qsize()
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def put(self, item):
+        """Enfileira sem bloquear o handler; retorna False se o item foi descartado."""
+        try:
+            if self.block:
+                self._queue.put(item, timeout=self.enqueue_timeout)
+            else:
+                self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            if self.on_drop is not None:
+                self.on_drop()
+            return False
+
+    def stop(self, timeout=5.0):
+        """Envia o que ainda está na fila (até `timeout`) e encerra as threads."""
+        deadline = time.monotonic() + timeout
+        for _ in self._threads:
+            try:
+                self._queue.put(_STOP, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                self.send(batch)
+            except Exception as e:
+                # Um lote com erro não pode encerrar a thread: os seguintes ficariam na fila
+                logger.error("batch_send_error", thread=threading.current_thread().name,
+                             error=str(e), batch=len(batch))
@@ -0,0 +1,187 @@
+"""
+Backends de mensageria do Serviço B.
+
+Produção: `KafkaBroker` (kafka-python contra o `kafka` do docker-compose) ou
+`InMemoryBroker`, o substituto em processo para testes, benchmarks e execução
+local sem Kafka: um log por tópico em memória com offsets e commits por grupo.
+Consumo: `KafkaSource` e `InMemorySource`, com a mesma interface
+(poll / commit / lag / close).
+"""
+
+import threading
+import time
+from typing import Dict, List, Tuple
+
+
+class ProduceError(Exception):
+    """Parte do lote não foi confirmada pelo broker; `delivered` registros foram."""
+
+    def __init__(self, failed, total, cause):
+        super().__init__(f"{failed} of {total} records failed: {cause!r}")
+        self.failed = failed
+        self.delivered = total - failed
+
+
+class InMemoryBroker:
+    """Broker em processo: um log append-only por tópico (partição única)."""
+
+    def __init__(self):
+        self._logs: Dict[str, List[bytes]] = {}
+        self._committed: Dict[Tuple[str, str], int] = {}
+        self._cond = threading.Condition()
+
+    def produce(self, topic, records):
+        with self._cond:
+            self._logs.setdefault(topic, []).extend(records)
+            self._cond.notify_all()
+
+    def fetch(self, topic, offset, max_records, timeout=None):
+        """Retorna até `max_records` registros a partir de `offset`, esperando até `timeout`."""
+        with self._cond:
+            log = self._logs.setdefault(topic, [])
+            if offset >= len(log) and timeout:
+                self._cond.wait_for(lambda: offset < len(self._logs[topic]), timeout)
+            return log[offset:offset + max_records]
+
+    def end_offset(self, topic):
+        with self._cond:
+            return len(self._logs.get(topic, ()))
+
+    def commit(self, group, topic, offset):
+        with self._cond:
+            self._committed[(group, topic)] = offset
+
+    def committed(self, group, topic):
+        with self._cond:
+            return self._committed.get((group, topic), 0)
+
+    def records(self, topic):
+        with self._cond:
+            return list(self._logs.get(topic, ()))
+
+    def close(self):
+        pass
+
+
+class KafkaBroker:
+    """Produção em lotes para o Kafka real (kafka-python).
+
+    O produtor conecta no primeiro envio, na thread do publicador, e não no
+    construtor: o serviço sobe mesmo com o Kafka fora do ar. Uma conexão que
+    falha é tentada de novo com backoff exponencial; até lá `produce` falha na
+    hora e o lote conta em kafka_publish_errors_total (ver app.publisher).
+
+    O flush() do kafka-python não levanta quando um registro falha (erro do broker,
+    timeout, registro grande demais): a falha só aparece no futuro de cada send(),
+    que `produce` confere depois do flush."""
+
+    def __init__(self, bootstrap_servers, client_id="service-b", backoff_s=0.5, max_backoff_s=30.0,
+                 delivery_timeout_s=30.0):
+        self.bootstrap_servers = bootstrap_servers
+        self.client_id = client_id
+        self.delivery_timeout = delivery_timeout_s
+        self.producer = None
+        self._initial_backoff = backoff_s
+        self._backoff = backoff_s
+        self._max_backoff = max_backoff_s
+        self._retry_at = 0.0
+
+    def _connect(self):
+        if self.producer is not None:
+            return self.producer
+        now = time.monotonic()
+        if now < self._retry_at:
+            raise ConnectionError(f"kafka unavailable, next attempt in {self._retry_at - now:.1f}s")
+        from kafka import KafkaProducer
+
+        try:
+            # O lote já é montado pelo ResultPublisher; o produtor só envia e confirma
+            self.producer = KafkaProducer(
+                bootstrap_servers=self.bootstrap_servers,
+                client_id=self.client_id,
+                acks=1,
+                linger_ms=0,
+            )
+        except Exception:
+            self._retry_at = time.monotonic() + self._backoff
+            self._backoff = min(self._backoff * 2, self._max_backoff)
+            raise
+        self._backoff = self._initial_backoff
+        return self.producer
+
+    def produce(self, topic, records):
+        """Envia e espera as confirmações; ProduceError se algum registro falhou."""
+        producer = self._connect()
+        futures = [producer.send(topic, record) for record in records]
+        producer.flush(timeout=self.delivery_timeout)
+        failed, cause = 0, None
+        for future in futures:
+            try:
+                future.get(timeout=self.delivery_timeout)
+            except Exception as e:  # KafkaError: resposta do broker, timeout, tamanho
+                failed += 1
+                cause = cause or e
+        if failed:
+            raise ProduceError(failed, len(records), cause)
+
+    def close(self):
+        if self.producer is not None:
+            self.producer.close()
+            self.producer = None
+
+
+class InMemorySource:
+    """Consumidor de um tópico do InMemoryBroker com commit explícito de offsets."""
+
+    def __init__(self, broker, topic, group):
+        self.broker = broker
+        self.topic = topic
+        self.group = group
+        self.position = broker.committed(group, topic)
+
+    def poll(self, max_records, timeout):
+        records = self.broker.fetch(self.topic, self.position, max_records, timeout)
+        self.position += len(records)
+        return records
+
+    def commit(self):
+        self.broker.commit(self.group, self.topic, self.position)
+
+    def lag(self):
+        return self.broker.end_offset(self.topic) - self.position
+
+    def close(self):
+        pass
+
+
+class KafkaSource:
+    """Consumidor kafka-python sem auto-commit: o commit é feito por lote processado."""
+
+    def __init__(self, bootstrap_servers, topic, group, max_poll_records=500):
+        from kafka import KafkaConsumer
+
+        self.consumer = KafkaConsumer(
+            topic,
+            bootstrap_servers=bootstrap_servers,
+            group_id=group,
+            enable_auto_commit=False,
+            auto_offset_reset="earliest",
+            max_poll_records=max_poll_records,
+        )
+
+    def poll(self, max_records, timeout):
+        batches = self.consumer.poll(timeout_ms=int(timeout * 1000), max_records=max_records)
+        return [record.value for records in batches.values() for record in records]
+
+    def commit(self):
+        self.consumer.commit()
+
+    def lag(self):
+        partitions = list(self.consumer.assignment())
+        if not partitions:
+            return 0
+        end_offsets = self.consumer.end_offsets(partitions)
+        return sum(max(0, end_offsets[tp] - self.consumer.position(tp)) for tp in partitions)
+
+    def close(self):
+        self.consumer.close()
@@ -0,0 +1,204 @@
+"""
+Cliente do ProcessingService com balanceamento de carga no lado do cliente.
+
+Um único canal gRPC para `service-b:50052` fica preso à réplica que o DNS
+devolveu primeiro: todo o tráfego HTTP/2 vai para uma conexão só e réplicas
+novas não recebem nada. `ProcessingClient` resolve o nome (no compose o DNS
+devolve um registro A por réplica, como um serviço headless), mantém um
+subcanal por endereço e escolhe um por chamada:
+
+- `round_robin`: revezamento entre os subcanais saudáveis;
+- `least_outstanding`: o subcanal com menos chamadas em andamento;
+- `least_loaded`: o subcanal com menor carga reportada pela própria réplica
+  (em andamento + fila do `endpoint-load-metrics` da última resposta, ver
+  app.load_report) somada às chamadas em andamento deste cliente;
+- `pick_first`: sempre o primeiro endereço (o comportamento de um canal simples,
+  útil como referência).
+
+O nome é re-resolvido a cada `resolve_interval` segundos: endereços novos ganham
+subcanal e os que sumiram são fechados depois de concluir o que está em
+andamento. Subcanais em TRANSIENT_FAILURE saem da escolha enquanto houver outros.
+
+Uso:
+    client = ProcessingClient("service-b:50052", policy="least_outstanding")
+    response = client.process(processing_pb2.ProcessRequest(field1="x"), timeout=1)
+"""
+
+import socket
+import threading
+
+import grpc
+import structlog
+
+from app import load_report
+from app.generated import processing_pb2_grpc
+
+logger = structlog.get_logger()
+
+POLICIES = ("round_robin", "least_outstanding", "least_loaded", "pick_first")
+
+_UNHEALTHY = (grpc.ChannelConnectivity.TRANSIENT_FAILURE, grpc.ChannelConnectivity.SHUTDOWN)
+
+
+def resolve(target):
+    """Todos os endereços de `host:port` (um por registro A/AAAA), em ordem estável."""
+    host, _, port = target.rpartition(":")
+    host = host.strip("[]")
+    addresses = []
+    for family, _, _, _, sockaddr in socket.getaddrinfo(host, int(port), type=socket.SOCK_STREAM):
+        ip = sockaddr[0]
+        address = f"[{ip}]:{port}" if family == socket.AF_INET6 else f"{ip}:{port}"
+        if address not in addresses:
+            addresses.append(address)
+    return sorted(addresses)
+
+
+class Subchannel:
+    """Canal dedicado a um endereço, com contagem de chamadas em andamento."""
+
+    def __init__(self, address, options):
+        self.address = address
+        # Pool local: cada subcanal abre sua própria conexão, mesmo com endereços repetidos
+        self.channel = grpc.insecure_channel(
+            address, options=[("grpc.use_local_subchannel_pool", 1)] + list(options))
+        self.stub = processing_pb2_grpc.ProcessingServiceStub(self.channel)
+        self.state = grpc.ChannelConnectivity.IDLE
+        self.outstanding = 0
+        self.calls = 0
+        self.failures = 0
+        self.load = {}
+        self.retired = False
+        self.channel.subscribe(self._on_state, try_to_connect=True)
+
+    def _on_state(self, state):
+        self.state = state
+
+    def healthy(self):
+        return self.state not in _UNHEALTHY
+
+    def update_load(self, call):
+        for key, value in call.trailing_metadata() or ():
+            if key == load_report.METADATA_KEY:
+                self.load = load_report.parse(value)
+
+    def load_score(self):
+        """Em andamento + fila reportados pela réplica, mais o que este cliente enviou depois."""
+        return (self.load.get("in_flight", 0.0) + self.load.get("queue_depth", 0.0) + self.outstanding,
+                self.load.get("cpu_utilization", 0.0))
+
+    def close(self):
+        self.channel.unsubscribe(self._on_state)
+        self.channel.close()
+
+
+class ProcessingClient:
+    def __init__(self, target, policy="round_robin", resolve_interval=30.0, options=(),
+                 resolver=resolve):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown policy: {policy} (expected one of {', '.join(POLICIES)})")
+        self.target = target
+        self.policy = policy
+        self.options = options
+        self.resolver = resolver
+        self._lock = threading.Lock()
+        self._subchannels = []
+        self._next = 0
+        self._stopped = threading.Event()
+        self.refresh()
+        self._thread = None
+        if resolve_interval:
+            self._thread = threading.Thread(target=self._resolve_loop, args=(resolve_interval,),
+                                            name="processing-client-resolver", daemon=True)
+            self._thread.start()
+
+    def refresh(self):
+        """Re-resolve o alvo e ajusta os subcanais; mantém os atuais se o DNS falhar."""
+        try:
+            addresses = self.resolver(self.target)
+        except OSError as e:
+            logger.warning("processing_client_resolve_error", target=self.target, error=str(e))
+            return
+        if not addresses:
+            return
+        with self._lock:
+            current = {sub.address: sub for sub in self._subchannels}
+            self._subchannels = [current.get(address) or Subchannel(address, self.options)
+                                 for address in addresses]
+            removed = [sub for address, sub in current.items() if address not in addresses]
+            for sub in removed:
+                sub.retired = True
+            idle = [sub for sub in removed if sub.outstanding == 0]
+        for sub in idle:
+            sub.close()
+        if removed or len(current) != len(addresses):
+            logger.info("processing_client_resolved", target=self.target, addresses=addresses)
+
+    def _resolve_loop(self, interval):
+        while not self._stopped.wait(interval):
+            self.refresh()
+
+    def _pick(self):
+        with self._lock:
+            subchannels = [sub for sub in self._subchannels if sub.healthy()] or self._subchannels
+            if not subchannels:
+                raise LookupError(f"no addresses resolved for {self.target}")
+            if self.policy == "pick_first":
+                sub = subchannels[0]
+            else:
+                start = self._next % len(subchannels)
+                self._next += 1
+                if self.policy == "round_robin":
+                    sub = subchannels[start]
+                else:
+                    # Empates desfeitos a partir de uma posição rotativa
+                    rotated = subchannels[start:] + subchannels[:start]
+                    if self.policy == "least_loaded":
+                        sub = min(rotated, key=Subchannel.load_score)
+                    else:
+                        sub = min(rotated, key=lambda s: s.outstanding)
+            sub.outstanding += 1
+        return sub
+
+    def process(self, request, timeout=None, metadata=None):
+        """ProcessData na réplica escolhida pela política."""
+        sub = self._pick()
+        try:
+            if self.policy != "least_loaded":
+                return sub.stub.ProcessData(request, timeout=timeout, metadata=metadata)
+            response, call = sub.stub.ProcessData.with_call(request, timeout=timeout, metadata=metadata)
+            sub.update_load(call)
+            return response
+        except grpc.RpcError as e:
+            sub.failures += 1
+            if self.policy == "least_loaded" and isinstance(e, grpc.Call):
+                sub.update_load(e)
+            raise
+        finally:
+            with self._lock:
+                sub.outstanding -= 1
+                sub.calls += 1
+                close = sub.retired and sub.outstanding == 0
+            if close:
+                sub.close()
+
+    def stats(self):
+        with self._lock:
+            return {sub.address: {"calls": sub.calls, "failures": sub.failures,
+                                  "outstanding": sub.outstanding, "state": sub.state.name,
+                                  "load": dict(sub.load)}
+                    for sub in self._subchannels}
+
+    def close(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            subchannels, self._subchannels = self._subchannels, []
+        for sub in subchannels:
+            sub.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,270 @@
+"""
+Compressão e limites de payload do Serviço B.
+
+REST: middleware ASGI que descomprime corpos com Content-Encoding gzip/zstd
+(respeitando REST_MAX_BODY_BYTES nos bytes recebidos, com ou sem Content-Length,
+e também após descomprimir; fluxo truncado é 400) e comprime respostas a partir
+de REST_COMPRESSION_MIN_SIZE quando o cliente aceita a codificação.
+gRPC: a compressão é feita pelo próprio gRPC (gzip/deflate); aqui ficam só os
+contadores de bytes. zstd não é suportado pelo grpcio, apenas no REST.
+
+Métrica `payload_bytes_total{protocol, direction, stage}`: `decoded` é o tamanho
+do payload em si e `wire` o tamanho trafegado (após compressão). No gRPC só o
+`decoded` é visível em Python, contado com GRPC_PAYLOAD_METRICS_ENABLED=1.
+"""
+
+import gzip
+import threading
+import zlib
+
+import structlog
+from prometheus_client import Counter
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+try:
+    import zstandard
+except ImportError:  # zstd é opcional (pip install zstandard)
+    zstandard = None
+
+logger = structlog.get_logger()
+
+PAYLOAD_BYTES = Counter(
+    'payload_bytes_total',
+    'Payload bytes by protocol, direction and stage (wire/decoded)',
+    ['protocol', 'direction', 'stage']
+)
+
+REST_IN_WIRE = PAYLOAD_BYTES.labels(protocol='rest', direction='in', stage='wire')
+REST_IN_DECODED = PAYLOAD_BYTES.labels(protocol='rest', direction='in', stage='decoded')
+REST_OUT_WIRE = PAYLOAD_BYTES.labels(protocol='rest', direction='out', stage='wire')
+REST_OUT_DECODED = PAYLOAD_BYTES.labels(protocol='rest', direction='out', stage='decoded')
+GRPC_IN_DECODED = PAYLOAD_BYTES.labels(protocol='grpc', direction='in', stage='decoded')
+GRPC_OUT_DECODED = PAYLOAD_BYTES.labels(protocol='grpc', direction='out', stage='decoded')
+
+SUPPORTED_ENCODINGS = ("gzip", "zstd") if zstandard is not None else ("gzip",)
+
+
+class PayloadTooLarge(Exception):
+    pass
+
+
+class TruncatedBody(ValueError):
+    """Fluxo comprimido terminou antes do fim do frame/membro."""
+
+
+# Compressores zstd reutilizados por thread (criar um custa ~30 µs por chamada)
+_zstd = threading.local()
+
+
+def _zstd_compressor(level):
+    compressors = getattr(_zstd, "compressors", None)
+    if compressors is None:
+        compressors = _zstd.compressors = {}
+    compressor = compressors.get(level)
+    if compressor is None:
+        compressor = compressors[level] = zstandard.ZstdCompressor(level=level)
+    return compressor
+
+
+def compress(encoding, data, level=6):
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if encoding == "zstd":
+        return _zstd_compressor(level).compress(data)
+    raise ValueError(f"unsupported encoding: {encoding}")
+
+
+# Entrada zstd por chamada ao decompressobj: limita a saída intermediária antes da checagem
+ZSTD_INPUT_CHUNK = 512
+
+
+def decompress(encoding, data, max_size):
+    """Descomprime sem nunca produzir muito mais que `max_size` bytes; fluxo truncado
+    (sem o fim do membro gzip ou do frame zstd) gera TruncatedBody."""
+    if encoding == "gzip":
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        out = decoder.decompress(data, max_size + 1)
+        if len(out) > max_size or decoder.unconsumed_tail:
+            raise PayloadTooLarge()
+        if not decoder.eof:
+            raise TruncatedBody("gzip stream ended before end of member")
+        return out
+    if encoding == "zstd":
+        decoder = zstandard.ZstdDecompressor().decompressobj()
+        chunks = []
+        size = 0
+        for offset in range(0, len(data), ZSTD_INPUT_CHUNK):
+            chunk = decoder.decompress(data[offset:offset + ZSTD_INPUT_CHUNK])
+            size += len(chunk)
+            if size > max_size:
+                raise PayloadTooLarge()
+            chunks.append(chunk)
+            if decoder.eof:
+                break
+        if not decoder.eof:
+            raise TruncatedBody("zstd stream ended before end of frame")
+        return b"".join(chunks)
+    raise ValueError(f"unsupported encoding: {encoding}")
+
+
+def accepts_encoding(accept_encoding, encoding):
+    """Se o Accept-Encoding aceita `encoding`: o nome explícito vale antes do `*`
+    (`*` cobre as codificações não listadas; `q=0` recusa)."""
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip()
+        if name:
+            accepted[name] = params.strip().replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    if encoding in accepted:
+        return accepted[encoding]
+    return accepted.get("*", False)
+
+
+class CompressionMiddleware:
+    """Descompressão de requisições, compressão de respostas e limite de corpo."""
+
+    def __init__(self, app, encoding="gzip", minimum_size=1024, level=6, max_body_size=4 * 1024 * 1024):
+        if encoding not in ("none",) + SUPPORTED_ENCODINGS:
+            logger.warning("compression_unavailable", requested=encoding, fallback="gzip")
+            encoding = "gzip"
+        self.app = app
+        self.encoding = None if encoding == "none" else encoding
+        self.minimum_size = minimum_size
+        self.level = level
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+            await JSONResponse({"detail": "payload too large"}, status_code=413)(scope, receive, send)
+            return
+
+        content_encoding = headers.get("content-encoding", "identity").strip().lower()
+        if content_encoding not in ("identity", ""):
+            if content_encoding not in SUPPORTED_ENCODINGS:
+                await JSONResponse({"detail": f"unsupported content-encoding: {content_encoding}"},
+                                   status_code=415)(scope, receive, send)
+                return
+            body = await _read_body(receive, self.max_body_size)
+            if body is None:
+                await JSONResponse({"detail": "payload too large"}, status_code=413)(scope, receive, send)
+                return
+            try:
+                decoded = decompress(content_encoding, body, self.max_body_size)
+            except PayloadTooLarge:
+                await JSONResponse({"detail": "payload too large"}, status_code=413)(scope, receive, send)
+                return
+            except Exception:
+                await JSONResponse({"detail": "invalid compressed body"}, status_code=400)(scope, receive, send)
+                return
+            REST_IN_WIRE.inc(len(body))
+            REST_IN_DECODED.inc(len(decoded))
+            scope = dict(scope)
+            scope["headers"] = [
+                (k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")
+            ] + [(b"content-length", str(len(decoded)).encode())]
+            receive = _replay(decoded, receive)
+        else:
+            # Sem Content-Length (chunked) ou com um valor falso: o limite vale para o recebido
+            receive = _counting(receive, self.max_body_size)
+
+        encoding = self.encoding
+        if encoding is not None and not accepts_encoding(headers.get("accept-encoding", ""), encoding):
+            encoding = None
+        started = False
+
+        async def tracked(message):
+            nonlocal started
+            started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, self._sender(tracked, encoding))
+        except PayloadTooLarge:
+            if started:
+                raise
+            await JSONResponse({"detail": "payload too large"}, status_code=413)(scope, receive, send)
+
+    def _sender(self, send, encoding):
+        start = None
+
+        async def sender(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            REST_OUT_DECODED.inc(len(body))
+            if start is not None:
+                response_headers = MutableHeaders(raw=start["headers"])
+                if (encoding is not None and not more_body and len(body) >= self.minimum_size
+                        and "content-encoding" not in response_headers):
+                    body = compress(encoding, body, self.level)
+                    response_headers["Content-Encoding"] = encoding
+                    response_headers["Content-Length"] = str(len(body))
+                    response_headers.add_vary_header("Accept-Encoding")
+                    message = {"type": "http.response.body", "body": body, "more_body": False}
+                await send(start)
+                start = None
+            REST_OUT_WIRE.inc(len(body))
+            await send(message)
+
+        return sender
+
+
+async def _read_body(receive, limit):
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _replay(body, receive):
+    sent = False
+
+    async def replayed():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replayed
+
+
+def _counting(receive, limit):
+    """Conta o corpo sem codificação (wire = decoded) e levanta PayloadTooLarge
+    assim que o total recebido passa de `limit`."""
+    total = 0
+
+    async def counted():
+        nonlocal total
+        message = await receive()
+        size = len(message.get("body", b""))
+        if size:
+            total += size
+            if total > limit:
+                raise PayloadTooLarge()
+            REST_IN_WIRE.inc(size)
+            REST_IN_DECODED.inc(size)
+        return message
+
+    return counted
@@ -0,0 +1,130 @@
+import os
+
+# Configuração do Serviço B via variáveis de ambiente (docker-compose `environment:`)
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+REST_HOST = os.getenv("REST_HOST", "0.0.0.0")
+REST_PORT = int(os.getenv("REST_PORT", "3001"))
+
+GRPC_PORT = int(os.getenv("GRPC_PORT", "50052"))
+GRPC_MAX_WORKERS = int(os.getenv("GRPC_MAX_WORKERS", "10"))
+# Quando verdadeiro, o servidor gRPC roda em threads do mesmo processo do FastAPI
+GRPC_EMBEDDED = env_bool("GRPC_EMBEDDED", True)
+# Porta de métricas do processo gRPC quando ele roda separado (python -m app)
+GRPC_METRICS_PORT = int(os.getenv("GRPC_METRICS_PORT", "9102"))
+
+# Endpoints /debug/profile (desligados por padrão: nenhum custo quando inativos)
+PROFILING_ENABLED = env_bool("PROFILING_ENABLED", False)
+# Porta dos endpoints de profiling do processo gRPC dedicado
+GRPC_DEBUG_PORT = int(os.getenv("GRPC_DEBUG_PORT", "9103"))
+
+# Atraso simulado do processamento em segundos (0 desliga, útil em benchmarks)
+PROCESSING_DELAY = float(os.getenv("PROCESSING_DELAY", "0.1"))
+
+# Compressão e limites de payload
+# gRPC: compressão padrão das respostas (none | gzip | deflate); o cliente ainda
+# pode pedir outra por chamada com o metadata x-response-compression
+GRPC_COMPRESSION = os.getenv("GRPC_COMPRESSION", "none")
+GRPC_MAX_MESSAGE_BYTES = int(os.getenv("GRPC_MAX_MESSAGE_BYTES", str(4 * 1024 * 1024)))
+# Bytes das mensagens gRPC em payload_bytes_total (opt-in: ByteSize() e dois contadores por chamada)
+GRPC_PAYLOAD_METRICS_ENABLED = env_bool("GRPC_PAYLOAD_METRICS_ENABLED", False)
+# REST: compressão das respostas a partir de um tamanho mínimo (none | gzip | zstd)
+REST_COMPRESSION = os.getenv("REST_COMPRESSION", "gzip")
+REST_COMPRESSION_MIN_SIZE = int(os.getenv("REST_COMPRESSION_MIN_SIZE", "1024"))
+REST_COMPRESSION_LEVEL = int(os.getenv("REST_COMPRESSION_LEVEL", "6"))
+# Limite do corpo REST, aplicado também depois de descomprimir
+REST_MAX_BODY_BYTES = int(os.getenv("REST_MAX_BODY_BYTES", str(4 * 1024 * 1024)))
+
+# Servidor REST: uvicorn (padrão, configuração original), uvicorn-fast
+# (uvloop + httptools com backlog/keep-alive ajustados) ou hypercorn
+# (HTTP/1.1 e HTTP/2 em texto claro via h2c, também sobre uvloop)
+REST_SERVER = os.getenv("REST_SERVER", "uvicorn")
+REST_BACKLOG = int(os.getenv("REST_BACKLOG", "2048"))
+REST_KEEPALIVE_TIMEOUT = int(os.getenv("REST_KEEPALIVE_TIMEOUT", "75"))
+REST_H2_MAX_CONCURRENT_STREAMS = int(os.getenv("REST_H2_MAX_CONCURRENT_STREAMS", "256"))
+
+# Opções de canal do servidor gRPC (keepalive, idade de conexão, streams, BDP)
+GRPC_KEEPALIVE_TIME_MS = int(os.getenv("GRPC_KEEPALIVE_TIME_MS", "30000"))
+GRPC_KEEPALIVE_TIMEOUT_MS = int(os.getenv("GRPC_KEEPALIVE_TIMEOUT_MS", "10000"))
+# Intervalo mínimo aceito entre pings do cliente (pings mais frequentes geram GOAWAY)
+GRPC_MIN_PING_INTERVAL_MS = int(os.getenv("GRPC_MIN_PING_INTERVAL_MS", "10000"))
+# Conexões são encerradas (GOAWAY) após essa idade, com jitter de ±10% do gRPC,
+# para redistribuir clientes entre réplicas e evitar reconexões simultâneas
+GRPC_MAX_CONNECTION_AGE_MS = int(os.getenv("GRPC_MAX_CONNECTION_AGE_MS", "300000"))
+GRPC_MAX_CONNECTION_AGE_GRACE_MS = int(os.getenv("GRPC_MAX_CONNECTION_AGE_GRACE_MS", "30000"))
+GRPC_MAX_CONNECTION_IDLE_MS = int(os.getenv("GRPC_MAX_CONNECTION_IDLE_MS", "600000"))
+GRPC_MAX_CONCURRENT_STREAMS = int(os.getenv("GRPC_MAX_CONCURRENT_STREAMS", "100"))
+GRPC_BDP_PROBE = env_bool("GRPC_BDP_PROBE", True)
+# RPCs simultâneas por servidor antes de responder RESOURCE_EXHAUSTED (0 = sem limite)
+GRPC_MAXIMUM_CONCURRENT_RPCS = int(os.getenv("GRPC_MAXIMUM_CONCURRENT_RPCS", "0"))
+
+# Publicação assíncrona dos resultados no Kafka (desligada por padrão)
+KAFKA_ENABLED = env_bool("KAFKA_ENABLED", False)
+# kafka | memory (broker em processo, para testes e execução local)
+KAFKA_BACKEND = os.getenv("KAFKA_BACKEND", "kafka")
+KAFKA_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "kafka:9092")
+KAFKA_RESULTS_TOPIC = os.getenv("KAFKA_RESULTS_TOPIC", "processed-results")
+KAFKA_QUEUE_SIZE = int(os.getenv("KAFKA_QUEUE_SIZE", "10000"))
+KAFKA_BATCH_SIZE = int(os.getenv("KAFKA_BATCH_SIZE", "500"))
+KAFKA_LINGER_MS = int(os.getenv("KAFKA_LINGER_MS", "20"))
+# drop | block (com a fila cheia)
+KAFKA_QUEUE_FULL_POLICY = os.getenv("KAFKA_QUEUE_FULL_POLICY", "drop")
+KAFKA_ENQUEUE_TIMEOUT_MS = int(os.getenv("KAFKA_ENQUEUE_TIMEOUT_MS", "5"))
+
+# Modo consumidor (python -m app.consumer): processa ProcessRequest vindos de um tópico
+KAFKA_REQUESTS_TOPIC = os.getenv("KAFKA_REQUESTS_TOPIC", "process-requests")
+KAFKA_CONSUMER_GROUP = os.getenv("KAFKA_CONSUMER_GROUP", "service-b")
+# json (corpo igual ao do POST /api/process) | protobuf (ProcessRequest serializado)
+CONSUMER_REQUEST_FORMAT = os.getenv("CONSUMER_REQUEST_FORMAT", "json")
+CONSUMER_CONCURRENCY = int(os.getenv("CONSUMER_CONCURRENCY", "10"))
+# Registros por lote; os offsets são confirmados ao fim de cada lote
+CONSUMER_BATCH_SIZE = int(os.getenv("CONSUMER_BATCH_SIZE", "100"))
+CONSUMER_POLL_TIMEOUT_MS = int(os.getenv("CONSUMER_POLL_TIMEOUT_MS", "500"))
+CONSUMER_METRICS_PORT = int(os.getenv("CONSUMER_METRICS_PORT", "9104"))
+
+# Persistência dos resultados no Serviço C (StoreBatch em lotes, fora do caminho da requisição)
+STORAGE_ENABLED = env_bool("STORAGE_ENABLED", False)
+STORAGE_GRPC_TARGET = os.getenv("STORAGE_GRPC_TARGET", "service-c:50053")
+STORAGE_QUEUE_SIZE = int(os.getenv("STORAGE_QUEUE_SIZE", "10000"))
+STORAGE_BATCH_SIZE = int(os.getenv("STORAGE_BATCH_SIZE", "200"))
+STORAGE_LINGER_MS = int(os.getenv("STORAGE_LINGER_MS", "10"))
+# Threads de envio compartilhando o mesmo canal (um stream StoreBatch por lote)
+STORAGE_SENDERS = int(os.getenv("STORAGE_SENDERS", "2"))
+STORAGE_TIMEOUT_MS = int(os.getenv("STORAGE_TIMEOUT_MS", "5000"))
+# drop | block (com a fila cheia)
+STORAGE_QUEUE_FULL_POLICY = os.getenv("STORAGE_QUEUE_FULL_POLICY", "drop")
+
+# Prontidão (/ready): espera os dois servidores aceitarem conexões e um aquecimento
+WARMUP_ENABLED = env_bool("WARMUP_ENABLED", True)
+# Tempo máximo esperando as portas REST/gRPC; depois disso /ready continua 503
+STARTUP_TIMEOUT_S = float(os.getenv("STARTUP_TIMEOUT_S", "60"))
+
+# Drain no SIGTERM: tempo máximo para concluir as requisições em andamento
+# (abaixo dos 10 s que o docker espera antes do SIGKILL)
+SHUTDOWN_GRACE_S = float(os.getenv("SHUTDOWN_GRACE_S", "8"))
+
+# Rastreamento por requisição (decomposição da latência por etapa; ver app.tracing)
+TRACING_ENABLED = env_bool("TRACING_ENABLED", False)
+# Fração das requisições sem traceparent que são rastreadas (com traceparent vale a flag do chamador)
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "0.01"))
+# file (JSON por linha em TRACING_FILE) | otlp (POST OTLP/HTTP JSON em TRACING_OTLP_ENDPOINT)
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "file")
+TRACING_FILE = os.getenv("TRACING_FILE", "/tmp/service-b-spans.jsonl")
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACING_QUEUE_SIZE = int(os.getenv("TRACING_QUEUE_SIZE", "10000"))
+TRACING_BATCH_SIZE = int(os.getenv("TRACING_BATCH_SIZE", "256"))
+TRACING_LINGER_MS = int(os.getenv("TRACING_LINGER_MS", "200"))
+
+# Relatório de carga por resposta (endpoint-load-metrics no trailing metadata gRPC e no cabeçalho REST);
+# opt-in: custa alguns µs e um cabeçalho em cada resposta, e só serve a quem balanceia por carga
+LOAD_REPORTING_ENABLED = env_bool("LOAD_REPORTING_ENABLED", False)
+# Intervalo mínimo entre amostras de CPU/memória/req/s (em andamento e fila são lidos a cada resposta);
+# no mínimo 10 ms: abaixo disso a amostra de CPU é só ruído do relógio
+LOAD_REPORT_INTERVAL_MS = max(10, int(os.getenv("LOAD_REPORT_INTERVAL_MS", "1000")))
@@ -0,0 +1,168 @@
+"""
+Modo consumidor do Serviço B: processa ProcessRequest vindos de um tópico Kafka.
+
+Alternativa às chamadas síncronas REST/gRPC para absorver rajadas fora do
+caminho crítico de latência. Cada lote de até CONSUMER_BATCH_SIZE registros é
+processado por CONSUMER_CONCURRENCY threads com o mesmo motor dos handlers
+(`processing.process`) e os offsets são confirmados ao fim do lote (entrega
+at-least-once). Registros que não decodificam são contados e pulados.
+
+Uso:
+    python -m app.consumer
+    # local, sem Kafka: enche o broker em memória e sai quando zerar o lag
+    KAFKA_BACKEND=memory python -m app.consumer --fill 5000 --exit-when-idle
+"""
+
+import argparse
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
+import structlog
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram, start_http_server
+
+from app import config, latency, lifecycle, processing, publisher, storage
+from app.broker import InMemoryBroker, InMemorySource, KafkaSource
+from app.generated import processing_pb2
+from app.models import ProcessRequestModel
+
+logger = structlog.get_logger()
+
+PROCESSED = Counter('consumer_records_processed_total', 'Queue records processed')
+FAILED = Counter('consumer_records_failed_total', 'Queue records that failed', ['stage'])
+COMMITS = Counter('consumer_commits_total', 'Offset commits (one per batch)')
+LAG = Gauge('consumer_lag_records', 'Records in the topic not yet consumed')
+BATCH_DURATION = Histogram(
+    'consumer_batch_duration_seconds',
+    'Time to process and commit a batch',
+    buckets=(.01, .05, .1, .25, .5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+QUEUE_LATENCY = latency.histogram("queue", config.KAFKA_REQUESTS_TOPIC)
+
+
+def decode_json(value):
+    return ProcessRequestModel.model_validate(orjson.loads(value))
+
+
+DECODERS = {
+    "json": decode_json,
+    "protobuf": processing_pb2.ProcessRequest.FromString,
+}
+
+
+class QueueConsumer:
+    def __init__(self, source, concurrency=10, batch_size=100, poll_timeout=0.5, request_format="json"):
+        self.source = source
+        self.batch_size = batch_size
+        self.poll_timeout = poll_timeout
+        self.decode = DECODERS[request_format]
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="consumer")
+        self.stopped = threading.Event()
+
+    def handle(self, value):
+        start_time = time.perf_counter()
+        try:
+            request = self.decode(value)
+        except Exception as e:
+            FAILED.labels(stage='decode').inc()
+            logger.warning("queue_record_invalid", error=str(e))
+            return False
+        try:
+            result = processing.process(request)
+            publisher.publish("queue", request, result)
+            storage.store("queue", request, result)
+        except Exception as e:
+            FAILED.labels(stage='process').inc()
+            logger.error("queue_record_error", error=str(e))
+            return False
+        PROCESSED.inc()
+        QUEUE_LATENCY.record(time.perf_counter() - start_time)
+        return True
+
+    def run_once(self):
+        """Processa um lote e confirma os offsets; retorna o número de registros."""
+        records = self.source.poll(self.batch_size, self.poll_timeout)
+        if records:
+            with BATCH_DURATION.time():
+                list(self.pool.map(self.handle, records))
+                self.source.commit()
+            COMMITS.inc()
+        LAG.set(self.source.lag())
+        return len(records)
+
+    def run(self, exit_when_idle=False):
+        logger.info("queue_consumer_started", topic=config.KAFKA_REQUESTS_TOPIC,
+                    group=config.KAFKA_CONSUMER_GROUP)
+        while not self.stopped.is_set():
+            count = self.run_once()
+            if exit_when_idle and count == 0 and self.source.lag() == 0:
+                break
+
+    def stop(self):
+        self.stopped.set()
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        self.source.close()
+
+
+def fill(broker, topic, count, request_format):
+    """Publica `count` requisições de exemplo (as do aquecimento) no broker em memória."""
+    if request_format == "protobuf":
+        value = processing_pb2.ProcessRequest(**lifecycle.SAMPLE).SerializeToString()
+    else:
+        value = orjson.dumps(lifecycle.SAMPLE)
+    broker.produce(topic, [value] * count)
+
+
+def create_source(broker=None):
+    if config.KAFKA_BACKEND == "memory":
+        return InMemorySource(broker or InMemoryBroker(), config.KAFKA_REQUESTS_TOPIC,
+                              config.KAFKA_CONSUMER_GROUP)
+    return KafkaSource(config.KAFKA_BOOTSTRAP_SERVERS, config.KAFKA_REQUESTS_TOPIC,
+                       config.KAFKA_CONSUMER_GROUP, max_poll_records=config.CONSUMER_BATCH_SIZE)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço B em modo consumidor de fila")
+    parser.add_argument("--fill", type=int, default=0,
+                        help="publica N requisições de exemplo (somente KAFKA_BACKEND=memory)")
+    parser.add_argument("--exit-when-idle", action="store_true",
+                        help="encerra quando não houver mais registros a consumir")
+    args = parser.parse_args(argv)
+
+    broker = InMemoryBroker() if config.KAFKA_BACKEND == "memory" else None
+    if broker is not None and args.fill:
+        fill(broker, config.KAFKA_REQUESTS_TOPIC, args.fill, config.CONSUMER_REQUEST_FORMAT)
+
+    start_http_server(config.CONSUMER_METRICS_PORT)
+    publisher.start()
+    storage.start()
+    consumer = QueueConsumer(
+        create_source(broker),
+        concurrency=config.CONSUMER_CONCURRENCY,
+        batch_size=config.CONSUMER_BATCH_SIZE,
+        poll_timeout=config.CONSUMER_POLL_TIMEOUT_MS / 1000,
+        request_format=config.CONSUMER_REQUEST_FORMAT,
+    )
+    signal.signal(signal.SIGTERM, lambda *_: consumer.stop())
+    signal.signal(signal.SIGINT, lambda *_: consumer.stop())
+
+    started = time.monotonic()
+    try:
+        consumer.run(exit_when_idle=args.exit_when_idle)
+    finally:
+        consumer.close()
+        publisher.stop()
+        storage.stop()
+    elapsed = time.monotonic() - started
+    processed = REGISTRY.get_sample_value('consumer_records_processed_total') or 0
+    logger.info("queue_consumer_stopped", processed=int(processed),
+                throughput_rps=round(processed / elapsed, 2) if elapsed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Prazos das requisições: o Serviço B só gasta tempo com o que ainda pode ser
+entregue ao cliente.
+
+gRPC: o prazo vem do próprio cliente (`context.time_remaining()`) e um
+cancelamento (cliente que desistiu ou hedge perdedor) interrompe o
+processamento simulado pelo callback do contexto. REST: o cliente informa o
+orçamento no cabeçalho `X-Request-Timeout-Ms`, contado a partir da chegada da
+requisição ao handler.
+
+`deadline_exceeded_total{protocol, stage}` conta os cortes por etapa:
+`expired` (o prazo já tinha passado ao começar), `insufficient` (o tempo
+restante é menor que o custo do processamento), `cancelled` (o cliente cancelou
+durante o processamento) e `late` (terminou depois do prazo; publicação,
+armazenamento e serialização são pulados).
+`deadline_work_avoided_seconds_total{protocol}` soma o processamento poupado.
+"""
+
+import math
+import threading
+import time
+
+from prometheus_client import Counter
+
+REST_TIMEOUT_HEADER = "x-request-timeout-ms"
+
+# Sem prazo, o grpcio devolve ~9.2e18 s em time_remaining()
+_NO_DEADLINE = 1e9
+
+DEADLINE_EXCEEDED = Counter(
+    'deadline_exceeded_total',
+    'Requests abandoned because the client deadline passed or the call was cancelled',
+    ['protocol', 'stage']
+)
+WORK_AVOIDED = Counter(
+    'deadline_work_avoided_seconds_total',
+    'Processing time not spent on requests that could no longer succeed',
+    ['protocol']
+)
+
+
+def from_grpc(context):
+    """Prazo da chamada em time.monotonic(), ou None se o cliente não definiu."""
+    remaining = context.time_remaining()
+    if remaining is None or remaining > _NO_DEADLINE:
+        return None
+    return time.monotonic() + remaining
+
+
+def from_headers(headers, start):
+    """Prazo a partir de X-Request-Timeout-Ms; cabeçalho ausente, inválido ou não finito = sem prazo."""
+    # `in` antes de ler: o Headers.get do Starlette levanta e captura um KeyError
+    # quando o cabeçalho falta, o caso comum (~600 bytes por requisição)
+    if REST_TIMEOUT_HEADER not in headers:
+        return None
+    value = headers[REST_TIMEOUT_HEADER]
+    if not value:
+        return None
+    try:
+        timeout_ms = float(value)
+    except ValueError:
+        return None
+    # "nan"/"inf" passam pelo float(): max(0.0, nan) daria 0 e um 504 imediato
+    if not math.isfinite(timeout_ms):
+        return None
+    return start + max(0.0, timeout_ms) / 1000
+
+
+def cancel_event(context):
+    """Event marcado quando a chamada gRPC termina (inclusive por cancelamento)."""
+    event = threading.Event()
+    context.add_callback(event.set)
+    return event
+
+
+def passed(deadline):
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def record(protocol, exc):
+    DEADLINE_EXCEEDED.labels(protocol=protocol, stage=exc.stage).inc()
+    if exc.avoided > 0:
+        WORK_AVOIDED.labels(protocol=protocol).inc(exc.avoided)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: processing.proto
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10processing.proto\x12\nprocessing\"\x88\x02\n\x0eProcessRequest\x12\x0e\n\x06\x66ield1\x18\x01 \x01(\t\x12\x0e\n\x06\x66ield2\x18\x02 \x01(\t\x12\x0e\n\x06\x66ield3\x18\x03 \x01(\x05\x12\x0e\n\x06\x66ield4\x18\x04 \x01(\x08\x12\x0e\n\x06\x66ield5\x18\x05 \x03(\t\x12\x36\n\x06\x66ield6\x18\x06 \x03(\x0b\x32&.processing.ProcessRequest.Field6Entry\x12\x0e\n\x06\x66ield7\x18\x07 \x01(\t\x12\x0e\n\x06\x66ield8\x18\x08 \x01(\x01\x12\x0e\n\x06\x66ield9\x18\t \x01(\t\x12\x0f\n\x07\x66ield10\x18\n \x01(\t\x1a-\n\x0b\x46ield6Entry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"[\n\x0fProcessResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x13\n\x0bprocessedId\x18\x03 \x01(\t\x12\x11\n\ttimestamp\x18\x04 \x01(\x03\x32[\n\x11ProcessingService\x12\x46\n\x0bProcessData\x12\x1a.processing.ProcessRequest\x1a\x1b.processing.ProcessResponseb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'processing_pb2', _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _PROCESSREQUEST_FIELD6ENTRY._options = None
+  _PROCESSREQUEST_FIELD6ENTRY._serialized_options = b'8\001'
+  _globals['_PROCESSREQUEST']._serialized_start=33
+  _globals['_PROCESSREQUEST']._serialized_end=297
+  _globals['_PROCESSREQUEST_FIELD6ENTRY']._serialized_start=252
+  _globals['_PROCESSREQUEST_FIELD6ENTRY']._serialized_end=297
+  _globals['_PROCESSRESPONSE']._serialized_start=299
+  _globals['_PROCESSRESPONSE']._serialized_end=390
+  _globals['_PROCESSINGSERVICE']._serialized_start=392
+  _globals['_PROCESSINGSERVICE']._serialized_end=483
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,66 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from . import processing_pb2 as processing__pb2
+
+
+class ProcessingServiceStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.ProcessData = channel.unary_unary(
+                '/processing.ProcessingService/ProcessData',
+                request_serializer=processing__pb2.ProcessRequest.SerializeToString,
+                response_deserializer=processing__pb2.ProcessResponse.FromString,
+                )
+
+
+class ProcessingServiceServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def ProcessData(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_ProcessingServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'ProcessData': grpc.unary_unary_rpc_method_handler(
+                    servicer.ProcessData,
+                    request_deserializer=processing__pb2.ProcessRequest.FromString,
+                    response_serializer=processing__pb2.ProcessResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'processing.ProcessingService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class ProcessingService(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def ProcessData(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/processing.ProcessingService/ProcessData',
+            processing__pb2.ProcessRequest.SerializeToString,
+            processing__pb2.ProcessResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: storage.proto
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rstorage.proto\x12\x07storage\"3\n\x0eStorageRequest\x12\x13\n\x0bprocessedId\x18\x01 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\t\"7\n\x0fStorageResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x13\n\x0bprocessedId\x18\x02 \x01(\t\"4\n\x12StoreBatchResponse\x12\x0e\n\x06stored\x18\x01 \x01(\x05\x12\x0e\n\x06\x66\x61iled\x18\x02 \x01(\x05\x32\x96\x01\n\x0eStorageService\x12>\n\tStoreData\x12\x17.storage.StorageRequest\x1a\x18.storage.StorageResponse\x12\x44\n\nStoreBatch\x12\x17.storage.StorageRequest\x1a\x1b.storage.StoreBatchResponse(\x01\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'storage_pb2', _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _globals['_STORAGEREQUEST']._serialized_start=26
+  _globals['_STORAGEREQUEST']._serialized_end=77
+  _globals['_STORAGERESPONSE']._serialized_start=79
+  _globals['_STORAGERESPONSE']._serialized_end=134
+  _globals['_STOREBATCHRESPONSE']._serialized_start=136
+  _globals['_STOREBATCHRESPONSE']._serialized_end=188
+  _globals['_STORAGESERVICE']._serialized_start=191
+  _globals['_STORAGESERVICE']._serialized_end=341
+# @@protoc_insertion_point(module_scope)
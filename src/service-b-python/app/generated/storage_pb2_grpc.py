@@ -0,0 +1,100 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from . import storage_pb2 as storage__pb2
+
+
+class StorageServiceStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.StoreData = channel.unary_unary(
+                '/storage.StorageService/StoreData',
+                request_serializer=storage__pb2.StorageRequest.SerializeToString,
+                response_deserializer=storage__pb2.StorageResponse.FromString,
+                )
+        self.StoreBatch = channel.stream_unary(
+                '/storage.StorageService/StoreBatch',
+                request_serializer=storage__pb2.StorageRequest.SerializeToString,
+                response_deserializer=storage__pb2.StoreBatchResponse.FromString,
+                )
+
+
+class StorageServiceServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def StoreData(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StoreBatch(self, request_iterator, context):
+        """Grava um lote enviado como stream numa única transação
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_StorageServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'StoreData': grpc.unary_unary_rpc_method_handler(
+                    servicer.StoreData,
+                    request_deserializer=storage__pb2.StorageRequest.FromString,
+                    response_serializer=storage__pb2.StorageResponse.SerializeToString,
+            ),
+            'StoreBatch': grpc.stream_unary_rpc_method_handler(
+                    servicer.StoreBatch,
+                    request_deserializer=storage__pb2.StorageRequest.FromString,
+                    response_serializer=storage__pb2.StoreBatchResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'storage.StorageService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class StorageService(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def StoreData(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/storage.StorageService/StoreData',
+            storage__pb2.StorageRequest.SerializeToString,
+            storage__pb2.StorageResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StoreBatch(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/storage.StorageService/StoreBatch',
+            storage__pb2.StorageRequest.SerializeToString,
+            storage__pb2.StoreBatchResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
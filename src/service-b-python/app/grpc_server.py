@@ -1,50 +1,210 @@
 import grpc
 from concurrent import futures
+import signal
+import threading
 import time
 import json
 import structlog
-import uuid
+from prometheus_client import start_http_server
 from app.generated import processing_pb2, processing_pb2_grpc
+from grpc_health.v1 import health, health_pb2, health_pb2_grpc
+from app import config, deadlines, latency, lifecycle, load_report, processing, profiling, publisher, storage, tracing
+from app.compression import GRPC_IN_DECODED, GRPC_OUT_DECODED
 
 logger = structlog.get_logger()
 
+PROCESS_DATA_LATENCY = latency.histogram("grpc", "ProcessData")
+GRPC_IN_FLIGHT = lifecycle.in_flight("grpc")
+
+SERVICE_NAME = 'processing.ProcessingService'
+
+COMPRESSION_ALGORITHMS = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
+# Metadata com o qual o cliente escolhe a compressão da resposta por chamada
+RESPONSE_COMPRESSION_KEY = "x-response-compression"
+
+def _requested_compression(context):
+    for key, value in context.invocation_metadata():
+        if key == RESPONSE_COMPRESSION_KEY:
+            return COMPRESSION_ALGORITHMS.get(value.lower())
+    return None
+
 class ProcessingServicer(processing_pb2_grpc.ProcessingServiceServicer):
     def ProcessData(self, request, context):
-        start_time = time.time()
+        """Retorna o ProcessResponse já serializado (ver add_servicer_to_server)."""
+        start_time = time.perf_counter()
+        GRPC_IN_FLIGHT.begin()
+        trace = tracing.begin("grpc", "ProcessData", context.invocation_metadata())
+        ok = False
+        stage = trace.clock()
         
         try:
-            logger.info("grpc_request_received", 
-                       data={
-                           "field1": request.field1,
-                           "field2": request.field2,
-                           "field3": request.field3
-                       })
+            if isinstance(request, bytes):
+                request = processing_pb2.ProcessRequest.FromString(request)
+                stage = trace.stage("parse", stage)
+            logger.info("grpc_request_received",
+                        field1=request.field1, field2=request.field2, field3=request.field3)
+            stage = trace.stage("log", stage)
+            
+            # A mensagem protobuf já tem a interface de ProcessingRequest
+            deadline = deadlines.from_grpc(context)
+            # Sem atraso simulado não há espera a interromper: dispensa o callback
+            cancelled = deadlines.cancel_event(context) if config.PROCESSING_DELAY else None
+            result = processing.process(request, deadline, cancelled)
+            stage = trace.stage("process", stage)
+            if deadlines.passed(deadline) or not context.is_active():
+                raise processing.DeadlineExceeded("late")
+            publisher.publish("grpc", request, result)
+            storage.store("grpc", request, result)
+            stage = trace.stage("publish", stage)
             
-            # Simula processamento
-            time.sleep(0.1)
+            # Antes de codificar, como no REST: a resposta ainda não ocupa memória durante o log
+            logger.info("grpc_request_processed", processed_id=result.processed_id)
+            stage = trace.stage("log", stage)
             
-            response = processing_pb2.ProcessResponse(
-                message="Dados processados com sucesso via gRPC",
-                success=True,
-                processedId=str(uuid.uuid4()),
-                timestamp=int(time.time())
-            )
+            compression = _requested_compression(context)
+            if compression is not None:
+                context.set_compression(compression)
             
-            logger.info("grpc_request_processed", response=str(response))
+            response = processing.encode_protobuf(result)
+            if config.GRPC_PAYLOAD_METRICS_ENABLED:
+                GRPC_IN_DECODED.inc(request.ByteSize())
+                GRPC_OUT_DECODED.inc(len(response))
+            trace.stage("serialize", stage)
+            load_report.set_trailing_metadata(context)
+            # Cancelada no server.stop(grace) ou pelo cliente: a resposta não sai
+            ok = context.is_active()
             return response
             
+        except processing.DeadlineExceeded as e:
+            deadlines.record("grpc", e)
+            logger.info("grpc_request_deadline_exceeded", stage=e.stage)
+            trace.fail(str(e))
+            load_report.set_trailing_metadata(context)
+            context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, str(e))
+            
         except Exception as e:
             logger.error("grpc_request_error", error=str(e))
+            trace.fail(str(e))
+            load_report.set_trailing_metadata(context)
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(str(e))
             raise
+        finally:
+            GRPC_IN_FLIGHT.end(ok)
+            PROCESS_DATA_LATENCY.record(time.perf_counter() - start_time)
+            trace.finish()
 
-def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    processing_pb2_grpc.add_ProcessingServiceServicer_to_server(
-        ProcessingServicer(), server
+def add_servicer_to_server(servicer, server):
+    """Como o add_ProcessingServiceServicer_to_server gerado, mas sem serializer
+    de resposta: o servicer devolve bytes protobuf pré-codificados."""
+    deserializer = processing_pb2.ProcessRequest.FromString
+    if config.TRACING_ENABLED:
+        # O gRPC desserializa na thread de polling, fora do handler: com rastreamento
+        # o servicer recebe os bytes e mede a desserialização (span "parse")
+        deserializer = None
+    handler = grpc.method_handlers_generic_handler(
+        SERVICE_NAME,
+        {
+            'ProcessData': grpc.unary_unary_rpc_method_handler(
+                servicer.ProcessData,
+                request_deserializer=deserializer,
+                response_serializer=None,
+            ),
+        },
     )
-    server.add_insecure_port('[::]:50052')
+    server.add_generic_rpc_handlers((handler,))
+
+def server_options():
+    """Argumentos de canal do servidor gRPC a partir de app.config."""
+    return [
+        ('grpc.max_receive_message_length', config.GRPC_MAX_MESSAGE_BYTES),
+        ('grpc.max_send_message_length', config.GRPC_MAX_MESSAGE_BYTES),
+        ('grpc.keepalive_time_ms', config.GRPC_KEEPALIVE_TIME_MS),
+        ('grpc.keepalive_timeout_ms', config.GRPC_KEEPALIVE_TIMEOUT_MS),
+        ('grpc.keepalive_permit_without_calls', 1),
+        ('grpc.http2.min_ping_interval_without_data_ms', config.GRPC_MIN_PING_INTERVAL_MS),
+        ('grpc.http2.max_ping_strikes', 2),
+        ('grpc.max_connection_age_ms', config.GRPC_MAX_CONNECTION_AGE_MS),
+        ('grpc.max_connection_age_grace_ms', config.GRPC_MAX_CONNECTION_AGE_GRACE_MS),
+        ('grpc.max_connection_idle_ms', config.GRPC_MAX_CONNECTION_IDLE_MS),
+        ('grpc.max_concurrent_streams', config.GRPC_MAX_CONCURRENT_STREAMS),
+        ('grpc.http2.bdp_probe', 1 if config.GRPC_BDP_PROBE else 0),
+    ]
+
+def add_health_to_server(server):
+    """grpc.health.v1: SERVING enquanto a réplica está pronta (app.lifecycle), tanto
+    para o servidor todo ("") quanto para processing.ProcessingService."""
+    servicer = health.HealthServicer()
+    health_pb2_grpc.add_HealthServicer_to_server(servicer, server)
+
+    def update(ready):
+        status = (health_pb2.HealthCheckResponse.SERVING if ready
+                  else health_pb2.HealthCheckResponse.NOT_SERVING)
+        for service in ("", SERVICE_NAME):
+            servicer.set(service, status)
+
+    lifecycle.on_ready_change(update)
+    return servicer
+
+class QueueTrackingExecutor(futures.ThreadPoolExecutor):
+    """Pool do servidor gRPC que conta em GRPC_IN_FLIGHT.queued as RPCs submetidas
+    que ainda esperam uma thread livre (o queue_depth do relatório de carga)."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        GRPC_IN_FLIGHT.enqueue()
+
+        def run():
+            GRPC_IN_FLIGHT.dequeue()
+            return fn(*args, **kwargs)
+
+        try:
+            return super().submit(run)
+        except BaseException:
+            GRPC_IN_FLIGHT.dequeue()
+            raise
+
+def create_server():
+    """Cria e inicia o servidor gRPC sem bloquear (threads próprias do gRPC)."""
+    executor = QueueTrackingExecutor(max_workers=config.GRPC_MAX_WORKERS)
+    server = grpc.server(
+        executor,
+        options=server_options(),
+        compression=COMPRESSION_ALGORITHMS.get(config.GRPC_COMPRESSION, grpc.Compression.NoCompression),
+        maximum_concurrent_rpcs=config.GRPC_MAXIMUM_CONCURRENT_RPCS or None,
+    )
+    add_servicer_to_server(ProcessingServicer(), server)
+    add_health_to_server(server)
+    server.add_insecure_port(f'[::]:{config.GRPC_PORT}')
     server.start()
-    logger.info("gRPC server started on port 50052")
-    server.wait_for_termination()
+    logger.info(f"gRPC server started on port {config.GRPC_PORT}")
+    return server
+
+def serve():
+    """Executa o gRPC como processo dedicado, com /metrics próprio."""
+    start_http_server(config.GRPC_METRICS_PORT)
+    if config.PROFILING_ENABLED:
+        profiling.start_debug_server(config.GRPC_DEBUG_PORT)
+    publisher.start()
+    storage.start()
+    tracing.start()
+    if config.WARMUP_ENABLED:
+        lifecycle.prime()
+    server = create_server()
+    lifecycle.on_drain(server.stop)
+    lifecycle.set_ready(True)
+    lifecycle.mark_phase("ready")
+
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+    stop.wait()
+    # Para de aceitar RPCs novas e conclui as em andamento em até SHUTDOWN_GRACE_S
+    lifecycle.finish_drain()
+    publisher.stop()
+    storage.stop()
+    tracing.stop()
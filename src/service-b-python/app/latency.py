@@ -0,0 +1,184 @@
+"""
+Histogramas de latência de alta resolução (estilo HDR) para o Serviço B.
+
+Os valores são registrados em microssegundos em buckets log-lineares: abaixo de
+128 µs a resolução é de 1 µs e, acima disso, cada potência de dois é dividida
+em 64 sub-buckets (erro relativo < 1,6%). Assim 101 ms e 140 ms ficam em buckets
+bem distintos, ao contrário dos buckets padrão do prometheus_client.
+
+O registro não usa lock: cada thread escreve no seu próprio vetor de contagens
+(shard) e os shards só são somados na leitura (snapshot / scrape).
+"""
+
+import threading
+from typing import Dict, List, Tuple
+
+from prometheus_client.core import Metric, REGISTRY
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+# Maior valor registrável: ~68 s (valores acima são saturados)
+MAX_VALUE_US = (1 << 26) - 1
+MAX_SHIFT = MAX_VALUE_US.bit_length() - SUB_BUCKET_BITS
+BUCKET_COUNT = SUB_BUCKET_COUNT + MAX_SHIFT * SUB_BUCKET_HALF
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99, 0.999)
+
+
+def bucket_index(value_us: int) -> int:
+    if value_us < SUB_BUCKET_COUNT:
+        return value_us if value_us > 0 else 0
+    if value_us > MAX_VALUE_US:
+        value_us = MAX_VALUE_US
+    shift = value_us.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKET_COUNT + (shift - 1) * SUB_BUCKET_HALF + (value_us >> shift) - SUB_BUCKET_HALF
+
+
+def bucket_upper_bound(index: int) -> int:
+    if index < SUB_BUCKET_COUNT:
+        return index
+    shift, offset = divmod(index - SUB_BUCKET_COUNT, SUB_BUCKET_HALF)
+    shift += 1
+    return ((offset + SUB_BUCKET_HALF + 1) << shift) - 1
+
+
+class _Shard:
+    __slots__ = ("counts", "total", "sum_us", "max_us")
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.total = 0
+        self.sum_us = 0
+        self.max_us = 0
+
+
+class LatencyHistogram:
+    """Histograma HDR de uma rota/RPC com um shard por thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._lock = threading.Lock()
+
+    def _new_shard(self) -> _Shard:
+        shard = self._local.shard = _Shard()
+        with self._lock:
+            self._shards.append(shard)
+        return shard
+
+    def record(self, seconds: float):
+        value_us = int(seconds * 1_000_000)
+        # Caminho comum sem chamada extra: o shard da thread já existe
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard.counts[bucket_index(value_us)] += 1
+        shard.total += 1
+        shard.sum_us += value_us
+        if value_us > shard.max_us:
+            shard.max_us = value_us
+
+    def reset(self):
+        with self._lock:
+            for shard in self._shards:
+                shard.counts = [0] * BUCKET_COUNT
+                shard.total = 0
+                shard.sum_us = 0
+                shard.max_us = 0
+
+    def merged(self) -> Tuple[List[int], int, int, int]:
+        with self._lock:
+            shards = list(self._shards)
+        counts = [0] * BUCKET_COUNT
+        total = sum_us = max_us = 0
+        for shard in shards:
+            for i, c in enumerate(shard.counts):
+                if c:
+                    counts[i] += c
+            total += shard.total
+            sum_us += shard.sum_us
+            max_us = max(max_us, shard.max_us)
+        return counts, total, sum_us, max_us
+
+    def snapshot(self) -> Dict[str, float]:
+        counts, total, sum_us, max_us = self.merged()
+        if total == 0:
+            return {"count": 0}
+        result = {
+            "count": total,
+            "mean_ms": sum_us / total / 1000,
+            "min_ms": min(next(bucket_upper_bound(i) for i, c in enumerate(counts) if c), max_us) / 1000,
+            "max_ms": max_us / 1000,
+        }
+        for q, value_us in zip(QUANTILES, _quantiles(counts, total, QUANTILES)):
+            result[f"p{q * 100:g}"] = min(value_us, max_us) / 1000
+        return result
+
+
+def _quantiles(counts: List[int], total: int, quantiles) -> List[int]:
+    results = []
+    targets = [max(1, int(q * total + 0.5)) for q in quantiles]
+    seen = 0
+    t = 0
+    for i, c in enumerate(counts):
+        if not c:
+            continue
+        seen += c
+        while t < len(targets) and seen >= targets[t]:
+            results.append(bucket_upper_bound(i))
+            t += 1
+        if t == len(targets):
+            break
+    return results
+
+
+# Histogramas registrados por (protocolo, rota/RPC)
+_histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def histogram(protocol: str, route: str) -> LatencyHistogram:
+    key = (protocol, route)
+    hist = _histograms.get(key)
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.setdefault(key, LatencyHistogram())
+    return hist
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    return {f"{protocol} {route}": hist.snapshot() for (protocol, route), hist in list(_histograms.items())}
+
+
+def reset():
+    for hist in list(_histograms.values()):
+        hist.reset()
+
+
+class LatencyCollector:
+    """Exporta os histogramas HDR no /metrics como summary com quantis."""
+
+    def collect(self):
+        metric = Metric(
+            "service_b_latency_seconds",
+            "Latencia por rota/RPC (histograma HDR, erro relativo < 1.6%)",
+            "summary",
+        )
+        for (protocol, route), hist in list(_histograms.items()):
+            counts, total, sum_us, max_us = hist.merged()
+            labels = {"protocol": protocol, "route": route}
+            if total:
+                for q, value_us in zip(QUANTILES, _quantiles(counts, total, QUANTILES)):
+                    metric.add_sample(
+                        "service_b_latency_seconds",
+                        dict(labels, quantile=str(q)),
+                        min(value_us, max_us) / 1_000_000,
+                    )
+            metric.add_sample("service_b_latency_seconds_count", labels, total)
+            metric.add_sample("service_b_latency_seconds_sum", labels, sum_us / 1_000_000)
+        yield metric
+
+
+REGISTRY.register(LatencyCollector())
@@ -0,0 +1,326 @@
+"""
+Ciclo de vida do Serviço B: prontidão (readiness) separada de vivacidade (liveness).
+
+`/health` só diz que o processo está vivo. `/ready` responde 200 apenas depois
+que (1) a porta REST e a porta gRPC aceitam conexões (no modo `python -m app`
+o gRPC é outro processo; a verificação pela porta cobre os dois modos) e
+(2) um aquecimento passou pelos caminhos quentes: validação pydantic, parse e
+serialização protobuf, codificação das respostas e dos registros Kafka,
+compressão e uma requisição HTTP real pelo servidor REST.
+
+`service_b_startup_seconds{phase}` registra, a partir do início do processo,
+quando cada fase terminou: `app` (evento de startup), `bound` (portas
+aceitando) e `ready` (aquecimento concluído).
+
+No desligamento (SIGTERM), `begin_drain()` marca a réplica como não pronta e
+para os servidores registrados com `on_drain()` (que deixam de aceitar e
+terminam o que está em andamento em até SHUTDOWN_GRACE_S); `finish_drain()`
+espera e conta em `service_b_drain_requests_total{protocol, outcome}` as
+requisições concluídas durante o drain (`completed`) e as canceladas,
+abortadas ou ainda em andamento no fim da carência (`dropped`). O desfecho é
+informado por cada handler em `end(ok)`.
+"""
+
+import os
+import socket
+import threading
+import time
+import urllib.request
+import uuid
+
+import grpc
+import orjson
+import structlog
+from prometheus_client import Counter, Gauge
+
+from app import config, processing, publisher
+from app.compression import SUPPORTED_ENCODINGS, compress
+from app.generated import processing_pb2
+from app.models import ProcessRequestModel
+
+logger = structlog.get_logger()
+
+STARTUP_SECONDS = Gauge(
+    'service_b_startup_seconds',
+    'Seconds from process start until each startup phase completed',
+    ['phase']
+)
+READY = Gauge('service_b_ready', '1 while the replica accepts traffic (readiness)')
+IN_FLIGHT = Gauge('service_b_in_flight_requests', 'Requests currently being handled', ['protocol'])
+DRAIN_REQUESTS = Counter(
+    'service_b_drain_requests_total',
+    'Requests completed or dropped while draining on shutdown',
+    ['protocol', 'outcome']
+)
+
+_ready = threading.Event()
+
+
+class _Shard:
+    __slots__ = ("begun", "completed", "dropped", "queued")
+
+    def __init__(self):
+        self.begun = 0
+        self.completed = 0
+        self.dropped = 0
+        self.queued = 0
+
+
+class InFlight:
+    """Requisições em andamento de um protocolo (begin/end em cada handler) e, no
+    gRPC, as que esperam uma thread livre do pool (enqueue/dequeue).
+
+    Como nos histogramas de app.latency, sem lock no caminho da requisição: cada
+    thread conta no seu próprio shard e os totais são somados na leitura (scrape,
+    relatório de carga, drain)."""
+
+    def __init__(self, protocol):
+        self.protocol = protocol
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+        IN_FLIGHT.labels(protocol=protocol).set_function(lambda: self.count)
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def _total(self, field):
+        return sum(getattr(shard, field) for shard in list(self._shards))
+
+    @property
+    def completed(self):
+        return self._total("completed")
+
+    @property
+    def dropped(self):
+        return self._total("dropped")
+
+    @property
+    def finished(self):
+        return self.completed + self.dropped
+
+    @property
+    def count(self):
+        # Concluídas antes das iniciadas: um end() concorrente não deixa a conta negativa
+        finished = self.finished
+        return self._total("begun") - finished
+
+    @property
+    def queued(self):
+        return self._total("queued")
+
+    def enqueue(self):
+        self._shard().queued += 1
+
+    def dequeue(self):
+        self._shard().queued -= 1
+
+    def begin(self):
+        self._shard().begun += 1
+
+    def end(self, ok):
+        """`ok`: a resposta saiu normalmente; False para cancelada (fim da carência,
+        cliente desconectado), abortada por prazo ou com erro."""
+        shard = self._shard()
+        if ok:
+            shard.completed += 1
+        else:
+            shard.dropped += 1
+
+
+_trackers = {}
+
+
+def in_flight(protocol):
+    tracker = _trackers.get(protocol)
+    if tracker is None:
+        tracker = _trackers[protocol] = InFlight(protocol)
+    return tracker
+
+
+def trackers():
+    return list(_trackers.values())
+
+
+SAMPLE = {
+    "field1": "warmup", "field2": "warmup", "field3": 1, "field4": True,
+    "field5": ["a", "b"], "field6": {"k": "v"}, "field7": "2025-01-01T00:00:00Z",
+    "field8": 1.5, "field9": "warmup", "field10": "warmup",
+}
+
+
+def _process_started():
+    """Início do processo em time.time() (via /proc; fora do Linux, o import deste módulo)."""
+    try:
+        with open("/proc/self/stat", "r", encoding="ascii") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/stat", "r", encoding="ascii") as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith("btime"))
+        return boot_time + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, StopIteration):
+        return time.time()
+
+
+PROCESS_STARTED = _process_started()
+
+
+def mark_phase(phase):
+    elapsed = max(0.0, time.time() - PROCESS_STARTED)
+    STARTUP_SECONDS.labels(phase=phase).set(elapsed)
+    return elapsed
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+_ready_listeners = []
+
+
+def on_ready_change(listener):
+    """Registra `listener(ready)`, chamado já com o estado atual e a cada mudança
+    (ex.: o status do grpc.health.v1)."""
+    _ready_listeners.append(listener)
+    listener(is_ready())
+
+
+def set_ready(ready):
+    if ready:
+        _ready.set()
+    else:
+        _ready.clear()
+    READY.set(1 if ready else 0)
+    for listener in _ready_listeners:
+        listener(ready)
+
+
+_drain_lock = threading.Lock()
+_drain_started = None
+# (completed, dropped) de cada protocolo no início do drain
+_drain_baseline = {}
+_stoppers = []
+_stopping = []
+
+
+def on_drain(stop):
+    """Registra `stop(grace)` (como grpc.Server.stop), chamado no início do drain;
+    o retorno, se houver, deve ter `wait(timeout)`."""
+    _stoppers.append(stop)
+
+
+def begin_drain(grace=None):
+    """Idempotente e rápido (pode rodar num handler de sinal)."""
+    global _drain_started
+    grace = config.SHUTDOWN_GRACE_S if grace is None else grace
+    with _drain_lock:
+        if _drain_started is not None:
+            return
+        _drain_started = time.monotonic()
+        _drain_baseline.update({p: (t.completed, t.dropped) for p, t in _trackers.items()})
+    set_ready(False)
+    logger.info("drain_started", grace_seconds=grace,
+                in_flight={p: t.count for p, t in _trackers.items()})
+    for stop in _stoppers:
+        _stopping.append(stop(grace))
+
+
+def finish_drain(grace=None):
+    """Espera os servidores pararem (até o fim da carência) e contabiliza o drain.
+
+    Bloqueia: no loop asyncio, chamar via asyncio.to_thread."""
+    grace = config.SHUTDOWN_GRACE_S if grace is None else grace
+    begin_drain(grace)
+    deadline = _drain_started + grace
+    for stopping in _stopping:
+        if stopping is not None:
+            stopping.wait(max(0.0, deadline - time.monotonic()))
+    summary = {}
+    for protocol, tracker in _trackers.items():
+        completed_before, dropped_before = _drain_baseline.get(protocol, (0, 0))
+        completed = tracker.completed - completed_before
+        # Encerradas sem resposta normal mais as que nem chegaram ao fim
+        dropped = tracker.dropped - dropped_before + tracker.count
+        DRAIN_REQUESTS.labels(protocol=protocol, outcome="completed").inc(completed)
+        DRAIN_REQUESTS.labels(protocol=protocol, outcome="dropped").inc(dropped)
+        summary[protocol] = {"completed": completed, "dropped": dropped}
+    logger.info("drain_finished", seconds=round(time.monotonic() - _drain_started, 3), requests=summary)
+    return summary
+
+
+def prime():
+    """Passa uma vez por cada caminho de (de)serialização, sem efeitos colaterais."""
+    body = orjson.dumps(SAMPLE)
+    model = ProcessRequestModel.model_validate(orjson.loads(body))
+    message = processing_pb2.ProcessRequest.FromString(
+        processing_pb2.ProcessRequest(**SAMPLE).SerializeToString())
+    result = processing.ProcessingResult(str(uuid.uuid4()), int(time.time()))
+    processing.encode_json(result)
+    processing.encode_protobuf(result)
+    publisher.encode_record("rest", model, result)
+    publisher.encode_record("grpc", message, result)
+    if config.REST_COMPRESSION in SUPPORTED_ENCODINGS:
+        compress(config.REST_COMPRESSION, body * 32, config.REST_COMPRESSION_LEVEL)
+
+
+def _wait_for_port(port, deadline):
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+
+def warm_up(rest_port, grpc_port, timeout):
+    """Espera as portas, aquece e marca a réplica como pronta; False se o prazo esgotar
+    ou se o drain já tiver começado."""
+    deadline = time.monotonic() + timeout
+    if not (_wait_for_port(rest_port, deadline) and _wait_for_port(grpc_port, deadline)):
+        logger.error("startup_ports_unavailable", rest_port=rest_port, grpc_port=grpc_port)
+        return False
+    # Handshake HTTP/2 completo, não só o accept do TCP
+    with grpc.insecure_channel(f"127.0.0.1:{grpc_port}") as channel:
+        try:
+            grpc.channel_ready_future(channel).result(timeout=max(0.1, deadline - time.monotonic()))
+        except grpc.FutureTimeoutError:
+            logger.error("startup_grpc_unavailable", grpc_port=grpc_port)
+            return False
+    mark_phase("bound")
+
+    if config.WARMUP_ENABLED:
+        prime()
+        with urllib.request.urlopen(f"http://127.0.0.1:{rest_port}/health", timeout=5) as response:
+            response.read()
+    # SIGTERM durante o aquecimento: a réplica já está em drain e não volta a ficar pronta
+    with _drain_lock:
+        if _drain_started is not None:
+            logger.info("startup_aborted_draining")
+            return False
+        set_ready(True)
+    logger.info("service_ready", startup_seconds=round(mark_phase("ready"), 3))
+    return True
+
+
+def start_warm_up(rest_port, grpc_port, timeout):
+    """Executa `warm_up` numa thread: o servidor REST só abre a porta após o startup."""
+    thread = threading.Thread(target=_warm_up_safely, args=(rest_port, grpc_port, timeout),
+                              name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def _warm_up_safely(rest_port, grpc_port, timeout):
+    try:
+        warm_up(rest_port, grpc_port, timeout)
+    except Exception as e:
+        logger.error("startup_warm_up_error", error=str(e))
+
+
+set_ready(False)
@@ -0,0 +1,200 @@
+"""
+Relatório de carga por resposta, para roteamento pela réplica menos ocupada.
+
+Com LOAD_REPORTING_ENABLED=1, cada resposta de `ProcessData` (trailing metadata)
+e de `POST /api/process` (cabeçalho) leva `endpoint-load-metrics` no formato
+texto do ORCA, o mesmo aceito pelo Envoy e pelos balanceadores do gRPC:
+
+    endpoint-load-metrics: TEXT cpu_utilization=0.412, mem_utilization=0.318,
+        rps_fractional=95.0, named_metrics.in_flight=7, named_metrics.queue_depth=2
+
+- `in_flight`: requisições REST + gRPC em andamento no processo (app.lifecycle);
+- `queue_depth`: RPCs esperando uma thread livre no pool do servidor gRPC
+  (contadas pelo app.lifecycle, ver grpc_server.QueueTrackingExecutor);
+- `cpu_utilization` / `mem_utilization`: uso do container (cgroup v2) em relação
+  ao limite; fora do cgroup próprio de um container (host com cgroup v1 ou
+  processo num cgroup compartilhado do host), CPU do processo sobre as CPUs
+  disponíveis e sem memória;
+- `rps_fractional`: requisições concluídas por segundo.
+
+CPU, memória e req/s são amostrados no máximo a cada LOAD_REPORT_INTERVAL_MS,
+na própria chamada de `report()`; em andamento e fila são lidos na hora.
+"""
+
+import os
+import threading
+import time
+
+from prometheus_client import Gauge
+
+from app import config, lifecycle
+
+HEADER = "endpoint-load-metrics"
+HEADER_BYTES = HEADER.encode()
+# Metadata gRPC em minúsculas; o mesmo nome vale para o cabeçalho HTTP
+METADATA_KEY = HEADER
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+CPU_UTILIZATION = Gauge('service_b_cpu_utilization', 'CPU used relative to the CPUs available to the replica')
+QUEUE_DEPTH = Gauge('service_b_queue_depth', 'RPCs waiting for a free gRPC worker thread')
+
+
+def _read(path):
+    with open(path, "r", encoding="ascii") as f:
+        return f.read().strip()
+
+
+def own_cgroup(root=CGROUP_ROOT):
+    """True se `root` é o cgroup v2 do próprio processo, como num container com
+    namespace de cgroup: /proc/self/cgroup é "0::/" e o diretório não é a raiz
+    do host (a raiz não tem cpu.max). Num host, `root` soma a máquina inteira."""
+    try:
+        if _read("/proc/self/cgroup") != "0::/":
+            return False
+    except OSError:
+        return False
+    return os.path.exists(f"{root}/cpu.max")
+
+
+def cgroup_cpu_seconds(root=CGROUP_ROOT):
+    """CPU total do cgroup (s) pelo usage_usec de cpu.stat, ou None fora do cgroup v2."""
+    try:
+        for line in _read(f"{root}/cpu.stat").splitlines():
+            key, value = line.split()
+            if key == "usage_usec":
+                return int(value) / 1_000_000
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def cgroup_cpu_limit(root=CGROUP_ROOT):
+    """CPUs do limite (cpu.max "quota período"); None sem limite ou fora do cgroup v2."""
+    try:
+        quota, period = _read(f"{root}/cpu.max").split()
+    except (OSError, ValueError):
+        return None
+    if quota == "max":
+        return None
+    return int(quota) / int(period)
+
+
+def cgroup_memory(root=CGROUP_ROOT):
+    """(memory.current, memory.max) em bytes; max é None sem limite. None fora do cgroup v2."""
+    try:
+        current = int(_read(f"{root}/memory.current"))
+        limit = _read(f"{root}/memory.max")
+    except (OSError, ValueError):
+        return None
+    return current, None if limit == "max" else int(limit)
+
+
+def available_cpus():
+    limit = cgroup_cpu_limit() if own_cgroup() else None
+    if limit:
+        return limit
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class LoadReporter:
+    def __init__(self, interval_ms=1000):
+        self.interval = interval_ms / 1000
+        self.cpus = available_cpus()
+        self._in_cgroup = own_cgroup() and cgroup_cpu_seconds() is not None
+        self._lock = threading.Lock()
+        self._last_wall = time.monotonic()
+        self._last_cpu = self._cpu_seconds()
+        self._last_finished = self._finished()
+        self.cpu_utilization = 0.0
+        self.mem_utilization = None
+        self.rps = 0.0
+        self._sampled_text = self._format_sampled()
+        CPU_UTILIZATION.set_function(lambda: self.cpu_utilization)
+        QUEUE_DEPTH.set_function(self.queue_depth)
+
+    def _cpu_seconds(self):
+        if self._in_cgroup:
+            return cgroup_cpu_seconds()
+        times = os.times()
+        return times.user + times.system
+
+    @staticmethod
+    def _finished():
+        return sum(tracker.finished for tracker in lifecycle.trackers())
+
+    @staticmethod
+    def queue_depth():
+        return sum(tracker.queued for tracker in lifecycle.trackers())
+
+    def in_flight(self):
+        return sum(tracker.count for tracker in lifecycle.trackers())
+
+    def _sample(self, now):
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            elapsed = now - self._last_wall
+            # Duas amostras no mesmo tick do relógio
+            if elapsed <= 0:
+                return
+            cpu = self._cpu_seconds()
+            finished = self._finished()
+            self.cpu_utilization = max(0.0, (cpu - self._last_cpu) / elapsed / self.cpus)
+            self.rps = (finished - self._last_finished) / elapsed
+            memory = cgroup_memory() if self._in_cgroup else None
+            if memory is not None and memory[1]:
+                self.mem_utilization = memory[0] / memory[1]
+            self._last_wall, self._last_cpu, self._last_finished = now, cpu, finished
+            self._sampled_text = self._format_sampled()
+        finally:
+            self._lock.release()
+
+    def _format_sampled(self):
+        """Parte amostrada do relatório, formatada uma vez por amostra (não por resposta)."""
+        memory = "" if self.mem_utilization is None else f"mem_utilization={self.mem_utilization:.3f}, "
+        return (f"TEXT cpu_utilization={self.cpu_utilization:.3f}, {memory}"
+                f"rps_fractional={self.rps:.1f}, named_metrics.in_flight=")
+
+    def report(self):
+        now = time.monotonic()
+        if now - self._last_wall >= self.interval:
+            self._sample(now)
+        return f"{self._sampled_text}{self.in_flight()}, named_metrics.queue_depth={self.queue_depth()}"
+
+
+def parse(value):
+    """'TEXT cpu_utilization=0.4, named_metrics.in_flight=3' -> {'cpu_utilization': 0.4, 'in_flight': 3.0}"""
+    if not value or not value.startswith("TEXT "):
+        return {}
+    metrics = {}
+    for item in value[5:].split(","):
+        key, _, number = item.strip().partition("=")
+        try:
+            metrics[key.removeprefix("named_metrics.")] = float(number)
+        except ValueError:
+            continue
+    return metrics
+
+
+reporter = LoadReporter(config.LOAD_REPORT_INTERVAL_MS)
+
+
+def report():
+    return reporter.report()
+
+
+def add_rest_header(response):
+    """Acrescenta o cabeçalho à resposta REST já criada, direto em raw_headers (sem o
+    dicionário de `headers=`); nada sem LOAD_REPORTING_ENABLED."""
+    if config.LOAD_REPORTING_ENABLED:
+        response.raw_headers.append((HEADER_BYTES, reporter.report().encode("latin-1")))
+    return response
+
+
+def set_trailing_metadata(context):
+    if config.LOAD_REPORTING_ENABLED:
+        context.set_trailing_metadata(((METADATA_KEY, reporter.report()),))
@@ -1,5 +1,12 @@
 from fastapi import FastAPI, Request, Response
-from app.grpc_server import serve as grpc_serve
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
+from app.grpc_server import create_server as grpc_create_server
+from app import config, deadlines, latency, lifecycle, load_report, processing, profiling, publisher, storage, tracing
+from app.compression import CompressionMiddleware, PayloadTooLarge
+from app.processing import ProcessingRequest
+from app.models import ProcessRequestModel
+import asyncio
 import threading
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
@@ -7,15 +14,26 @@ from concurrent import futures
 import grpc
 import time
 import json
+import orjson
 import structlog
-import uuid
 from typing import Dict, Any
 
 # Configuração do logger
 logger = structlog.get_logger()
 
-# Configuração do FastAPI
-app = FastAPI(title="Service B - Processing")
+# Configuração do FastAPI (respostas em dict serializadas com orjson)
+app = FastAPI(title="Service B - Processing", default_response_class=ORJSONResponse)
+
+# Compressão gzip/zstd e limite de tamanho do corpo. Registrada antes do CORS para
+# ficar por dentro dele (o último add_middleware é o mais externo): as respostas
+# 413/415/400 do middleware também levam os cabeçalhos CORS
+app.add_middleware(
+    CompressionMiddleware,
+    encoding=config.REST_COMPRESSION,
+    minimum_size=config.REST_COMPRESSION_MIN_SIZE,
+    level=config.REST_COMPRESSION_LEVEL,
+    max_body_size=config.REST_MAX_BODY_BYTES,
+)
 
 # Configuração CORS
 app.add_middleware(
@@ -26,6 +44,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if config.PROFILING_ENABLED:
+    app.include_router(profiling.router)
+
 # Métricas Prometheus
 REQUEST_COUNT = Counter(
     'request_count',
@@ -33,58 +54,109 @@ REQUEST_COUNT = Counter(
     ['method', 'endpoint', 'http_status']
 )
 
+# Buckets finos em torno dos ~100 ms do processamento simulado
 REQUEST_LATENCY = Histogram(
     'request_latency_seconds',
     'Request latency',
-    ['method', 'endpoint']
+    ['method', 'endpoint'],
+    buckets=(.005, .01, .025, .05, .075, .1, .105, .11, .12, .13, .14, .15,
+             .175, .2, .25, .3, .4, .5, .75, 1.0, 2.5, 5.0, 10.0)
 )
 
+PROCESS_REST_LATENCY = latency.histogram("rest", "/api/process")
+REST_IN_FLIGHT = lifecycle.in_flight("rest")
+
+# Séries pré-vinculadas: evita resolver labels a cada requisição
+PROCESS_OK_COUNT = REQUEST_COUNT.labels(method='POST', endpoint='/api/process', http_status=200)
+PROCESS_INVALID_COUNT = REQUEST_COUNT.labels(method='POST', endpoint='/api/process', http_status=422)
+PROCESS_ERROR_COUNT = REQUEST_COUNT.labels(method='POST', endpoint='/api/process', http_status=500)
+PROCESS_TIMEOUT_COUNT = REQUEST_COUNT.labels(method='POST', endpoint='/api/process', http_status=504)
+PROCESS_LATENCY = REQUEST_LATENCY.labels(method='POST', endpoint='/api/process')
+
 # Simulação de processamento
 def process_data(data: Dict[str, Any]) -> Dict[str, Any]:
-    # Simula processamento
-    time.sleep(0.1)
-    
-    processed_id = str(uuid.uuid4())
-    return {
-        "message": "Dados processados com sucesso",
-        "success": True,
-        "processedId": processed_id,
-        "timestamp": int(time.time())
-    }
+    return processing.process(ProcessingRequest.from_mapping(data)).to_dict()
+
+async def _read_body(request):
+    """Corpo sem o cache do request.body(), que o manteria vivo até o fim do handler."""
+    chunks = [chunk async for chunk in request.stream() if chunk]
+    return chunks[0] if len(chunks) == 1 else b"".join(chunks)
 
 # Endpoints REST
 @app.post("/api/process")
 async def process_rest(request: Request):
-    start_time = time.time()
+    start_time = time.perf_counter()
+    received = time.monotonic()
+    REST_IN_FLIGHT.begin()
+    trace = tracing.begin("rest", "POST /api/process", request.headers)
+    # Só as respostas normais (200/422) contam como concluídas no drain
+    ok = False
+    stage = trace.clock()
     
     try:
-        data = await request.json()
-        logger.info("rest_request_received", data=data)
+        # orjson + validação pydantic única, no lugar do request.json() da stdlib; o
+        # modelo vira um ProcessingRequest de __slots__, que fica vivo até o fim do handler
+        req = ProcessingRequest.from_object(
+            ProcessRequestModel.model_validate(orjson.loads(await _read_body(request))))
+        stage = trace.stage("parse", stage)
+        logger.info("rest_request_received",
+                    field1=req.field1, field2=req.field2, field3=req.field3)
+        stage = trace.stage("log", stage)
+        
+        deadline = deadlines.from_headers(request.headers, received)
+        result = processing.process(req, deadline)
+        stage = trace.stage("process", stage)
+        if deadlines.passed(deadline):
+            raise processing.DeadlineExceeded("late")
+        publisher.publish("rest", req, result)
+        storage.store("rest", req, result)
+        stage = trace.stage("publish", stage)
         
-        result = process_data(data)
+        PROCESS_OK_COUNT.inc()
         
-        REQUEST_COUNT.labels(
-            method='POST',
-            endpoint='/api/process',
-            http_status=200
-        ).inc()
+        PROCESS_LATENCY.observe(time.perf_counter() - start_time)
         
-        REQUEST_LATENCY.labels(
-            method='POST',
-            endpoint='/api/process'
-        ).observe(time.time() - start_time)
+        logger.info("rest_request_processed", processed_id=result.processed_id)
+        stage = trace.stage("log", stage)
+        body = processing.encode_json(result)
+        trace.stage("serialize", stage)
+        ok = True
+        return load_report.add_rest_header(Response(body, media_type="application/json"))
         
-        logger.info("rest_request_processed", result=result)
-        return result
+    except (ValidationError, orjson.JSONDecodeError) as e:
+        if isinstance(e, ValidationError):
+            detail = [{"type": err["type"], "loc": err["loc"], "msg": err["msg"]}
+                      for err in e.errors(include_url=False)]
+        else:
+            detail = [{"type": "json_invalid", "loc": [], "msg": str(e)}]
+        logger.warning("rest_request_invalid", errors=detail)
+        PROCESS_INVALID_COUNT.inc()
+        trace.fail("invalid")
+        ok = True
+        return load_report.add_rest_header(ORJSONResponse({"detail": detail}, status_code=422))
+        
+    except processing.DeadlineExceeded as e:
+        deadlines.record("rest", e)
+        logger.info("rest_request_deadline_exceeded", stage=e.stage)
+        PROCESS_TIMEOUT_COUNT.inc()
+        trace.fail(str(e))
+        return load_report.add_rest_header(ORJSONResponse({"detail": str(e)}, status_code=504))
+        
+    except PayloadTooLarge:
+        # Corpo acima de REST_MAX_BODY_BYTES durante a leitura: o CompressionMiddleware responde 413
+        trace.fail("payload too large")
+        raise
         
     except Exception as e:
         logger.error("rest_request_error", error=str(e))
-        REQUEST_COUNT.labels(
-            method='POST',
-            endpoint='/api/process',
-            http_status=500
-        ).inc()
+        PROCESS_ERROR_COUNT.inc()
+        trace.fail(str(e))
         raise
+    finally:
+        REST_IN_FLIGHT.end(ok)
+        # Como no ProcessData: 422, 504 e erros também entram no histograma HDR
+        PROCESS_REST_LATENCY.record(time.perf_counter() - start_time)
+        trace.finish()
 
 @app.get("/metrics")
 async def metrics():
@@ -93,10 +165,56 @@ async def metrics():
         media_type=CONTENT_TYPE_LATEST
     )
 
+@app.get("/debug/latency")
+async def debug_latency():
+    """Snapshot dos histogramas HDR (ms) por rota REST e RPC gRPC deste processo.
+
+    Com `python -m app` o gRPC roda em outro processo: aqui só aparece o REST e os
+    quantis do gRPC ficam no /metrics dele (GRPC_METRICS_PORT, service_b_latency_seconds)."""
+    return latency.snapshot()
+
+@app.delete("/debug/latency")
+async def reset_debug_latency():
+    """Zera os histogramas HDR (chamar no início de cada execução de teste)"""
+    latency.reset()
+    return {"status": "reset"}
+
 @app.get("/health")
 async def health():
+    """Liveness: o processo está de pé (não indica que já pode receber tráfego)"""
     return {"status": "ok"}
 
-# Iniciar servidor gRPC em uma thread separada
-grpc_server = grpc_serve()
-logger.info("Servidor gRPC iniciado na porta 50052")
+@app.get("/ready")
+async def ready():
+    """Readiness: REST e gRPC aceitando conexões e aquecimento concluído"""
+    if lifecycle.is_ready():
+        return {"status": "ready"}
+    return ORJSONResponse({"status": "starting"}, status_code=503)
+
+# Servidor gRPC nas threads do próprio gRPC, no mesmo processo do FastAPI,
+# para que /metrics e /debug/latency cubram os dois protocolos (GRPC_EMBEDDED=1;
+# com python -m app o gRPC tem processo e /metrics próprios)
+grpc_server = None
+
+@app.on_event("startup")
+async def start_grpc():
+    global grpc_server
+    publisher.start()
+    storage.start()
+    tracing.start()
+    if config.GRPC_EMBEDDED:
+        grpc_server = grpc_create_server()
+        lifecycle.on_drain(grpc_server.stop)
+        logger.info(f"Servidor gRPC iniciado na porta {config.GRPC_PORT}")
+    lifecycle.mark_phase("app")
+    # No modo python -m app a porta gRPC é do outro processo; a espera cobre os dois casos
+    lifecycle.start_warm_up(config.REST_PORT, config.GRPC_PORT, config.STARTUP_TIMEOUT_S)
+
+@app.on_event("shutdown")
+async def stop_grpc():
+    # O drain começa no sinal (app.rest_server); aqui só se espera o fim da carência,
+    # numa thread para não parar o loop enquanto as requisições REST terminam
+    await asyncio.to_thread(lifecycle.finish_drain)
+    publisher.stop()
+    storage.stop()
+    tracing.stop()
@@ -0,0 +1,23 @@
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+
+class ProcessRequestModel(BaseModel):
+    """Corpo de POST /api/process, espelhando o ProcessRequest do processing.proto.
+
+    O corpo é decodificado com orjson e validado uma única vez
+    (`model_validate`); ver tools/bench_json.py. Tem os mesmos atributos
+    field1..field10 que `processing.process()` espera.
+    """
+
+    field1: str = ""
+    field2: str = ""
+    field3: int = 0
+    field4: bool = False
+    field5: List[str] = []
+    field6: Dict[str, str] = {}
+    field7: str = ""
+    field8: float = 0.0
+    field9: str = ""
+    field10: str = ""
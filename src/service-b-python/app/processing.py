@@ -0,0 +1,156 @@
+"""
+Motor de processamento compartilhado pelos handlers REST e gRPC.
+
+`process()` recebe qualquer objeto com os atributos field1..field10: o gRPC
+passa a própria mensagem protobuf (sem cópia nem dicionário intermediário) e o
+REST monta um `ProcessingRequest` com __slots__. O `ProcessingResult` é
+codificado diretamente em bytes: as partes constantes da resposta (mensagem,
+success, cabeçalhos dos campos) são pré-codificadas uma única vez no import.
+"""
+
+import json
+import os
+import time
+
+from app import config
+
+FIELDS = ("field1", "field2", "field3", "field4", "field5",
+          "field6", "field7", "field8", "field9", "field10")
+
+REST_MESSAGE = "Dados processados com sucesso"
+GRPC_MESSAGE = "Dados processados com sucesso via gRPC"
+
+
+class ProcessingRequest:
+    """ProcessRequest vindo do REST, com a mesma interface da mensagem protobuf."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, field1="", field2="", field3=0, field4=False, field5=(),
+                 field6=None, field7="", field8=0.0, field9="", field10=""):
+        self.field1 = field1
+        self.field2 = field2
+        self.field3 = field3
+        self.field4 = field4
+        self.field5 = field5
+        self.field6 = field6 if field6 is not None else {}
+        self.field7 = field7
+        self.field8 = field8
+        self.field9 = field9
+        self.field10 = field10
+
+    @classmethod
+    def from_mapping(cls, data):
+        get = data.get
+        return cls(get("field1", ""), get("field2", ""), get("field3", 0), get("field4", False),
+                   get("field5", ()), get("field6"), get("field7", ""), get("field8", 0.0),
+                   get("field9", ""), get("field10", ""))
+
+    @classmethod
+    def from_object(cls, obj):
+        """Cópia rasa de um objeto com field1..field10 (ex.: o modelo pydantic validado,
+        que carrega __dict__ e o conjunto de campos definidos)."""
+        return cls(obj.field1, obj.field2, obj.field3, obj.field4, obj.field5,
+                   obj.field6, obj.field7, obj.field8, obj.field9, obj.field10)
+
+
+class ProcessingResult:
+    __slots__ = ("processed_id", "timestamp")
+
+    def __init__(self, processed_id, timestamp):
+        self.processed_id = processed_id
+        self.timestamp = timestamp
+
+    def to_dict(self, message=REST_MESSAGE):
+        return {
+            "message": message,
+            "success": True,
+            "processedId": self.processed_id,
+            "timestamp": self.timestamp,
+        }
+
+
+class DeadlineExceeded(Exception):
+    """O resultado não chegaria a tempo ao cliente; `avoided` é o processamento poupado (s)."""
+
+    def __init__(self, stage, avoided=0.0):
+        super().__init__(f"deadline exceeded ({stage})")
+        self.stage = stage
+        self.avoided = avoided
+
+
+def process(request, deadline=None, cancelled=None):
+    """`deadline` é um instante de time.monotonic() e `cancelled` um threading.Event
+    marcado quando o cliente desiste (ver app.deadlines)."""
+    delay = config.PROCESSING_DELAY
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("expired", delay)
+        if remaining < delay:
+            raise DeadlineExceeded("insufficient", delay)
+    # Simula processamento (PROCESSING_DELAY=0 desliga o atraso para benchmarks)
+    if delay:
+        if cancelled is None:
+            time.sleep(delay)
+        else:
+            started = time.monotonic()
+            if cancelled.wait(delay):
+                raise DeadlineExceeded("cancelled", delay - (time.monotonic() - started))
+    return ProcessingResult(new_processed_id(), int(time.time()))
+
+
+def new_processed_id():
+    """UUID versão 4 em texto, como str(uuid.uuid4()), sem montar o objeto uuid.UUID
+    (cuja validação e formatação em Python custavam mais que o resto da conversão)."""
+    raw = bytearray(os.urandom(16))
+    raw[6] = raw[6] & 0x0F | 0x40  # versão 4
+    raw[8] = raw[8] & 0x3F | 0x80  # variante RFC 4122
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+# Resposta JSON: {"message":...,"success":true,"processedId":"<id>","timestamp":<ts>}
+_JSON_PREFIX = ('{"message":' + json.dumps(REST_MESSAGE) + ',"success":true,"processedId":"').encode()
+_JSON_MIDDLE = b'","timestamp":'
+_JSON_SUFFIX = b"}"
+
+
+def encode_json(result):
+    return b"".join((_JSON_PREFIX, result.processed_id.encode(), _JSON_MIDDLE,
+                     _encoded_timestamp(result.timestamp)[1], _JSON_SUFFIX))
+
+
+def _varint(value):
+    out = bytearray()
+    value &= (1 << 64) - 1
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+# ProcessResponse: message=1 (string), success=2 (bool), processedId=3 (string), timestamp=4 (int64)
+_GRPC_MESSAGE_BYTES = GRPC_MESSAGE.encode()
+_PB_PREFIX = b"\x0a" + _varint(len(_GRPC_MESSAGE_BYTES)) + _GRPC_MESSAGE_BYTES + b"\x10\x01"
+
+
+def encode_protobuf(result):
+    processed_id = result.processed_id.encode()
+    size = len(processed_id)
+    return b"".join((_PB_PREFIX, b"\x1a", bytes((size,)) if size < 0x80 else _varint(size), processed_id,
+                     _encoded_timestamp(result.timestamp)[0]))
+
+
+# O timestamp muda uma vez por segundo: guarda a última codificação (protobuf, JSON)
+_last_timestamp = (None, b"", b"")
+
+
+def _encoded_timestamp(timestamp):
+    global _last_timestamp
+    cached = _last_timestamp
+    if cached[0] != timestamp:
+        cached = (timestamp, b"\x20" + _varint(timestamp), str(timestamp).encode())
+        _last_timestamp = cached
+    return cached[1:]
@@ -0,0 +1,236 @@
+"""
+Endpoints de profiling do Serviço B (opt-in via PROFILING_ENABLED=1).
+
+- /debug/profile/cpu?seconds=N    amostragem de pilhas só das threads em execução
+- /debug/profile/wall?seconds=N   amostragem de todas as threads (inclui pool gRPC ociosa)
+- /debug/profile/memory?seconds=N maiores alocações via tracemalloc
+- /debug/profile/threads          pilha atual de cada thread
+- /debug/profile/tasks            tarefas asyncio pendentes (somente processo REST)
+
+As saídas de cpu/wall estão no formato "folded" (`thread;f1;f2 contagem`), aceito
+por flamegraph.pl, speedscope e inferno. Com o profiling desabilitado nada é
+registrado nem executado, e o sampler só existe durante a janela pedida.
+
+O modo cpu é uma aproximação: descarta amostras cuja pilha termina em uma espera
+conhecida (locks, filas, select). Esperas dentro de código da aplicação, como o
+time.sleep do processamento simulado, só aparecem no modo wall.
+"""
+
+import asyncio
+import io
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import structlog
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+logger = structlog.get_logger()
+
+MAX_SECONDS = 120
+DEFAULT_INTERVAL = 0.01
+# Abaixo disso o sampler vira um laço ocupado e o profiling domina a CPU medida
+MIN_INTERVAL = 0.001
+
+# (arquivo, função) de frames-folha que indicam thread bloqueada, não em CPU
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("socketserver.py", "serve_forever"),
+    ("_server.py", "_serve"),
+    ("profiling.py", "_sample"),
+}
+
+_profile_lock = threading.Lock()
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})"
+
+
+def _is_idle(frame):
+    code = frame.f_code
+    return (code.co_filename.rsplit("/", 1)[-1], code.co_name) in IDLE_FRAMES
+
+
+def _bounded(value, low, high):
+    """`value` como float limitado a [low, high]; ValueError se não for um número."""
+    value = float(value)
+    if value != value:
+        raise ValueError("not a number")
+    return min(max(value, low), high)
+
+
+def _sample(seconds, interval, mode):
+    names = {t.ident: t.name for t in threading.enumerate()}
+    me = threading.get_ident()
+    stacks = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == me or (mode == "cpu" and _is_idle(frame)):
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(ident) or f"thread-{ident}")
+            stacks[";".join(reversed(labels))] += 1
+        time.sleep(interval)
+    return stacks
+
+
+def sample_stacks(seconds, mode="cpu", interval=DEFAULT_INTERVAL):
+    """Amostra as pilhas de todas as threads do processo e retorna o formato folded."""
+    seconds = _bounded(seconds, 0, MAX_SECONDS)
+    interval = _bounded(interval, MIN_INTERVAL, MAX_SECONDS)
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("profiling already running")
+    try:
+        logger.info("profile_started", mode=mode, seconds=seconds)
+        stacks = _sample(seconds, interval, mode)
+    finally:
+        _profile_lock.release()
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def tracemalloc_top(seconds, limit=25):
+    """Rastreia alocações por `seconds` e retorna as maiores por linha de código."""
+    seconds = _bounded(seconds, 0, MAX_SECONDS)
+    limit = int(limit)
+    # Mesmo lock do sampler: duas janelas concorrentes parariam o tracemalloc uma da outra
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("profiling already running")
+    try:
+        logger.info("profile_started", mode="memory", seconds=seconds)
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            time.sleep(seconds)
+            after = tracemalloc.take_snapshot()
+        finally:
+            if started_here:
+                tracemalloc.stop()
+    finally:
+        _profile_lock.release()
+    out = io.StringIO()
+    out.write(f"# top {limit} alocações em {seconds:g}s (diferença entre snapshots)\n")
+    for stat in after.compare_to(before, "lineno")[:limit]:
+        out.write(f"{stat}\n")
+    return out.getvalue()
+
+
+def thread_dump():
+    names = {t.ident: t.name for t in threading.enumerate()}
+    out = io.StringIO()
+    for ident, frame in sys._current_frames().items():
+        out.write(f"--- {names.get(ident) or ident} ---\n")
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+        for label in reversed(stack):
+            out.write(f"  {label}\n")
+    return out.getvalue()
+
+
+def task_dump():
+    out = io.StringIO()
+    tasks = asyncio.all_tasks()
+    out.write(f"# {len(tasks)} tarefas asyncio\n")
+    for task in tasks:
+        out.write(f"--- {task.get_name()} ({task.get_coro()!r}) ---\n")
+        for frame in task.get_stack():
+            out.write(f"  {_frame_label(frame)}\n")
+    return out.getvalue()
+
+
+# Endpoints REST (incluídos em app.main somente se PROFILING_ENABLED)
+router = APIRouter(prefix="/debug/profile")
+
+
+async def _in_thread(func, *args):
+    try:
+        return PlainTextResponse(await asyncio.to_thread(func, *args))
+    except RuntimeError as e:
+        return PlainTextResponse(str(e), status_code=409)
+    except ValueError as e:
+        return PlainTextResponse(str(e), status_code=400)
+
+
+@router.get("/cpu")
+async def profile_cpu(seconds: float = 10, interval: float = DEFAULT_INTERVAL):
+    return await _in_thread(sample_stacks, seconds, "cpu", interval)
+
+
+@router.get("/wall")
+async def profile_wall(seconds: float = 10, interval: float = DEFAULT_INTERVAL):
+    return await _in_thread(sample_stacks, seconds, "wall", interval)
+
+
+@router.get("/memory")
+async def profile_memory(seconds: float = 10, limit: int = 25):
+    return await _in_thread(tracemalloc_top, seconds, limit)
+
+
+@router.get("/threads")
+async def profile_threads():
+    return PlainTextResponse(thread_dump())
+
+
+@router.get("/tasks")
+async def profile_tasks():
+    return PlainTextResponse(task_dump())
+
+
+# Servidor HTTP mínimo para o processo gRPC dedicado (python -m app), que não tem FastAPI
+class _DebugHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        seconds = params.get("seconds", 10)
+        try:
+            if url.path == "/debug/profile/cpu":
+                body = sample_stacks(seconds, "cpu", float(params.get("interval", DEFAULT_INTERVAL)))
+            elif url.path == "/debug/profile/wall":
+                body = sample_stacks(seconds, "wall", float(params.get("interval", DEFAULT_INTERVAL)))
+            elif url.path == "/debug/profile/memory":
+                body = tracemalloc_top(seconds, int(params.get("limit", 25)))
+            elif url.path == "/debug/profile/threads":
+                body = thread_dump()
+            else:
+                self.send_error(404)
+                return
+        except RuntimeError as e:
+            self.send_error(409, str(e))
+            return
+        except ValueError as e:
+            self.send_error(400, f"invalid parameter: {e}")
+            return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_debug_server(port):
+    server = ThreadingHTTPServer(("0.0.0.0", port), _DebugHandler)
+    threading.Thread(target=server.serve_forever, name="debug-http", daemon=True).start()
+    logger.info(f"Debug/profiling server started on port {port}")
+    return server
@@ -0,0 +1,122 @@
+"""
+Publicação assíncrona dos resultados processados no Kafka (opt-in: KAFKA_ENABLED=1).
+
+Os handlers REST e gRPC só chamam `publish()`, que enfileira (request, result)
+numa fila limitada e retorna imediatamente (app.batching). Uma thread de envio
+monta lotes de até KAFKA_BATCH_SIZE registros ou KAFKA_LINGER_MS de espera,
+codifica em JSON e envia pelo broker. Com a fila cheia a política
+KAFKA_QUEUE_FULL_POLICY decide: `drop` descarta e conta (nunca bloqueia o
+handler) e `block` espera até KAFKA_ENQUEUE_TIMEOUT_MS antes de descartar.
+"""
+
+import orjson
+import structlog
+from prometheus_client import Counter, Gauge, Histogram
+
+from app import config
+from app.batching import MicroBatcher
+from app.broker import InMemoryBroker, KafkaBroker, ProduceError
+from app.processing import FIELDS
+
+logger = structlog.get_logger()
+
+PUBLISHED = Counter('kafka_published_total', 'Processed results published to Kafka')
+DROPPED = Counter('kafka_dropped_total', 'Processed results dropped because the queue was full')
+PUBLISH_ERRORS = Counter('kafka_publish_errors_total', 'Batches that failed to publish')
+BATCH_SIZE = Histogram(
+    'kafka_batch_size',
+    'Records per published batch',
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+)
+QUEUE_DEPTH = Gauge('kafka_queue_depth', 'Processed results waiting to be published')
+
+
+def encode_record(protocol, request, result):
+    record = {field: getattr(request, field) for field in FIELDS}
+    # repeated/map do protobuf não são serializáveis diretamente
+    record["field5"] = list(record["field5"])
+    record["field6"] = dict(record["field6"])
+    record["protocol"] = protocol
+    record["processedId"] = result.processed_id
+    record["timestamp"] = result.timestamp
+    return orjson.dumps(record)
+
+
+class ResultPublisher:
+    def __init__(self, broker, topic, queue_size=10000, batch_size=500, linger_ms=20,
+                 full_policy="drop", enqueue_timeout_ms=5):
+        self.broker = broker
+        self.topic = topic
+        self._batcher = MicroBatcher(
+            self._send, "kafka-publisher", queue_size=queue_size, batch_size=batch_size,
+            linger_ms=linger_ms, full_policy=full_policy,
+            enqueue_timeout_ms=enqueue_timeout_ms, on_drop=DROPPED.inc,
+        )
+
+    def start(self):
+        QUEUE_DEPTH.set_function(self._batcher.qsize)
+        self._batcher.start()
+        return self
+
+    def publish(self, protocol, request, result):
+        """Enfileira sem bloquear o handler; retorna False se o item foi descartado."""
+        return self._batcher.put((protocol, request, result))
+
+    def stop(self, timeout=5.0):
+        """Envia o que ainda está na fila (até `timeout`) e fecha o broker."""
+        self._batcher.stop(timeout)
+        self.broker.close()
+
+    def _send(self, batch):
+        try:
+            records = [encode_record(protocol, request, result) for protocol, request, result in batch]
+            self.broker.produce(self.topic, records)
+            PUBLISHED.inc(len(records))
+            BATCH_SIZE.observe(len(records))
+        except ProduceError as e:
+            # Envio parcial: só os confirmados contam como publicados
+            PUBLISHED.inc(e.delivered)
+            PUBLISH_ERRORS.inc()
+            logger.error("kafka_publish_error", error=str(e), batch=len(batch), failed=e.failed)
+        except Exception as e:
+            PUBLISH_ERRORS.inc()
+            logger.error("kafka_publish_error", error=str(e), batch=len(batch))
+
+
+# Publicador do processo (None quando KAFKA_ENABLED=0)
+publisher = None
+
+
+def create_broker():
+    if config.KAFKA_BACKEND == "memory":
+        return InMemoryBroker()
+    return KafkaBroker(config.KAFKA_BOOTSTRAP_SERVERS)
+
+
+def start(broker=None):
+    global publisher
+    if publisher is None and config.KAFKA_ENABLED:
+        publisher = ResultPublisher(
+            broker or create_broker(),
+            config.KAFKA_RESULTS_TOPIC,
+            queue_size=config.KAFKA_QUEUE_SIZE,
+            batch_size=config.KAFKA_BATCH_SIZE,
+            linger_ms=config.KAFKA_LINGER_MS,
+            full_policy=config.KAFKA_QUEUE_FULL_POLICY,
+            enqueue_timeout_ms=config.KAFKA_ENQUEUE_TIMEOUT_MS,
+        ).start()
+        logger.info("kafka_publisher_started", topic=config.KAFKA_RESULTS_TOPIC,
+                    backend=config.KAFKA_BACKEND)
+    return publisher
+
+
+def stop():
+    global publisher
+    if publisher is not None:
+        publisher.stop()
+        publisher = None
+
+
+def publish(protocol, request, result):
+    if publisher is not None:
+        publisher.publish(protocol, request, result)
@@ -0,0 +1,100 @@
+"""
+Inicialização do servidor REST conforme REST_SERVER (ver app/config.py).
+
+Uso: python -m app.rest_server
+"""
+
+import asyncio
+import signal
+
+import structlog
+import uvicorn
+
+from app import config, lifecycle
+
+logger = structlog.get_logger()
+
+REST_SERVERS = ("uvicorn", "uvicorn-fast", "hypercorn")
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn.Server que começa o drain (readiness falsa, gRPC parando) já no sinal,
+    em paralelo com o fechamento das conexões REST."""
+
+    def handle_exit(self, sig, frame):
+        lifecycle.begin_drain()
+        super().handle_exit(sig, frame)
+
+
+def _serve_uvicorn(**kwargs):
+    DrainingServer(uvicorn.Config(
+        "app.main:app",
+        host=config.REST_HOST,
+        port=config.REST_PORT,
+        timeout_graceful_shutdown=config.SHUTDOWN_GRACE_S,
+        **kwargs,
+    )).run()
+
+
+def run_uvicorn():
+    """Configuração original: uvicorn com loop/parser detectados e defaults."""
+    _serve_uvicorn()
+
+
+def run_uvicorn_fast():
+    _serve_uvicorn(
+        loop="uvloop",
+        http="httptools",
+        backlog=config.REST_BACKLOG,
+        timeout_keep_alive=config.REST_KEEPALIVE_TIMEOUT,
+        access_log=False,
+    )
+
+
+async def _shutdown_trigger():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+    lifecycle.begin_drain()
+
+
+def run_hypercorn():
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    from app.main import app
+
+    hypercorn_config = Config()
+    hypercorn_config.bind = [f"{config.REST_HOST}:{config.REST_PORT}"]
+    hypercorn_config.backlog = config.REST_BACKLOG
+    hypercorn_config.keep_alive_timeout = config.REST_KEEPALIVE_TIMEOUT
+    hypercorn_config.h2_max_concurrent_streams = config.REST_H2_MAX_CONCURRENT_STREAMS
+    hypercorn_config.accesslog = None
+    hypercorn_config.graceful_timeout = config.SHUTDOWN_GRACE_S
+
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    asyncio.run(serve(app, hypercorn_config, shutdown_trigger=_shutdown_trigger))
+
+
+def run():
+    server = config.REST_SERVER
+    if server not in REST_SERVERS:
+        logger.warning("rest_server_unknown", requested=server, fallback="uvicorn")
+        server = "uvicorn"
+    logger.info("rest_server_starting", server=server, port=config.REST_PORT)
+    if server == "uvicorn-fast":
+        run_uvicorn_fast()
+    elif server == "hypercorn":
+        run_hypercorn()
+    else:
+        run_uvicorn()
+
+
+if __name__ == "__main__":
+    run()
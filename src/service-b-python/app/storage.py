@@ -0,0 +1,134 @@
+"""
+Cliente de armazenamento do Serviço B para o Serviço C (opt-in: STORAGE_ENABLED=1).
+
+Os handlers só chamam `store()`, que enfileira (request, result) e retorna
+imediatamente. As threads de envio (STORAGE_SENDERS) agrupam até
+STORAGE_BATCH_SIZE registros ou STORAGE_LINGER_MS de espera e enviam cada lote
+como um stream `StoreBatch` por um único canal gRPC de longa duração,
+compartilhado pelo processo: o custo de conexão e de RPC é amortizado pelo lote
+e a requisição nunca espera pelo Serviço C.
+"""
+
+import time
+
+import grpc
+import structlog
+from prometheus_client import Counter, Gauge, Histogram
+
+from app import config
+from app.batching import MicroBatcher
+from app.generated import storage_pb2, storage_pb2_grpc
+from app.publisher import encode_record
+
+logger = structlog.get_logger()
+
+STORED = Counter('storage_stored_total', 'Processed results stored in service-c')
+FAILED = Counter('storage_failed_total', 'Processed results service-c failed to store')
+DROPPED = Counter('storage_dropped_total', 'Processed results dropped because the queue was full')
+BATCH_ERRORS = Counter('storage_batch_errors_total', 'StoreBatch calls that failed', ['code'])
+BATCH_SIZE = Histogram(
+    'storage_batch_size',
+    'Records per StoreBatch call',
+    buckets=(1, 5, 10, 25, 50, 100, 200, 500, 1000)
+)
+BATCH_DURATION = Histogram(
+    'storage_batch_duration_seconds',
+    'StoreBatch call duration',
+    buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, 5.0)
+)
+QUEUE_DEPTH = Gauge('storage_queue_depth', 'Processed results waiting to be stored')
+
+
+def channel_options():
+    return [
+        ("grpc.keepalive_time_ms", config.GRPC_KEEPALIVE_TIME_MS),
+        ("grpc.keepalive_timeout_ms", config.GRPC_KEEPALIVE_TIMEOUT_MS),
+        ("grpc.max_send_message_length", config.GRPC_MAX_MESSAGE_BYTES),
+        ("grpc.max_receive_message_length", config.GRPC_MAX_MESSAGE_BYTES),
+    ]
+
+
+class StorageClient:
+    def __init__(self, target, queue_size=10000, batch_size=200, linger_ms=10, senders=2,
+                 timeout_ms=5000, full_policy="drop", enqueue_timeout_ms=5):
+        self.channel = grpc.insecure_channel(target, options=channel_options())
+        self.stub = storage_pb2_grpc.StorageServiceStub(self.channel)
+        self.timeout = timeout_ms / 1000
+        self._batcher = MicroBatcher(
+            self._send, "storage-client", queue_size=queue_size, batch_size=batch_size,
+            linger_ms=linger_ms, full_policy=full_policy,
+            enqueue_timeout_ms=enqueue_timeout_ms, on_drop=DROPPED.inc, workers=senders,
+        )
+
+    def start(self):
+        QUEUE_DEPTH.set_function(self._batcher.qsize)
+        self._batcher.start()
+        return self
+
+    def store(self, protocol, request, result):
+        """Enfileira sem bloquear o handler; retorna False se o item foi descartado."""
+        return self._batcher.put((protocol, request, result))
+
+    def stop(self, timeout=5.0):
+        """Grava o que ainda está na fila (até `timeout`) e fecha o canal."""
+        self._batcher.stop(timeout)
+        self.channel.close()
+
+    def _send(self, batch):
+        start_time = time.perf_counter()
+        try:
+            requests = [
+                storage_pb2.StorageRequest(
+                    processedId=result.processed_id,
+                    data=encode_record(protocol, request, result).decode(),
+                )
+                for protocol, request, result in batch
+            ]
+            response = self.stub.StoreBatch(iter(requests), timeout=self.timeout, wait_for_ready=True)
+        except grpc.RpcError as e:
+            BATCH_ERRORS.labels(code=e.code().name).inc()
+            FAILED.inc(len(batch))
+            logger.error("storage_batch_error", code=e.code().name, batch=len(batch))
+            return
+        except Exception as e:
+            # Qualquer outra falha (codificação, canal fechado) não pode matar a thread de envio
+            BATCH_ERRORS.labels(code="UNKNOWN").inc()
+            FAILED.inc(len(batch))
+            logger.error("storage_batch_error", error=str(e), batch=len(batch))
+            return
+        finally:
+            BATCH_DURATION.observe(time.perf_counter() - start_time)
+        STORED.inc(response.stored)
+        FAILED.inc(response.failed)
+        BATCH_SIZE.observe(len(requests))
+
+# Cliente do processo (None quando STORAGE_ENABLED=0)
+client = None
+
+
+def start():
+    global client
+    if client is None and config.STORAGE_ENABLED:
+        client = StorageClient(
+            config.STORAGE_GRPC_TARGET,
+            queue_size=config.STORAGE_QUEUE_SIZE,
+            batch_size=config.STORAGE_BATCH_SIZE,
+            linger_ms=config.STORAGE_LINGER_MS,
+            senders=config.STORAGE_SENDERS,
+            timeout_ms=config.STORAGE_TIMEOUT_MS,
+            full_policy=config.STORAGE_QUEUE_FULL_POLICY,
+        ).start()
+        logger.info("storage_client_started", target=config.STORAGE_GRPC_TARGET)
+    return client
+
+
+def stop():
+    global client
+    if client is not None:
+        client.stop()
+        client = None
+
+
+def store(protocol, request, result):
+    if client is not None:
+        client.store(protocol, request, result)
@@ -0,0 +1,302 @@
+"""
+Rastreamento por requisição (opt-in: TRACING_ENABLED=1) para decompor a latência
+do Serviço B por etapa, sem dependência do SDK do OpenTelemetry.
+
+Cada requisição amostrada gera um span de servidor e um span filho por etapa:
+`queue` (só com o cabeçalho X-Request-Start do chamador, antes do início do
+span de servidor e limitada a MAX_QUEUE_NS), `parse`, `log`,
+`process`, `publish` e `serialize`. O contexto W3C `traceparent` vem dos
+cabeçalhos HTTP ou do metadata gRPC. A amostragem é decidida na entrada
+(head-based): se o chamador enviou `traceparent`, vale a flag `sampled` dele;
+senão, sorteio com TRACING_SAMPLE_RATE. Requisições não amostradas recebem
+`NOOP_TRACE`.
+
+As etapas são contíguas e marcadas sem gerenciador de contexto: o handler pega
+`stage = trace.clock()` e, ao fim de cada etapa, `stage = trace.stage(nome, stage)`.
+No `NOOP_TRACE` cada marca é uma chamada vazia, sem alocação (um `with` por
+etapa custaria o método __exit__ ligado em toda requisição).
+
+Os traces concluídos são enfileirados (app.batching) e exportados fora do
+caminho da requisição, como spans no formato JSON do OTLP:
+- `file`: uma linha JSON por span em TRACING_FILE (append atômico por lote, o
+  arquivo pode ser compartilhado pelos processos REST e gRPC);
+- `otlp`: POST OTLP/HTTP JSON em TRACING_OTLP_ENDPOINT (um coletor real ou o
+  tools.span_collector).
+
+A decomposição é feita pelo tools.trace_breakdown.
+"""
+
+import os
+import random
+import time
+import urllib.request
+
+import orjson
+import structlog
+from prometheus_client import Counter, Gauge
+
+from app import config
+from app.batching import MicroBatcher
+
+logger = structlog.get_logger()
+
+TRACEPARENT_HEADER = "traceparent"
+# Instante em que o chamador (proxy/gateway) enviou a requisição: "t=<epoch>" em s, ms, µs ou ns
+REQUEST_START_HEADER = "x-request-start"
+# Relógio do chamador: esperas negativas (skew) ou acima disso são descartadas
+MAX_QUEUE_NS = 60 * 1_000_000_000
+
+SERVICE_NAME = "service-b"
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+TRACES_SAMPLED = Counter('tracing_traces_sampled_total', 'Requests traced by head-based sampling',
+                         ['protocol'])
+SPANS_EXPORTED = Counter('tracing_spans_exported_total', 'Spans written to the trace exporter')
+TRACES_DROPPED = Counter('tracing_traces_dropped_total', 'Traces dropped because the export queue was full')
+EXPORT_ERRORS = Counter('tracing_export_errors_total', 'Trace export batches that failed')
+QUEUE_DEPTH = Gauge('tracing_queue_depth', 'Traces waiting to be exported')
+
+def parse_traceparent(value):
+    """'00-<trace 32 hex>-<span 16 hex>-<flags>' -> (trace_id, parent_id, sampled) ou None"""
+    if not value:
+        return None
+    parts = value.strip().lower().split("-")
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == "ff":
+        return None
+    trace_id, parent_id, flags = parts[1], parts[2], parts[3]
+    if len(trace_id) != 32 or len(parent_id) != 16 or len(flags) != 2:
+        return None
+    try:
+        int(trace_id, 16), int(parent_id, 16)
+        sampled = int(flags, 16) & 1
+    except ValueError:
+        return None
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(sampled)
+
+
+def parse_request_start(value):
+    """'t=1694000000123' (ou s/µs/ns, com ou sem 't=') -> epoch em ns, ou None"""
+    if not value:
+        return None
+    try:
+        number = float(value.strip().removeprefix("t="))
+    except ValueError:
+        return None
+    for limit, factor in ((1e11, 1e9), (1e14, 1e6), (1e17, 1e3)):
+        if number < limit:
+            return int(number * factor)
+    return int(number)
+
+
+class Trace:
+    """Span de servidor de uma requisição amostrada e os spans das etapas."""
+
+    __slots__ = ("protocol", "name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "spans", "error")
+
+    def __init__(self, protocol, name, trace_id, parent_id, start_ns):
+        self.protocol = protocol
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = start_ns
+        self.end_ns = None
+        self.spans = []
+        self.error = None
+
+    def clock(self):
+        return time.time_ns()
+
+    def stage(self, name, start_ns):
+        """Fecha a etapa `name` iniciada em `start_ns`; devolve o início da próxima."""
+        end_ns = time.time_ns()
+        self.spans.append((name, start_ns, end_ns))
+        return end_ns
+
+    def add(self, name, start_ns, end_ns):
+        self.spans.append((name, start_ns, end_ns))
+
+    def fail(self, reason):
+        self.error = reason
+
+    def finish(self):
+        self.end_ns = time.time_ns()
+        if exporter is not None:
+            exporter.export(self)
+
+
+class _NoopTrace:
+    """Requisição não amostrada (ou rastreamento desligado): nada é medido."""
+
+    __slots__ = ()
+
+    def clock(self):
+        return 0
+
+    def stage(self, name, start_ns):
+        return 0
+
+    def add(self, name, start_ns, end_ns):
+        pass
+
+    def fail(self, reason):
+        pass
+
+    def finish(self):
+        pass
+
+
+NOOP_TRACE = _NoopTrace()
+
+
+def begin(protocol, name, headers):
+    """Trace da requisição, ou NOOP_TRACE se desligado/não amostrado.
+
+    `headers` são os cabeçalhos HTTP ou o invocation_metadata() do gRPC."""
+    if exporter is None:
+        return NOOP_TRACE
+    if not hasattr(headers, "get"):
+        headers = dict(headers)
+
+    parent = parse_traceparent(headers.get(TRACEPARENT_HEADER))
+    if parent is not None:
+        trace_id, parent_id, sampled = parent
+    else:
+        trace_id, parent_id, sampled = None, None, random.random() < config.TRACING_SAMPLE_RATE
+    if not sampled:
+        return NOOP_TRACE
+
+    start_ns = time.time_ns()
+    trace = Trace(protocol, name, trace_id or os.urandom(16).hex(), parent_id, start_ns)
+    request_start = parse_request_start(headers.get(REQUEST_START_HEADER))
+    # O span de servidor fica no relógio do próprio Serviço B; `queue` é só uma etapa
+    if request_start is not None and 0 < start_ns - request_start <= MAX_QUEUE_NS:
+        trace.add("queue", request_start, start_ns)
+    TRACES_SAMPLED.labels(protocol=protocol).inc()
+    return trace
+
+
+def _attributes(values):
+    return [{"key": key, "value": {"stringValue": str(value)}} for key, value in values.items()]
+
+
+def to_otlp_spans(trace):
+    """Spans do trace no formato JSON do OTLP (ids em hex, tempos em ns como string)."""
+    attributes = _attributes({"service.name": SERVICE_NAME, "protocol": trace.protocol,
+                              "pid": os.getpid()})
+    root = {
+        "traceId": trace.trace_id,
+        "spanId": trace.span_id,
+        "name": trace.name,
+        "kind": SPAN_KIND_SERVER,
+        "startTimeUnixNano": str(trace.start_ns),
+        "endTimeUnixNano": str(trace.end_ns),
+        "attributes": attributes,
+        "status": {"code": STATUS_ERROR, "message": trace.error} if trace.error else {"code": STATUS_OK},
+    }
+    if trace.parent_id:
+        root["parentSpanId"] = trace.parent_id
+    spans = [root]
+    for name, start_ns, end_ns in trace.spans:
+        spans.append({
+            "traceId": trace.trace_id,
+            "spanId": os.urandom(8).hex(),
+            "parentSpanId": trace.span_id,
+            "name": name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": attributes,
+        })
+    return spans
+
+
+def otlp_payload(spans):
+    return {"resourceSpans": [{
+        "resource": {"attributes": _attributes({"service.name": SERVICE_NAME})},
+        "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": spans}],
+    }]}
+
+
+class SpanExporter:
+    """Exporta traces concluídos em lotes, fora do caminho da requisição."""
+
+    def __init__(self, kind, path=None, endpoint=None, queue_size=10000, batch_size=256,
+                 linger_ms=200, timeout_ms=2000):
+        if kind not in ("file", "otlp"):
+            raise ValueError(f"unknown trace exporter: {kind} (expected file or otlp)")
+        self.kind = kind
+        self.path = path
+        self.endpoint = endpoint
+        self.timeout = timeout_ms / 1000
+        self._fd = None
+        self._batcher = MicroBatcher(
+            self._send, "trace-exporter", queue_size=queue_size, batch_size=batch_size,
+            linger_ms=linger_ms, on_drop=TRACES_DROPPED.inc,
+        )
+
+    def start(self):
+        if self.kind == "file":
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        QUEUE_DEPTH.set_function(self._batcher.qsize)
+        self._batcher.start()
+        return self
+
+    def export(self, trace):
+        return self._batcher.put(trace)
+
+    def stop(self, timeout=5.0):
+        self._batcher.stop(timeout)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _send(self, batch):
+        spans = [span for trace in batch for span in to_otlp_spans(trace)]
+        try:
+            if self.kind == "file":
+                # Um único write com O_APPEND: linhas de processos diferentes não se misturam
+                os.write(self._fd, b"".join(orjson.dumps(span) + b"\n" for span in spans))
+            else:
+                request = urllib.request.Request(
+                    self.endpoint, data=orjson.dumps(otlp_payload(spans)),
+                    headers={"Content-Type": "application/json"}, method="POST")
+                with urllib.request.urlopen(request, timeout=self.timeout):
+                    pass
+            SPANS_EXPORTED.inc(len(spans))
+        except Exception as e:
+            EXPORT_ERRORS.inc()
+            logger.error("trace_export_error", exporter=self.kind, error=str(e), spans=len(spans))
+
+
+# Exportador do processo (None quando TRACING_ENABLED=0)
+exporter = None
+
+
+def start():
+    global exporter
+    if exporter is None and config.TRACING_ENABLED:
+        exporter = SpanExporter(
+            config.TRACING_EXPORTER,
+            path=config.TRACING_FILE,
+            endpoint=config.TRACING_OTLP_ENDPOINT,
+            queue_size=config.TRACING_QUEUE_SIZE,
+            batch_size=config.TRACING_BATCH_SIZE,
+            linger_ms=config.TRACING_LINGER_MS,
+        ).start()
+        logger.info("tracing_started", exporter=config.TRACING_EXPORTER,
+                    sample_rate=config.TRACING_SAMPLE_RATE)
+    return exporter
+
+
+def stop():
+    global exporter
+    if exporter is not None:
+        current, exporter = exporter, None
+        current.stop()
@@ -0,0 +1,69 @@
+"""
+Benchmark de compressão para payloads pequenos e grandes (REST/JSON e gRPC/protobuf).
+
+Para cada serialização e codificação mede o tamanho trafegado, o custo de
+comprimir + descomprimir e estima o tempo total por requisição em algumas
+larguras de banda (CPU + bytes / banda). A coluna "compensa" indica as bandas
+em que a codificação fica mais rápida que enviar o payload sem compressão.
+
+Uso (a partir de src/service-b-python):
+    python -m tools.bench_compression --items 2000
+"""
+
+import argparse
+import json
+import timeit
+
+from app.compression import SUPPORTED_ENCODINGS, compress, decompress
+from app.generated import processing_pb2
+from tools.loadgen import DEFAULT_PAYLOAD
+
+# Bandas consideradas (bits/s): rede de contêineres, LAN e WAN
+BANDWIDTHS = {"10Mb": 10e6, "100Mb": 100e6, "1Gb": 1e9}
+LEVELS = {"gzip": (1, 6), "zstd": (1, 3)}
+
+
+def large_payload(items):
+    payload = dict(DEFAULT_PAYLOAD)
+    payload["field5"] = [f"item-{i:06d}" for i in range(items)]
+    payload["field6"] = {f"chave-{i:06d}": f"valor-{i % 97}" for i in range(items)}
+    return payload
+
+
+def _time_us(call, number):
+    return min(timeit.repeat(call, number=number, repeat=3)) / number * 1_000_000
+
+
+def run(items, number):
+    payloads = {"pequeno": DEFAULT_PAYLOAD, "grande": large_payload(items)}
+    header = f"{'payload':<9}{'formato':<10}{'codificação':<13}{'bytes':>9}{'razão':>7}{'CPU µs':>9}"
+    header += "".join(f"{'total ' + name + ' µs':>17}" for name in BANDWIDTHS) + "  compensa"
+    print(header)
+    for size_name, payload in payloads.items():
+        formats = {
+            "json": json.dumps(payload).encode(),
+            "protobuf": processing_pb2.ProcessRequest(**payload).SerializeToString(),
+        }
+        for format_name, raw in formats.items():
+            baseline = {name: len(raw) * 8 / bw * 1_000_000 for name, bw in BANDWIDTHS.items()}
+            rows = [("none", len(raw), 0.0)]
+            for encoding in SUPPORTED_ENCODINGS:
+                for level in LEVELS[encoding]:
+                    data = compress(encoding, raw, level)
+                    cpu = _time_us(lambda: compress(encoding, raw, level), number)
+                    cpu += _time_us(lambda: decompress(encoding, data, len(raw)), number)
+                    rows.append((f"{encoding}-{level}", len(data), cpu))
+            for encoding, size, cpu in rows:
+                totals = {name: cpu + size * 8 / bw * 1_000_000 for name, bw in BANDWIDTHS.items()}
+                wins = [name for name in BANDWIDTHS if encoding != "none" and totals[name] < baseline[name]]
+                line = f"{size_name:<9}{format_name:<10}{encoding:<13}{size:>9}{len(raw) / size:>7.1f}{cpu:>9.1f}"
+                line += "".join(f"{totals[name]:>17.1f}" for name in BANDWIDTHS)
+                print(line + "  " + (",".join(wins) or "-"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de compressão do Serviço B")
+    parser.add_argument("--items", type=int, default=2000, help="itens em field5/field6 no payload grande")
+    parser.add_argument("--number", type=int, default=200, help="repetições por medição")
+    args = parser.parse_args()
+    run(args.items, args.number)
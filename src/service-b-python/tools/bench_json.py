@@ -0,0 +1,57 @@
+"""
+Benchmark do custo de JSON por requisição em POST /api/process.
+
+Compara, por etapa, o caminho padrão do FastAPI (request.json() com o json da
+stdlib; dict passado por jsonable_encoder + JSONResponse) com as alternativas:
+orjson, validação pydantic direto dos bytes e a resposta pré-codificada usada
+hoje pelo `process_rest`.
+
+Uso (a partir de src/service-b-python):
+    python -m tools.bench_json --iterations 100000
+"""
+
+import argparse
+import json
+import timeit
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app import processing
+from app.models import ProcessRequestModel
+from app.processing import ProcessingRequest, ProcessingResult
+from tools.loadgen import DEFAULT_PAYLOAD
+
+
+def run(iterations):
+    body = json.dumps(DEFAULT_PAYLOAD).encode()
+    result = ProcessingResult("0d5b8f55-3f47-4a55-9c5e-1e0c0b1b7a11", 1760000000)
+    result_dict = result.to_dict()
+
+    cases = [
+        ("entrada", "json stdlib + dict (antes)",
+         lambda: ProcessingRequest.from_mapping(json.loads(body))),
+        ("entrada", "orjson + dict",
+         lambda: ProcessingRequest.from_mapping(orjson.loads(body))),
+        ("entrada", "orjson + pydantic (atual)",
+         lambda: ProcessRequestModel.model_validate(orjson.loads(body))),
+        ("entrada", "pydantic model_validate_json",
+         lambda: ProcessRequestModel.model_validate_json(body)),
+        ("saída", "jsonable_encoder + JSONResponse (antes)",
+         lambda: JSONResponse(jsonable_encoder(result_dict)).body),
+        ("saída", "ORJSONResponse",
+         lambda: ORJSONResponse(result_dict).body),
+        ("saída", "bytes pré-codificados (atual)",
+         lambda: processing.encode_json(result)),
+    ]
+    print(f"{'etapa':<9}{'caminho':<42}{'µs/req':>9}")
+    for stage, name, call in cases:
+        seconds = min(timeit.repeat(call, number=iterations, repeat=3))
+        print(f"{stage:<9}{name:<42}{seconds / iterations * 1_000_000:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de serialização JSON do Serviço B")
+    parser.add_argument("--iterations", type=int, default=100000)
+    run(parser.parse_args().iterations)
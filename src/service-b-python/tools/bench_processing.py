@@ -0,0 +1,237 @@
+"""
+Microbenchmark do caminho de conversão/codificação dos handlers REST e gRPC.
+
+Compara o caminho anterior (dict para log, ProcessResponse montado campo a
+campo e `str(response)`, dict REST passado por jsonable_encoder/JSONResponse)
+com o caminho atual (mensagem protobuf direta no gRPC, ProcessRequestModel
+validado uma vez no REST e respostas pré-codificadas).
+
+Duas tabelas: "conversão" mede só a conversão da requisição e a codificação da
+resposta (mesmo processedId e timestamp nos dois lados, sem handler); "handler"
+mede a chamada inteira, com o que o handler atual faz a mais por requisição
+(prazo, rastreamento desligado, em andamento, histograma HDR).
+O atraso simulado é desligado, os logs são descartados e os extras opt-in por
+chamada (relatório de carga, bytes gRPC) ficam desligados, como no padrão, para
+medir apenas o custo por requisição: CPU (µs) e pico de memória alocada (bytes).
+O tracemalloc só enxerga alocações do interpretador; memória das arenas do
+protobuf (upb) não entra na coluna de bytes, que subestima o caminho anterior.
+
+Uso (a partir de src/service-b-python):
+    python -m tools.bench_processing --iterations 20000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+import uuid
+
+import orjson
+import structlog
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app import config, processing
+from app.generated import processing_pb2
+from app.grpc_server import ProcessingServicer
+from app.main import REQUEST_COUNT, REQUEST_LATENCY, process_rest
+from app.models import ProcessRequestModel
+from app.processing import ProcessingRequest, ProcessingResult
+from tools.loadgen import DEFAULT_PAYLOAD
+
+logger = structlog.get_logger()
+
+
+def _drop(_, __, ___):
+    raise structlog.DropEvent
+
+
+def legacy_grpc(request):
+    """Réplica do ProcessData anterior (sem o time.sleep)."""
+    start_time = time.time()
+    logger.info("grpc_request_received",
+                data={"field1": request.field1, "field2": request.field2, "field3": request.field3})
+    response = processing_pb2.ProcessResponse(
+        message="Dados processados com sucesso via gRPC",
+        success=True,
+        processedId=str(uuid.uuid4()),
+        timestamp=int(time.time()),
+    )
+    logger.info("grpc_request_processed", response=str(response))
+    return response.SerializeToString()
+
+
+async def legacy_rest(request):
+    """Réplica do process_rest anterior, incluindo as métricas e a serialização do FastAPI."""
+    start_time = time.time()
+    data = await request.json()
+    logger.info("rest_request_received", data=data)
+    result = {
+        "message": "Dados processados com sucesso",
+        "success": True,
+        "processedId": str(uuid.uuid4()),
+        "timestamp": int(time.time()),
+    }
+    REQUEST_COUNT.labels(method='POST', endpoint='/api/process', http_status=200).inc()
+    REQUEST_LATENCY.labels(method='POST', endpoint='/api/process').observe(time.time() - start_time)
+    logger.info("rest_request_processed", result=result)
+    return JSONResponse(jsonable_encoder(result)).body
+
+
+async def current_rest(request):
+    return (await process_rest(request)).body
+
+
+# Conversão isolada: o mesmo resultado dos dois lados, sem uuid/relógio nem handler
+PROCESSED_ID = str(uuid.uuid4())
+TIMESTAMP = int(time.time())
+
+
+def legacy_grpc_conversion(request):
+    """dict do log, ProcessResponse campo a campo, str() para o log e serialização."""
+    data = {"field1": request.field1, "field2": request.field2, "field3": request.field3}
+    response = processing_pb2.ProcessResponse(
+        message="Dados processados com sucesso via gRPC",
+        success=True,
+        processedId=PROCESSED_ID,
+        timestamp=TIMESTAMP,
+    )
+    return data, str(response), response.SerializeToString()
+
+
+def current_grpc_conversion(request):
+    """A mensagem é lida direto; a resposta é pré-codificada."""
+    return processing.encode_protobuf(ProcessingResult(PROCESSED_ID, TIMESTAMP))
+
+
+def legacy_rest_conversion(body):
+    """json da stdlib, dict de resultado, jsonable_encoder e JSONResponse."""
+    data = json.loads(body)
+    result = {
+        "message": "Dados processados com sucesso",
+        "success": True,
+        "processedId": PROCESSED_ID,
+        "timestamp": TIMESTAMP,
+    }
+    return data, JSONResponse(jsonable_encoder(result)).body
+
+
+def current_rest_conversion(body):
+    """orjson, ProcessRequestModel validado uma vez e copiado para o ProcessingRequest de
+    __slots__, e JSON pré-codificado (o handler atual)."""
+    request = ProcessingRequest.from_object(ProcessRequestModel.model_validate(orjson.loads(body)))
+    return request, Response(processing.encode_json(ProcessingResult(PROCESSED_ID, TIMESTAMP)),
+                             media_type="application/json").body
+
+
+class _Context:
+    """ServicerContext mínimo: sem metadata nem prazo, chamada sempre ativa."""
+
+    def invocation_metadata(self):
+        return ()
+
+    def time_remaining(self):
+        return None
+
+    def add_callback(self, callback):
+        return True
+
+    def is_active(self):
+        return True
+
+    def set_trailing_metadata(self, metadata):
+        pass
+
+    def set_compression(self, compression):
+        pass
+
+    def set_code(self, code):
+        pass
+
+    def set_details(self, details):
+        pass
+
+    def abort(self, code, details):
+        # Como no grpcio: abort encerra o handler com uma exceção
+        raise RuntimeError(f"{code}: {details}")
+
+
+def _make_request(body):
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {"type": "http", "method": "POST", "path": "/api/process",
+             "headers": [(b"content-type", b"application/json")]}
+    return Request(scope, receive)
+
+
+def _cpu_us(call, iterations):
+    cpu_start = time.process_time()
+    for _ in range(iterations):
+        call()
+    return (time.process_time() - cpu_start) / iterations * 1_000_000
+
+
+def _peak_bytes(call, iterations):
+    tracemalloc.start()
+    peaks = 0
+    samples = min(iterations, 2000)
+    for _ in range(samples):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        call()
+        peaks += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    return peaks / samples
+
+
+def _table(title, cases, iterations, repeat=5):
+    """CPU: a menor média entre `repeat` rodadas (como o timeit), com as rodadas dos
+    casos intercaladas para que uma fase lenta da máquina não caia toda num caso só;
+    memória: média do pico por chamada."""
+    cpu = {name: float("inf") for name in cases}
+    for call in cases.values():
+        call()
+    for _ in range(repeat):
+        for name, call in cases.items():
+            cpu[name] = min(cpu[name], _cpu_us(call, iterations))
+    print(f"\n{title}")
+    print(f"{'caminho':<16}{'CPU µs/req':>12}{'pico bytes/req':>16}")
+    for name, call in cases.items():
+        print(f"{name:<16}{cpu[name]:>12.1f}{_peak_bytes(call, iterations):>16.0f}")
+
+
+def run(iterations):
+    config.PROCESSING_DELAY = 0
+    config.LOAD_REPORTING_ENABLED = False
+    config.GRPC_PAYLOAD_METRICS_ENABLED = False
+    structlog.configure(processors=[_drop])
+
+    message = processing_pb2.ProcessRequest(**DEFAULT_PAYLOAD)
+    servicer = ProcessingServicer()
+    context = _Context()
+    body = json.dumps(DEFAULT_PAYLOAD).encode()
+    loop = asyncio.new_event_loop()
+
+    _table("conversão", {
+        "grpc anterior": lambda: legacy_grpc_conversion(message),
+        "grpc atual": lambda: current_grpc_conversion(message),
+        "rest anterior": lambda: legacy_rest_conversion(body),
+        "rest atual": lambda: current_rest_conversion(body),
+    }, iterations)
+    _table("handler", {
+        "grpc anterior": lambda: legacy_grpc(message),
+        "grpc atual": lambda: servicer.ProcessData(message, context),
+        "rest anterior": lambda: loop.run_until_complete(legacy_rest(_make_request(body))),
+        "rest atual": lambda: loop.run_until_complete(current_rest(_make_request(body))),
+    }, iterations)
+    loop.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmark dos handlers do Serviço B")
+    parser.add_argument("--iterations", type=int, default=20000)
+    run(parser.parse_args().iterations)
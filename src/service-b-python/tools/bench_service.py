@@ -0,0 +1,161 @@
+"""
+Microbenchmarks em processo dos handlers do Serviço B, sem docker-compose, Kafka nem k6.
+
+- `rest`: o app FastAPI completo (middlewares, roteamento, `process_rest`) via
+  transporte ASGI em memória do httpx, sem socket;
+- `grpc`: `ProcessingServicer` num servidor gRPC em processo numa porta local,
+  chamado por um stub síncrono (inclui HTTP/2 e serialização dos dois lados);
+- `process_data`: a função `main.process_data` chamada diretamente.
+
+Cliente e servidor rodam no mesmo processo: a CPU por requisição inclui o lado
+do cliente, que é constante entre commits, então as diferenças refletem o
+Serviço B. O atraso simulado fica desligado por padrão (--delay para ligar) e
+os logs são descartados. Para cada protocolo: CPU (µs/req, todas as threads),
+pico de memória alocada por requisição (tracemalloc, bytes), p50/p99 (ms) e
+vazão sequencial.
+
+Uso (a partir de src/service-b-python; requer httpx):
+    python -m tools.bench_service --iterations 5000
+    python -m tools.bench_service --protocols grpc --delay 0.1 --iterations 50
+    python -m tools.bench_service --json bench.json   # para comparar entre commits
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from concurrent import futures
+
+import grpc
+import structlog
+
+try:
+    import httpx
+except ImportError:  # httpx só é necessário para o caso REST (pip install httpx)
+    httpx = None
+
+from app import config
+from app.generated import processing_pb2, processing_pb2_grpc
+from app.grpc_server import ProcessingServicer, add_servicer_to_server
+from app.main import app, process_data
+from tools.loadgen import DEFAULT_PAYLOAD
+
+PROTOCOLS = ("rest", "grpc", "process_data")
+
+
+def _drop(_, __, ___):
+    raise structlog.DropEvent
+
+
+def _percentile(sorted_values, p):
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(call, iterations, warmup, memory_samples):
+    for _ in range(warmup):
+        call()
+
+    latencies = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    tracemalloc.start()
+    peaks = 0
+    samples = min(iterations, memory_samples)
+    for _ in range(samples):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        call()
+        peaks += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "cpu_us": cpu / iterations * 1_000_000,
+        "peak_bytes": peaks / samples if samples else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "rps": iterations / wall,
+    }
+
+
+def rest_case(loop):
+    if httpx is None:
+        raise SystemExit("o caso rest requer httpx (pip install httpx)")
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    body = json.dumps(DEFAULT_PAYLOAD).encode()
+    headers = {"Content-Type": "application/json"}
+
+    async def post():
+        response = await client.post("/api/process", content=body, headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"POST /api/process -> {response.status_code}")
+
+    return lambda: loop.run_until_complete(post()), lambda: loop.run_until_complete(client.aclose())
+
+
+def grpc_case():
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=config.GRPC_MAX_WORKERS))
+    add_servicer_to_server(ProcessingServicer(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    channel = grpc.insecure_channel(f"127.0.0.1:{port}")
+    stub = processing_pb2_grpc.ProcessingServiceStub(channel)
+    request = processing_pb2.ProcessRequest(**DEFAULT_PAYLOAD)
+
+    def close():
+        channel.close()
+        server.stop(None)
+
+    return lambda: stub.ProcessData(request, timeout=10), close
+
+
+def run(args):
+    config.PROCESSING_DELAY = args.delay
+    structlog.configure(processors=[_drop])
+    loop = asyncio.new_event_loop()
+
+    cases = {
+        "rest": lambda: rest_case(loop),
+        "grpc": grpc_case,
+        "process_data": lambda: (lambda: process_data(DEFAULT_PAYLOAD), lambda: None),
+    }
+    results = {}
+    print(f"atraso simulado: {args.delay * 1000:.0f} ms | {args.iterations} iterações sequenciais\n")
+    print(f"{'protocolo':<14}{'CPU µs/req':>12}{'pico bytes/req':>16}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for name in args.protocols:
+        call, close = cases[name]()
+        try:
+            result = measure(call, args.iterations, args.warmup, args.memory_samples)
+        finally:
+            close()
+        results[name] = result
+        print(f"{name:<14}{result['cpu_us']:>12.1f}{result['peak_bytes']:>16.0f}"
+              f"{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}{result['rps']:>10.0f}")
+    loop.close()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"delay": args.delay, "iterations": args.iterations, "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks em processo do Serviço B")
+    parser.add_argument("--protocols", nargs="+", choices=PROTOCOLS, default=list(PROTOCOLS))
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--memory-samples", type=int, default=1000,
+                        help="requisições medidas com tracemalloc (após as de CPU/latência)")
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="PROCESSING_DELAY em segundos (0 desliga o atraso simulado)")
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    run(parser.parse_args())
@@ -0,0 +1,120 @@
+"""
+Verifica a contagem de conexões do servidor gRPC sob rajadas de reconexão.
+
+Mantém alguns clientes persistentes chamando ProcessData continuamente e, em
+paralelo, dispara rajadas em que muitos clientes conectam, fazem uma chamada e
+fecham o canal ao mesmo tempo (como réplicas do Serviço A reiniciando). Durante
+o teste amostra as conexões TCP ESTABLISHED na porta do servidor (lidas de
+/proc/net/tcp*, portanto só em Linux e na mesma máquina/namespace do servidor).
+
+Com as opções de canal de app.grpc_server.server_options(), a contagem deve
+voltar ao número de clientes persistentes depois de cada rajada, sem acúmulo de
+conexões mortas, e as chamadas persistentes não devem falhar.
+
+Uso (a partir de src/service-b-python, com o Serviço B rodando):
+    python -m tools.grpc_reconnect_burst --clients 200 --bursts 5
+"""
+
+import argparse
+import asyncio
+import time
+
+import grpc
+
+from app.generated import processing_pb2, processing_pb2_grpc
+from tools.loadgen import DEFAULT_PAYLOAD
+
+ESTABLISHED = "01"
+
+
+def established_connections(port):
+    count = 0
+    for path in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(path, "r", encoding="ascii") as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    if fields[3] == ESTABLISHED and int(fields[1].rsplit(":", 1)[1], 16) == port:
+                        count += 1
+        except FileNotFoundError:
+            continue
+    return count
+
+
+def _channel(target):
+    return grpc.aio.insecure_channel(target, options=[("grpc.use_local_subchannel_pool", 1)])
+
+
+async def persistent_client(target, request, stop, stats):
+    async with _channel(target) as channel:
+        stub = processing_pb2_grpc.ProcessingServiceStub(channel)
+        while not stop.is_set():
+            try:
+                await stub.ProcessData(request, timeout=10)
+                stats["persistent_ok"] += 1
+            except grpc.aio.AioRpcError:
+                stats["persistent_failed"] += 1
+
+
+async def burst_client(target, request, stats):
+    async with _channel(target) as channel:
+        stub = processing_pb2_grpc.ProcessingServiceStub(channel)
+        try:
+            await stub.ProcessData(request, timeout=30, wait_for_ready=True)
+            stats["burst_ok"] += 1
+        except grpc.aio.AioRpcError:
+            stats["burst_failed"] += 1
+
+
+async def sampler(port, interval, stop, samples):
+    start = time.monotonic()
+    while not stop.is_set():
+        samples.append((time.monotonic() - start, established_connections(port)))
+        await asyncio.sleep(interval)
+
+
+async def run(args):
+    target = f"{args.host}:{args.port}"
+    request = processing_pb2.ProcessRequest(**DEFAULT_PAYLOAD)
+    stats = {"persistent_ok": 0, "persistent_failed": 0, "burst_ok": 0, "burst_failed": 0}
+    samples = []
+    stop = asyncio.Event()
+
+    sampling = asyncio.ensure_future(sampler(args.port, args.sample_interval, stop, samples))
+    persistent = [asyncio.ensure_future(persistent_client(target, request, stop, stats))
+                  for _ in range(args.persistent)]
+    await asyncio.sleep(args.settle)
+    baseline = established_connections(args.port)
+
+    after_burst = []
+    for burst in range(args.bursts):
+        started = time.monotonic()
+        await asyncio.gather(*(burst_client(target, request, stats) for _ in range(args.clients)))
+        print(f"rajada {burst + 1}: {args.clients} clientes em {time.monotonic() - started:.2f}s")
+        await asyncio.sleep(args.settle)
+        after_burst.append(established_connections(args.port))
+
+    stop.set()
+    await asyncio.gather(*persistent, sampling)
+
+    peak = max(count for _, count in samples) if samples else 0
+    print(f"\nconexões (lado servidor): base {baseline} | pico {peak} | após cada rajada {after_burst}")
+    print(f"persistentes: {stats['persistent_ok']} ok / {stats['persistent_failed']} falhas | "
+          f"rajadas: {stats['burst_ok']} ok / {stats['burst_failed']} falhas")
+    stable = all(count <= baseline for count in after_burst) and stats["persistent_failed"] == 0
+    print("✅ contagem estável" if stable else "❌ conexões acumuladas ou falhas nos clientes persistentes")
+    return stable
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rajadas de reconexão contra o gRPC do Serviço B")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=50052)
+    parser.add_argument("--clients", type=int, default=200, help="clientes por rajada")
+    parser.add_argument("--bursts", type=int, default=5)
+    parser.add_argument("--persistent", type=int, default=10, help="clientes persistentes")
+    parser.add_argument("--settle", type=float, default=2.0, help="espera após cada rajada (s)")
+    parser.add_argument("--sample-interval", type=float, default=0.2)
+    ok = asyncio.run(run(parser.parse_args()))
+    raise SystemExit(0 if ok else 1)
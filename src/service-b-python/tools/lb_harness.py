@@ -0,0 +1,162 @@
+"""
+Harness local do balanceamento no cliente (app.client.ProcessingClient).
+
+Sobe N réplicas do ProcessingServicer em processo, cada uma num endereço de
+loopback diferente e na mesma porta (127.0.0.1, 127.0.0.2, ...: como as réplicas
+do compose atrás de um nome DNS headless) e um resolvedor que devolve as
+réplicas "vivas" no momento. Durante o teste a escala muda (réplica nova no
+meio, réplica removida no fim) e o cliente precisa acompanhar pela re-resolução.
+Ao final imprime quantas chamadas cada réplica atendeu por política.
+
+Com `--dns NOME` não sobe nada: resolve NOME de verdade (ex.: `service-b` dentro
+da rede do compose, após `docker compose up --scale service-b=3`) e só mede a
+distribuição pelas estatísticas do cliente.
+
+Uso (a partir de src/service-b-python):
+    python -m tools.lb_harness --replicas 3 --duration 6
+    python -m tools.lb_harness --dns service-b --port 50052 --policies round_robin
+"""
+
+import argparse
+import threading
+import time
+from concurrent import futures
+
+import grpc
+
+from app import config
+from app.client import POLICIES, ProcessingClient, resolve
+from app.generated import processing_pb2
+from app.grpc_server import ProcessingServicer, add_servicer_to_server
+from tools.loadgen import DEFAULT_PAYLOAD
+
+
+class CountingServicer(ProcessingServicer):
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def ProcessData(self, request, context):
+        with self._lock:
+            self.calls += 1
+        return super().ProcessData(request, context)
+
+
+class LocalReplicas:
+    """Réplicas em processo e o "DNS" que lista as que estão no ar."""
+
+    def __init__(self, port):
+        self.port = port
+        self.servers = {}
+        self.servicers = {}
+
+    def scale_to(self, count):
+        for i in range(len(self.servicers), count):
+            address = f"127.0.0.{i + 1}:{self.port}"
+            servicer = CountingServicer()
+            server = grpc.server(futures.ThreadPoolExecutor(max_workers=config.GRPC_MAX_WORKERS))
+            add_servicer_to_server(servicer, server)
+            server.add_insecure_port(address)
+            server.start()
+            self.servers[address] = server
+            self.servicers[address] = servicer
+
+    def remove(self, address):
+        self.servers.pop(address).stop(grace=1)
+
+    def resolve(self, target):
+        return sorted(self.servers)
+
+    def calls(self):
+        return {address: servicer.calls for address, servicer in self.servicers.items()}
+
+    def stop(self):
+        for server in self.servers.values():
+            server.stop(None)
+        self.servers.clear()
+
+
+def drive(client, workers, duration, on_tick=None):
+    request = processing_pb2.ProcessRequest(**DEFAULT_PAYLOAD)
+    stop = threading.Event()
+    errors = [0]
+
+    def worker():
+        while not stop.is_set():
+            try:
+                client.process(request, timeout=5)
+            except (grpc.RpcError, LookupError):
+                errors[0] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    started = time.monotonic()
+    while time.monotonic() - started < duration:
+        time.sleep(0.1)
+        if on_tick is not None:
+            on_tick(time.monotonic() - started)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return errors[0]
+
+
+def _print_distribution(policy, counts, errors):
+    total = sum(counts.values()) or 1
+    print(f"\n{policy}  ({sum(counts.values())} chamadas, {errors} erros)")
+    for address, calls in sorted(counts.items()):
+        print(f"  {address:<22}{calls:>8}  {100 * calls / total:5.1f}%  {'#' * round(40 * calls / total)}")
+
+
+def run_local(args):
+    # As réplicas locais rodam neste processo: least_loaded precisa do relatório de carga
+    config.LOAD_REPORTING_ENABLED = True
+    for policy in args.policies:
+        replicas = LocalReplicas(args.port)
+        replicas.scale_to(args.replicas - 1)
+        scaled = {"up": False, "down": False}
+
+        def on_tick(elapsed):
+            # Réplica nova depois do primeiro terço; a primeira sai no último terço
+            if not scaled["up"] and elapsed > args.duration / 3:
+                replicas.scale_to(args.replicas)
+                scaled["up"] = True
+            if not scaled["down"] and elapsed > 2 * args.duration / 3:
+                replicas.remove(min(replicas.servers))
+                scaled["down"] = True
+
+        try:
+            with ProcessingClient(f"replicas:{args.port}", policy=policy,
+                                  resolve_interval=args.resolve_interval,
+                                  resolver=replicas.resolve) as client:
+                errors = drive(client, args.workers, args.duration, on_tick)
+        finally:
+            replicas.stop()
+        _print_distribution(policy, replicas.calls(), errors)
+
+
+def run_dns(args):
+    target = f"{args.dns}:{args.port}"
+    print(f"{target} resolve para: {', '.join(resolve(target))}")
+    for policy in args.policies:
+        with ProcessingClient(target, policy=policy, resolve_interval=args.resolve_interval) as client:
+            errors = drive(client, args.workers, args.duration)
+            counts = {address: stats["calls"] for address, stats in client.stats().items()}
+        _print_distribution(policy, counts, errors)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Harness do balanceamento gRPC no cliente")
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--port", type=int, default=50062)
+    parser.add_argument("--dns", help="resolve este nome de verdade em vez de subir réplicas locais")
+    parser.add_argument("--policies", nargs="+", choices=POLICIES, default=list(POLICIES))
+    parser.add_argument("--workers", type=int, default=16, help="threads chamando ProcessData")
+    parser.add_argument("--duration", type=float, default=6.0)
+    parser.add_argument("--resolve-interval", type=float, default=0.5)
+    args = parser.parse_args()
+    if args.dns:
+        run_dns(args)
+    else:
+        run_local(args)
@@ -0,0 +1,466 @@
+"""
+Gerador de carga em Python puro para o Serviço B (REST e gRPC).
+
+Mede a capacidade do Serviço B isoladamente, sem o salto pelo Serviço A.
+Usa o mesmo contrato do k6 (`/api/process` e `processing.proto`), asyncio com
+pool de conexões HTTP/1.1 keep-alive, canais grpc.aio multiplexados e vários
+processos. A saída é NDJSON no formato do `k6 --out json`, lida diretamente
+pelo `analyze_k6_logs_fixed.py`.
+
+Exemplos (executar a partir de src/service-b-python):
+    python -m tools.loadgen --protocol rest --mode closed --vus 200 --duration 60 --out rest.json
+    python -m tools.loadgen --protocol grpc --mode rate --rate 2000 --max-vus 500 --processes 4 --out grpc.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from array import array
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import grpc
+
+from app.generated import processing_pb2, processing_pb2_grpc
+
+# Mesmo payload usado pelos scripts k6 em k6-tests/
+DEFAULT_PAYLOAD = {
+    "field1": "teste1",
+    "field2": "teste2",
+    "field3": 123,
+    "field4": True,
+    "field5": ["item1", "item2"],
+    "field6": {"nested": "value"},
+    "field7": "2025-09-07T00:00:00Z",
+    "field8": 456.78,
+    "field9": "teste9",
+    "field10": "teste10",
+}
+
+# Definições de métricas emitidas (nome -> (tipo, contains)), como no k6
+METRIC_DEFINITIONS = {
+    "http_reqs": ("counter", "default"),
+    "http_req_duration": ("trend", "time"),
+    "http_req_failed": ("rate", "default"),
+    "iterations": ("counter", "default"),
+    "dropped_iterations": ("counter", "default"),
+    "rest_latency": ("trend", "time"),
+    "grpc_latency": ("trend", "time"),
+}
+
+FLUSH_INTERVAL = 1.0
+
+
+class RestConnection:
+    """Conexão HTTP/1.1 keep-alive com requisição pré-codificada."""
+
+    def __init__(self, host, port, request_bytes):
+        self.host = host
+        self.port = port
+        self.request_bytes = request_bytes
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def request(self):
+        if self.writer is None:
+            await self._connect()
+        try:
+            self.writer.write(self.request_bytes)
+            # Respeita o controle de fluxo: sem drain o buffer de escrita cresce sem limite
+            await self.writer.drain()
+            head = await self.reader.readuntil(b"\r\n\r\n")
+            status = int(head[9:12])
+            keep_alive = True
+            content_length = None
+            for line in head.split(b"\r\n")[1:]:
+                name, _, value = line.partition(b":")
+                name = name.strip().lower()
+                if name == b"content-length":
+                    content_length = int(value)
+                elif name == b"connection" and value.strip().lower() == b"close":
+                    keep_alive = False
+            if content_length is not None:
+                await self.reader.readexactly(content_length)
+            else:
+                await self._read_chunked()
+            if not keep_alive:
+                self.close()
+            return status
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            self.close()
+            raise
+
+    async def _read_chunked(self):
+        while True:
+            size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await self.reader.readexactly(size + 2)
+            if size == 0:
+                return
+
+
+class RestClient:
+    """Pool de conexões keep-alive para POST /api/process."""
+
+    protocol = "rest"
+
+    def __init__(self, url, pool_size, payload, timeout=None):
+        parts = urlsplit(url)
+        body = json.dumps(payload).encode()
+        # Propaga o timeout do cliente para o servidor abandonar o que já expirou
+        deadline = f"X-Request-Timeout-Ms: {int(timeout * 1000)}\r\n" if timeout else ""
+        request_bytes = (
+            f"POST {parts.path or '/'} HTTP/1.1\r\n"
+            f"Host: {parts.netloc}\r\n"
+            "Content-Type: application/json\r\n"
+            "Connection: keep-alive\r\n"
+            f"{deadline}"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode() + body
+        self.url = url
+        self.pool = asyncio.Queue()
+        for _ in range(pool_size):
+            self.pool.put_nowait(RestConnection(parts.hostname, parts.port or 80, request_bytes))
+
+    async def call(self, timeout):
+        conn = await self.pool.get()
+        try:
+            status = await asyncio.wait_for(conn.request(), timeout)
+            return status == 200, str(status)
+        except asyncio.TimeoutError:
+            conn.close()
+            return False, "0"
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            return False, "0"
+        finally:
+            self.pool.put_nowait(conn)
+
+    async def close(self):
+        while not self.pool.empty():
+            self.pool.get_nowait().close()
+
+
+class GrpcClient:
+    """Canais grpc.aio multiplexados, escolhidos em round-robin.
+
+    Com `hedge_delay`, uma chamada sem resposta após esse tempo ganha uma cópia
+    em outro canal; a primeira resposta bem-sucedida vale e a outra é cancelada
+    (o servidor interrompe o processamento da cancelada).
+    """
+
+    protocol = "grpc"
+
+    def __init__(self, target, channels, payload, hedge_delay=None):
+        self.url = target
+        self.channels = [
+            # Pool de subcanais local: cada canal abre sua própria conexão HTTP/2
+            grpc.aio.insecure_channel(target, options=[("grpc.use_local_subchannel_pool", 1)])
+            for _ in range(channels)
+        ]
+        self.stubs = [processing_pb2_grpc.ProcessingServiceStub(ch) for ch in self.channels]
+        self.request = processing_pb2.ProcessRequest(**payload)
+        self.hedge_delay = hedge_delay
+        self._next = 0
+
+    def _stub(self):
+        stub = self.stubs[self._next]
+        self._next = (self._next + 1) % len(self.stubs)
+        return stub
+
+    async def _call(self, stub, timeout):
+        try:
+            await stub.ProcessData(self.request, timeout=timeout)
+            return True, "0"
+        except grpc.aio.AioRpcError as e:
+            return False, str(e.code().value[0])
+
+    async def call(self, timeout):
+        if not self.hedge_delay or self.hedge_delay >= timeout:
+            return await self._call(self._stub(), timeout)
+        primary = asyncio.ensure_future(self._call(self._stub(), timeout))
+        done, _ = await asyncio.wait((primary,), timeout=self.hedge_delay)
+        if done:
+            return primary.result()
+        # Mesmo prazo total: a cópia recebe só o que resta do timeout original
+        hedge = asyncio.ensure_future(self._call(self._stub(), timeout - self.hedge_delay))
+        pending = {primary, hedge}
+        result = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if result[0]:
+                    break
+            if result[0]:
+                break
+        for task in pending:
+            task.cancel()
+        return result
+
+    async def close(self):
+        for ch in self.channels:
+            await ch.close()
+
+
+class Recorder:
+    """Acumula amostras em memória e grava NDJSON k6 em lotes."""
+
+    def __init__(self, out_file, protocol, url):
+        self.out = out_file
+        self.protocol = protocol
+        self.samples = []
+        self.latencies = array("d")
+        self.failed = 0
+        self.dropped = 0
+        self._second = None
+        self._prefix = ""
+        self._tags = {}
+        self._base_tags = {
+            "method": "POST" if protocol == "rest" else "processing.ProcessingService/ProcessData",
+            "name": url,
+            "url": url,
+            "protocol": protocol,
+            "scenario": "default",
+        }
+        self._latency_metric = f"{protocol}_latency"
+
+    def add(self, ts, duration_ms, ok, status):
+        self.samples.append((ts, duration_ms, ok, status))
+
+    def drop(self, ts):
+        self.dropped += 1
+        self.samples.append((ts, None, False, None))
+
+    def _timestamp(self, ts):
+        second = int(ts)
+        if second != self._second:
+            self._second = second
+            self._prefix = datetime.fromtimestamp(second, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        return f"{self._prefix}.{int((ts - second) * 1_000_000):06d}Z"
+
+    def _tags_json(self, status):
+        tags = self._tags.get(status)
+        if tags is None:
+            tags = json.dumps(dict(self._base_tags, status=status))
+            self._tags[status] = tags
+        return tags
+
+    def flush(self):
+        samples, self.samples = self.samples, []
+        lines = []
+        for ts, duration_ms, ok, status in samples:
+            t = self._timestamp(ts)
+            if duration_ms is None:
+                lines.append(
+                    f'{{"type":"Point","metric":"dropped_iterations","data":{{"time":"{t}","value":1,"tags":{{"scenario":"default"}}}}}}\n'
+                )
+                continue
+            self.latencies.append(duration_ms)
+            if not ok:
+                self.failed += 1
+            tags = self._tags_json(status)
+            point = f'"time":"{t}","tags":{tags}'
+            lines.append(f'{{"type":"Point","metric":"http_reqs","data":{{{point},"value":1}}}}\n')
+            lines.append(f'{{"type":"Point","metric":"http_req_duration","data":{{{point},"value":{duration_ms:.6f}}}}}\n')
+            lines.append(f'{{"type":"Point","metric":"{self._latency_metric}","data":{{{point},"value":{duration_ms:.6f}}}}}\n')
+            lines.append(f'{{"type":"Point","metric":"http_req_failed","data":{{{point},"value":{0 if ok else 1}}}}}\n')
+            lines.append(f'{{"type":"Point","metric":"iterations","data":{{"time":"{t}","value":1,"tags":{{"scenario":"default"}}}}}}\n')
+        self.out.writelines(lines)
+
+
+async def _flusher(recorder, stop):
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        recorder.flush()
+
+
+async def _timed_call(client, recorder, timeout):
+    start = time.perf_counter()
+    ok, status = await client.call(timeout)
+    recorder.add(time.time(), (time.perf_counter() - start) * 1000, ok, status)
+
+
+async def run_closed(client, recorder, vus, duration, timeout, think_time):
+    """Modelo fechado: cada VU envia a próxima requisição ao receber a resposta."""
+    deadline = time.monotonic() + duration
+
+    async def vu():
+        while time.monotonic() < deadline:
+            await _timed_call(client, recorder, timeout)
+            if think_time:
+                await asyncio.sleep(think_time)
+
+    await asyncio.gather(*(vu() for _ in range(vus)))
+
+
+async def run_constant_rate(client, recorder, rate, max_vus, duration, timeout):
+    """Modelo aberto (constant-arrival-rate): chegadas independem das respostas.
+
+    Se `max_vus` requisições já estiverem em andamento, a iteração é descartada
+    e contabilizada em `dropped_iterations`, como no executor do k6.
+    """
+    in_flight = set()
+    start = time.monotonic()
+    total = int(rate * duration)
+    for i in range(total):
+        delay = start + i / rate - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= max_vus:
+            recorder.drop(time.time())
+            continue
+        task = asyncio.ensure_future(_timed_call(client, recorder, timeout))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+
+
+def _build_client(args, share):
+    if args.protocol == "rest":
+        return RestClient(args.url, max(1, share["concurrency"]), DEFAULT_PAYLOAD,
+                          args.timeout if args.propagate_timeout else None)
+    hedge_delay = args.hedge_ms / 1000 if args.hedge_ms else None
+    return GrpcClient(args.target, args.channels, DEFAULT_PAYLOAD, hedge_delay)
+
+
+async def _run_worker(args, share, part_path):
+    client = _build_client(args, share)
+    with open(part_path, "w", encoding="utf-8", buffering=1 << 20) as out:
+        recorder = Recorder(out, client.protocol, client.url)
+        stop = asyncio.Event()
+        flusher = asyncio.ensure_future(_flusher(recorder, stop))
+        try:
+            if args.mode == "closed":
+                await run_closed(client, recorder, share["concurrency"], args.duration,
+                                 args.timeout, args.think_time)
+            else:
+                await run_constant_rate(client, recorder, share["rate"], share["concurrency"],
+                                        args.duration, args.timeout)
+        finally:
+            stop.set()
+            await flusher
+            await client.close()
+    return recorder.latencies.tobytes(), recorder.failed, recorder.dropped
+
+
+def _worker_main(args, share, part_path):
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    return asyncio.run(_run_worker(args, share, part_path))
+
+
+def _split(total, parts):
+    base, extra = divmod(total, parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+
+def _write_metric_definitions(out):
+    for name, (kind, contains) in METRIC_DEFINITIONS.items():
+        out.write(json.dumps({
+            "type": "Metric",
+            "data": {"name": name, "type": kind, "contains": contains,
+                     "thresholds": [], "submetrics": None},
+            "metric": name,
+        }) + "\n")
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run(args):
+    processes = max(1, args.processes)
+    concurrency = args.vus if args.mode == "closed" else args.max_vus
+    shares = [
+        {"concurrency": c, "rate": args.rate / processes}
+        for c in _split(concurrency, processes)
+    ]
+    parts = [f"{args.out}.part{i}" for i in range(processes)]
+
+    started = time.monotonic()
+    if processes == 1:
+        results = [_worker_main(args, shares[0], parts[0])]
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(processes) as pool:
+            results = pool.starmap(_worker_main, [(args, s, p) for s, p in zip(shares, parts)])
+    elapsed = time.monotonic() - started
+
+    with open(args.out, "w", encoding="utf-8") as out:
+        _write_metric_definitions(out)
+        for part in parts:
+            with open(part, "r", encoding="utf-8") as f:
+                shutil.copyfileobj(f, out)
+            os.remove(part)
+
+    latencies = array("d")
+    failed = dropped = 0
+    for raw, f, d in results:
+        latencies.frombytes(raw)
+        failed += f
+        dropped += d
+    values = sorted(latencies)
+
+    print(f"📊 {args.protocol.upper()} ({args.mode}) - {len(values)} requisições em {elapsed:.1f}s")
+    print(f"🚀 Throughput: {len(values) / elapsed:.2f} req/s")
+    print(f"⏱️  Latência (ms): P50 {_percentile(values, 50):.2f} | P95 {_percentile(values, 95):.2f} "
+          f"| P99 {_percentile(values, 99):.2f}")
+    print(f"❌ Falhas: {failed} | Iterações descartadas: {dropped}")
+    print(f"💾 Resultados k6 NDJSON em: {args.out}")
+
+
+def _positive_float(value):
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"deve ser maior que zero: {value}")
+    return number
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Gerador de carga para o Serviço B (REST/gRPC)")
+    parser.add_argument("--protocol", choices=["rest", "grpc"], default="rest")
+    parser.add_argument("--mode", choices=["closed", "rate"], default="closed",
+                        help="closed: VUs em laço fechado; rate: taxa de chegada constante")
+    parser.add_argument("--url", default="http://localhost:3001/api/process")
+    parser.add_argument("--target", default="localhost:50052")
+    parser.add_argument("--vus", type=int, default=100, help="VUs no modo closed")
+    parser.add_argument("--rate", type=_positive_float, default=1000.0, help="Requisições/s no modo rate")
+    parser.add_argument("--max-vus", type=int, default=1000,
+                        help="Máximo de requisições simultâneas no modo rate")
+    parser.add_argument("--duration", type=float, default=60.0, help="Duração em segundos")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--channels", type=int, default=4, help="Canais gRPC por processo")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--propagate-timeout", action="store_true",
+                        help="REST: envia o timeout no cabeçalho X-Request-Timeout-Ms")
+    parser.add_argument("--hedge-ms", type=float, default=0.0,
+                        help="gRPC: dispara uma cópia da chamada após N ms sem resposta")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Pausa entre iterações de cada VU (modo closed)")
+    parser.add_argument("--out", default="loadgen-results.json")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run(parse_args())
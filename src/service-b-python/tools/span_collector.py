@@ -0,0 +1,85 @@
+"""
+Coletor OTLP/HTTP mínimo para testes locais do rastreamento (app.tracing).
+
+Aceita `POST /v1/traces` com o corpo JSON do OTLP, como um OpenTelemetry
+Collector, e grava cada span como uma linha JSON no arquivo de saída: o mesmo
+formato do exportador `file`, lido pelo tools.trace_breakdown. Não aceita OTLP
+em protobuf (o Serviço B exporta em JSON).
+
+Uso (a partir de src/service-b-python):
+    python -m tools.span_collector --port 4318 --out spans.jsonl
+    TRACING_ENABLED=1 TRACING_EXPORTER=otlp TRACING_OTLP_ENDPOINT=http://localhost:4318/v1/traces ...
+"""
+
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import orjson
+
+
+class SpanSink:
+    def __init__(self, path):
+        self._file = open(path, "ab")
+        self._lock = threading.Lock()
+        self.spans = 0
+
+    def write(self, payload):
+        lines = [orjson.dumps(span) + b"\n"
+                 for resource in payload.get("resourceSpans", [])
+                 for scope in resource.get("scopeSpans", [])
+                 for span in scope.get("spans", [])]
+        with self._lock:
+            self._file.writelines(lines)
+            self._file.flush()
+            self.spans += len(lines)
+        return len(lines)
+
+    def close(self):
+        self._file.close()
+
+
+def make_handler(sink, verbose):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/v1/traces":
+                self.send_error(404)
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                count = sink.write(orjson.loads(body))
+            except (orjson.JSONDecodeError, AttributeError) as e:
+                self.send_error(400, str(e))
+                return
+            if verbose:
+                print(f"+{count} spans (total {sink.spans})")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coletor OTLP/HTTP JSON que grava spans em arquivo")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--out", default="spans.jsonl")
+    parser.add_argument("--verbose", action="store_true", help="imprime cada lote recebido")
+    args = parser.parse_args()
+
+    sink = SpanSink(args.out)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(sink, args.verbose))
+    print(f"coletor em http://{args.host}:{args.port}/v1/traces -> {args.out}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        sink.close()
+        print(f"{sink.spans} spans gravados")
@@ -0,0 +1,135 @@
+"""
+Decomposição da latência do Serviço B por etapa a partir dos spans de app.tracing.
+
+Lê os arquivos de spans (exportador `file` ou tools.span_collector), junta cada
+span de servidor às suas etapas e, por protocolo, mostra a contagem, média e
+percentis de cada etapa e a fração do tempo total de servidor que ela
+representa. `other` é o tempo do span de servidor não coberto por nenhuma
+etapa (framework, middlewares, troca de threads). `queue` só aparece quando o
+chamador envia X-Request-Start; fica antes do span de servidor e entra no total.
+
+Uso (a partir de src/service-b-python):
+    python -m tools.trace_breakdown /tmp/service-b-spans.jsonl
+    python -m tools.trace_breakdown spans.jsonl --include-errors --json breakdown.json
+"""
+
+import argparse
+import json
+from collections import defaultdict
+
+import orjson
+
+STAGES = ("queue", "parse", "log", "process", "publish", "serialize", "other")
+SPAN_KIND_SERVER = 2
+STATUS_ERROR = 2
+
+
+def _percentile(sorted_values, p):
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _duration_ms(span):
+    return (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+
+
+def _attribute(span, key):
+    for attribute in span.get("attributes", []):
+        if attribute["key"] == key:
+            return next(iter(attribute["value"].values()))
+    return None
+
+
+def load_spans(paths):
+    spans = []
+    for path in paths:
+        with open(path, "rb") as f:
+            spans.extend(orjson.loads(line) for line in f if line.strip())
+    return spans
+
+
+def requests_from_spans(spans, include_errors=False):
+    """[{'protocol', 'total_ms', 'stages': {etapa: ms}}] por span de servidor"""
+    children = defaultdict(list)
+    roots = []
+    for span in spans:
+        if span.get("kind") == SPAN_KIND_SERVER:
+            roots.append(span)
+        elif span.get("parentSpanId"):
+            children[(span["traceId"], span["parentSpanId"])].append(span)
+
+    requests = []
+    for root in roots:
+        if not include_errors and root.get("status", {}).get("code") == STATUS_ERROR:
+            continue
+        server = _duration_ms(root)
+        stages = defaultdict(float)
+        for child in children.get((root["traceId"], root["spanId"]), []):
+            stages[child["name"]] += _duration_ms(child)
+        # `queue` termina onde o span de servidor começa: soma ao total, não ao `other`
+        queue = stages.get("queue", 0.0)
+        stages["other"] = max(0.0, server - (sum(stages.values()) - queue))
+        total = server + queue
+        requests.append({"protocol": _attribute(root, "protocol") or "?", "total_ms": total,
+                         "stages": dict(stages)})
+    return requests
+
+
+def breakdown(requests):
+    """{protocolo: {'requests', 'total', 'stages': {etapa: estatísticas}}}"""
+    by_protocol = defaultdict(list)
+    for request in requests:
+        by_protocol[request["protocol"]].append(request)
+
+    result = {}
+    for protocol, items in sorted(by_protocol.items()):
+        totals = sorted(item["total_ms"] for item in items)
+        total_sum = sum(totals)
+        names = [s for s in STAGES if any(s in item["stages"] for item in items)]
+        names += sorted({s for item in items for s in item["stages"]} - set(STAGES))
+        stages = {}
+        for name in names:
+            values = sorted(item["stages"][name] for item in items if name in item["stages"])
+            stages[name] = {
+                "count": len(values),
+                "mean_ms": sum(values) / len(values),
+                "p50_ms": _percentile(values, 50),
+                "p95_ms": _percentile(values, 95),
+                "p99_ms": _percentile(values, 99),
+                "share": sum(values) / total_sum if total_sum else 0.0,
+            }
+        result[protocol] = {
+            "requests": len(items),
+            "total": {"mean_ms": total_sum / len(items), "p50_ms": _percentile(totals, 50),
+                      "p95_ms": _percentile(totals, 95), "p99_ms": _percentile(totals, 99)},
+            "stages": stages,
+        }
+    return result
+
+
+def print_breakdown(result):
+    for protocol, data in result.items():
+        total = data["total"]
+        print(f"\n{protocol}: {data['requests']} requisições | servidor média {total['mean_ms']:.3f} ms, "
+              f"p50 {total['p50_ms']:.3f}, p95 {total['p95_ms']:.3f}, p99 {total['p99_ms']:.3f}")
+        print(f"  {'etapa':<12}{'n':>8}{'média ms':>11}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'% total':>9}")
+        for name, stats in data["stages"].items():
+            print(f"  {name:<12}{stats['count']:>8}{stats['mean_ms']:>11.3f}{stats['p50_ms']:>10.3f}"
+                  f"{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['share'] * 100:>8.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latência do Serviço B por etapa a partir dos spans")
+    parser.add_argument("files", nargs="+", help="arquivos JSONL de spans")
+    parser.add_argument("--include-errors", action="store_true",
+                        help="inclui requisições com erro (422, 504, DEADLINE_EXCEEDED...)")
+    parser.add_argument("--json", help="grava a decomposição neste arquivo")
+    args = parser.parse_args()
+
+    result = breakdown(requests_from_spans(load_spans(args.files), args.include_errors))
+    if not result:
+        raise SystemExit("nenhum span de servidor encontrado")
+    print_breakdown(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
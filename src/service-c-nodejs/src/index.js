@@ -118,9 +118,11 @@ server.addService(storageProto.StorageService.service, {
     const { processedId, data } = call.request;
     const timestamp = Date.now();
     
+    // `data` já chega como texto JSON (string no proto): gravado como está, no
+    // mesmo formato do REST (JSON.stringify do objeto) e do StoreBatch
     db.run(
       'INSERT INTO processed_data (id, data, timestamp) VALUES (?, ?, ?)',
-      [processedId, JSON.stringify(data), timestamp],
+      [processedId, data, timestamp],
       (err) => {
         const duration = process.hrtime(startTime);
         const durationSeconds = duration[0] + duration[1] / 1e9;
@@ -142,6 +144,99 @@ server.addService(storageProto.StorageService.service, {
         callback(null, { success: true, processedId });
       }
     );
+  },
+
+  // Client streaming: o Serviço B envia um lote de resultados e recebe um único
+  // resumo; o lote é gravado numa transação com um statement preparado
+  StoreBatch: (call, callback) => {
+    const startTime = process.hrtime();
+    const records = [];
+    // O stream termina por 'end' ou por 'error' (cliente cancelou, conexão caiu):
+    // a chamada é encerrada uma única vez
+    let finished = false;
+
+    call.on('data', (request) => {
+      records.push(request);
+    });
+
+    call.on('error', (err) => {
+      if (finished) {
+        return;
+      }
+      finished = true;
+      records.length = 0;
+      const duration = process.hrtime(startTime);
+      logger.error('Erro no stream de armazenamento em lote', { error: err });
+      storageOperationDuration
+        .labels('insert_batch', 'error')
+        .observe(duration[0] + duration[1] / 1e9);
+      callback(err);
+    });
+
+    call.on('end', () => {
+      if (finished) {
+        return;
+      }
+      finished = true;
+      const timestamp = Date.now();
+      let stored = 0;
+      let failed = 0;
+
+      const fail = (err) => {
+        const duration = process.hrtime(startTime);
+        logger.error('Erro ao armazenar lote via gRPC', { error: err });
+        storageOperationDuration
+          .labels('insert_batch', 'error')
+          .observe(duration[0] + duration[1] / 1e9);
+        callback({ code: grpc.status.INTERNAL, details: `Erro ao armazenar lote: ${err.message}` });
+      };
+
+      // Tudo na fila do db.serialize, para lotes concorrentes não se misturarem.
+      // Sem callback um erro do sqlite vira 'error' no db (sem listener: derruba
+      // o processo), então cada etapa da transação trata o próprio erro
+      let beginErr = null;
+      db.serialize(() => {
+        db.run('BEGIN TRANSACTION', (err) => {
+          beginErr = err;
+        });
+        const stmt = db.prepare('INSERT INTO processed_data (id, data, timestamp) VALUES (?, ?, ?)');
+        for (const { processedId, data } of records) {
+          stmt.run([processedId, data, timestamp], (err) => {
+            if (err) {
+              failed += 1;
+            } else {
+              stored += 1;
+            }
+          });
+        }
+        stmt.finalize();
+        db.run('COMMIT', (err) => {
+          if (beginErr) {
+            // Sem transação aberta não há o que desfazer
+            fail(beginErr);
+            return;
+          }
+          if (err) {
+            // COMMIT falhou: a transação continua aberta e precisa ser desfeita
+            db.run('ROLLBACK', (rollbackErr) => {
+              if (rollbackErr) {
+                logger.error('Erro no ROLLBACK do lote', { error: rollbackErr });
+              }
+              fail(err);
+            });
+            return;
+          }
+
+          const duration = process.hrtime(startTime);
+          storageOperationDuration
+            .labels('insert_batch', failed ? 'partial' : 'success')
+            .observe(duration[0] + duration[1] / 1e9);
+
+          logger.info('Lote armazenado via gRPC', { stored, failed });
+          callback(null, { stored, failed });
+        });
+      });
+    });
   }
 });
 